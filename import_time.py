@@ -0,0 +1,45 @@
+"""Measure the cold import time of the training-side API (``from xview.experiment import Experiment``).
+
+Each run imports it in a fresh interpreter, and fails if a GUI module (PyQt5,
+matplotlib) was loaded along the way. Usage: ``python import_time.py [n_runs]``.
+"""
+
+import os
+import sys
+import subprocess
+import statistics
+
+
+IMPORT_STATEMENT = "from xview.experiment import Experiment"
+GUI_MODULES = ("PyQt5", "matplotlib")
+
+_PROBE = f"""
+import sys, time
+t = time.perf_counter()
+{IMPORT_STATEMENT}
+elapsed = time.perf_counter() - t
+loaded = sorted({{name.split('.')[0] for name in sys.modules if name.split('.')[0] in {GUI_MODULES!r}}})
+print(elapsed, ",".join(loaded))
+"""
+
+
+def measure_import_time(n_runs=10):
+    """Return the import times (in seconds) of n_runs fresh interpreters and the GUI modules they loaded."""
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    times, gui_modules = [], set()
+    for _ in range(n_runs):
+        output = subprocess.check_output([sys.executable, "-c", _PROBE], cwd=repo_dir, text=True)
+        # dernière ligne : "<durée> <modules GUI séparés par des virgules>"
+        elapsed, loaded = output.splitlines()[-1].split(" ", 1)
+        times.append(float(elapsed))
+        gui_modules.update(name for name in loaded.strip().split(",") if name)
+    return times, gui_modules
+
+
+if __name__ == "__main__":
+    n_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    times, gui_modules = measure_import_time(n_runs)
+    print(f"{IMPORT_STATEMENT} : médiane {1000 * statistics.median(times):.1f} ms, min {1000 * min(times):.1f} ms ({n_runs} imports)")
+    if gui_modules:
+        print(f"/!\\ Modules GUI chargés à l'import : {', '.join(sorted(gui_modules))}")
+        sys.exit(1)
@@ -0,0 +1,18 @@
+import os
+import tempfile
+
+import pytest
+
+# avant tout import de xview : config isolée et pas de vérification de version
+os.environ["XVIEW_PATH"] = tempfile.mkdtemp(prefix="xview-tests-")
+os.environ["XVIEW_SKIP_VERSION_CHECK"] = "1"
+
+
+@pytest.fixture
+def data_folder(tmp_path, monkeypatch):
+    """Data folder of the experiments created by a test."""
+    import xview.experiment
+    folder = tmp_path / "exps"
+    monkeypatch.setattr(xview.experiment, "get_config_data",
+                        lambda key: str(folder) if key == "data_folder" else None)
+    return folder
@@ -0,0 +1,86 @@
+import os
+import time
+
+from xview.utils.artifacts import (store_folder, store_blob, blob_path, read_artifacts, write_artifacts, export_artifacts,
+                                   collect_artifacts)
+from xview.utils.utils import remove_tree
+
+
+def _age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_same_content_is_stored_once(tmp_path):
+    store = store_folder(str(tmp_path))
+    source = tmp_path / "diagram.png"
+    source.write_bytes(b"\x89PNG" + os.urandom(1000))
+
+    digest, size = store_blob(store, str(source))
+    assert store_blob(store, source.read_bytes()) == (digest, size)
+    assert size == 1004
+    assert os.listdir(os.path.join(store, digest[:2])) == [digest]
+    with open(blob_path(store, digest), "rb") as f:
+        assert f.read() == source.read_bytes()
+
+
+def test_collect_keeps_referenced_and_recent_blobs(tmp_path):
+    data_folder, trash = tmp_path / "exps", tmp_path / "Trash"
+    store = store_folder(str(data_folder))
+    kept, trashed, dropped, recent = (store_blob(store, content)[0] for content in (b"kept", b"trashed", b"dropped", b"recent"))
+    for digest in (kept, trashed, dropped):
+        _age(blob_path(store, digest), 2 * 3600)
+
+    (data_folder / "group" / "run").mkdir(parents=True)
+    write_artifacts(str(data_folder / "group" / "run"), {"model": {"hash": kept, "size": 4, "file_name": "model"}})
+    (trash / "old_run").mkdir(parents=True)
+    write_artifacts(str(trash / "old_run"), {"model": {"hash": trashed, "size": 7, "file_name": "model"}})
+
+    assert collect_artifacts(str(data_folder), extra_folders=(str(trash),)) == len(b"dropped")
+    assert os.path.exists(blob_path(store, kept))
+    assert os.path.exists(blob_path(store, trashed))
+    assert os.path.exists(blob_path(store, recent))
+    assert not os.path.exists(blob_path(store, dropped))
+
+    # la corbeille vidée, son blob part au passage suivant
+    os.remove(trash / "old_run" / "artifacts.json")
+    assert collect_artifacts(str(data_folder), extra_folders=(str(trash),)) == len(b"trashed")
+    assert read_artifacts(str(data_folder / "group" / "run"))["model"]["hash"] == kept
+
+
+def test_reused_blob_is_not_collected_before_its_reference(tmp_path):
+    store = store_folder(str(tmp_path))
+    digest, _ = store_blob(store, b"content")
+    _age(blob_path(store, digest), 2 * 3600)
+    # un entraînement réutilise le blob mais n'a pas encore écrit sa référence
+    store_blob(store, b"content")
+    assert collect_artifacts(str(tmp_path)) == 0
+    assert os.path.exists(blob_path(store, digest))
+
+
+def test_export_writes_writable_copies(tmp_path):
+    run = tmp_path / "group" / "run"
+    run.mkdir(parents=True)
+    store = store_folder(str(tmp_path))
+    figure, _ = store_blob(store, b"figure")
+    diagram, _ = store_blob(store, b"diagram")
+    write_artifacts(str(run), {"figures/2024-01-01_00-00-00.png": {"hash": figure, "size": 6, "file_name": "2024-01-01_00-00-00.png"},
+                               "diagram": {"hash": diagram, "size": 7, "file_name": "arch.svg"}})
+    # l'expérience ne contient que les références
+    assert os.listdir(run) == ["artifacts.json"]
+
+    dest = tmp_path / "export"
+    paths = export_artifacts(str(tmp_path), str(run), str(dest))
+    assert sorted(paths) == sorted([str(dest / "figures" / "2024-01-01_00-00-00.png"), str(dest / "arch.svg")])
+    assert (dest / "figures" / "2024-01-01_00-00-00.png").read_bytes() == b"figure"
+    # la copie est modifiable, le blob ne l'est pas
+    (dest / "arch.svg").write_bytes(b"edited")
+    with open(blob_path(store, diagram), "rb") as f:
+        assert f.read() == b"diagram"
+
+
+def test_remove_tree_deletes_read_only_files(tmp_path):
+    store = store_folder(str(tmp_path / "trash" / "old_data"))
+    store_blob(store, b"content")
+    remove_tree(str(tmp_path / "trash"))
+    assert not (tmp_path / "trash").exists()
@@ -0,0 +1,69 @@
+import threading
+
+from xview.experiment import Experiment
+from xview.utils.async_writer import AsyncWriter
+
+
+def test_async_writes_are_visible_after_flush(data_folder):
+    exp = Experiment("run", async_mode=True)
+    for i in range(500):
+        exp.add_score("loss", float(i), x=i)
+    exp.set_info("epoch", 3)
+    exp.flush()
+    x, y = exp.scores.get_score("loss")
+    assert list(y) == [float(i) for i in range(500)]
+    assert exp.get_logging_stats()["processed"] == exp.get_logging_stats()["submitted"]
+    exp.close()
+
+
+def test_writes_after_close_fall_back_to_sync(data_folder):
+    exp = Experiment("run", async_mode=True)
+    exp.add_score("loss", 1.0, x=0)
+    exp.close()
+    # comme en mode synchrone : aucune exception dans la boucle d'entraînement
+    exp.add_score("loss", 2.0, x=1)
+    exp.add_score("acc", 0.5, x=1)
+    exp.set_info("epoch", 1)
+    exp.update_status("finished")
+    assert list(exp.get_score("loss")[1]) == [1.0, 2.0]
+    assert list(exp.get_score("acc")[1]) == [0.5]
+    exp.close()
+    assert exp.get_infos()["epoch"] == 1
+    with open(exp.status_file) as f:
+        assert f.read().strip() == "finished"
+
+
+def _busy_writer(backpressure):
+    # le thread d'écriture est occupé : la file se remplit sans être vidée
+    started, release = threading.Event(), threading.Event()
+    worker = AsyncWriter(max_queue_size=2, backpressure=backpressure)
+    worker.submit(lambda: (started.set(), release.wait()))
+    started.wait()
+    return worker, release
+
+
+def test_block_backpressure_waits_for_room():
+    worker, release = _busy_writer("block")
+    done = []
+    worker.submit(done.append, 0)
+    worker.submit(done.append, 1)
+    producer = threading.Thread(target=worker.submit, args=(done.append, 2))
+    producer.start()
+    producer.join(0.3)
+    assert producer.is_alive()
+    release.set()
+    producer.join(5)
+    worker.close()
+    assert done == [0, 1, 2]
+    assert worker.stats()["dropped"] == 0
+
+
+def test_drop_backpressure_counts_dropped_calls():
+    worker, release = _busy_writer("drop")
+    done = []
+    results = [worker.submit(done.append, i) for i in range(5)]
+    release.set()
+    worker.close()
+    assert results == [True, True, False, False, False]
+    assert done == [0, 1]
+    assert worker.stats()["dropped"] == 3
@@ -0,0 +1,72 @@
+import gc
+import os
+import subprocess
+import sys
+import time
+
+from xview.utils.buffered_writer import BufferedFileWriter
+
+
+def _content(path):
+    return path.read_bytes() if path.exists() else b""
+
+
+def test_flush_when_the_buffer_is_full(tmp_path):
+    path = tmp_path / "loss.txt"
+    writer = BufferedFileWriter(str(path), max_lines=3, flush_interval=60)
+    writer.write("1\n")
+    writer.write("2\n")
+    assert _content(path) == b""
+    assert writer.pending_lines == 2
+    writer.write("3\n")
+    assert _content(path) == b"1\n2\n3\n"
+    assert writer.pending_lines == 0
+    writer.close()
+
+
+def test_stale_buffer_is_flushed_by_the_background_thread(tmp_path):
+    path = tmp_path / "loss.txt"
+    writer = BufferedFileWriter(str(path), max_lines=1000, flush_interval=0.2)
+    writer.write("1\n")
+    deadline = time.monotonic() + 5
+    while _content(path) != b"1\n" and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _content(path) == b"1\n"
+    writer.close()
+
+
+def test_truncate_and_replace(tmp_path):
+    path = tmp_path / "flag.txt"
+    writer = BufferedFileWriter(str(path), max_lines=1000, flush_interval=60)
+    writer.write("1\n")
+    writer.flush()
+    writer.write("2\n", truncate=True)
+    assert writer.truncate_pending
+    writer.flush()
+    assert _content(path) == b"2\n"
+    writer.write("3\n")
+    writer.replace(b"4\n")
+    # les points en attente avant replace sont abandonnés
+    writer.flush()
+    assert _content(path) == b"4\n"
+    writer.close()
+
+
+def test_dropped_writer_is_flushed_and_released(tmp_path):
+    path = tmp_path / "loss.txt"
+    writer = BufferedFileWriter(str(path), max_lines=1000, flush_interval=60)
+    writer.write("1\n")
+    del writer
+    gc.collect()
+    assert _content(path) == b"1\n"
+
+
+def test_pending_points_are_written_at_exit(tmp_path):
+    path = tmp_path / "loss.txt"
+    code = ("from xview.utils.buffered_writer import BufferedFileWriter\n"
+            f"writer = BufferedFileWriter({str(path)!r}, max_lines=1000, flush_interval=60)\n"
+            "for i in range(10):\n"
+            "    writer.write(f'{i}\\n')\n")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=root)
+    assert _content(path) == b"".join(f"{i}\n".encode() for i in range(10))
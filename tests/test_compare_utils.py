@@ -0,0 +1,28 @@
+from xview.compare_utils import get_metrics
+from xview.score import MultiScores
+from xview.utils.score_io import convert_scores_folder, list_score_files
+
+
+def test_shards_are_listed_once(tmp_path):
+    scores_folder = tmp_path / "scores"
+    scores_folder.mkdir()
+    for rank in range(2):
+        scores = MultiScores(str(scores_folder), shard=rank)
+        scores.add_score("loss", plt_args={"ls": "-"})
+        scores.add_score_point("loss", 1.0, rank)
+        scores.add_score("acc")
+        scores.add_score_point("acc", 0.5, rank)
+    assert get_metrics(str(tmp_path)) == ["acc", "loss"]
+
+
+def test_converted_series_are_listed_once(tmp_path):
+    scores_folder = tmp_path / "scores"
+    scores_folder.mkdir()
+    scores = MultiScores(str(scores_folder))
+    for name in ("loss", "acc"):
+        scores.add_score(name)
+        scores.add_score_point(name, 1.0, 0)
+    # les fichiers texte sont gardés à côté des binaires
+    convert_scores_folder(str(scores_folder))
+    assert get_metrics(str(tmp_path)) == ["acc", "loss"]
+    assert list_score_files(str(scores_folder))["loss"] == [str(scores_folder / "loss.bin")]
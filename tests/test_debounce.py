@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from xview.utils.debounce import Debouncer, flush_all_debouncers
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_first_call_runs_and_later_ones_are_coalesced():
+    calls = []
+    debouncer = Debouncer(lambda: calls.append(time.monotonic()), interval=0.3)
+    debouncer.touch()
+    assert len(calls) == 1 and not debouncer.pending
+    for _ in range(10):
+        debouncer.touch()
+    assert len(calls) == 1 and debouncer.pending
+
+    # le timer de fin d'intervalle exécute une seule fois les appels en attente
+    deadline = time.monotonic() + 5
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.1)
+    assert len(calls) == 2 and not debouncer.pending
+    assert calls[1] - calls[0] >= 0.3
+
+
+def test_flush_and_cancel():
+    calls = []
+    debouncer = Debouncer(lambda: calls.append(1), interval=60)
+    debouncer.touch()
+    debouncer.touch()
+    debouncer.flush()
+    assert len(calls) == 2
+    debouncer.flush()
+    assert len(calls) == 2
+
+    debouncer.touch()
+    debouncer.cancel()
+    flush_all_debouncers()
+    assert len(calls) == 2
+
+    debouncer.touch()
+    flush_all_debouncers()
+    assert len(calls) == 3
+
+
+def test_pending_infos_are_written_at_exit(tmp_path):
+    folder = tmp_path / "exps"
+    code = ("import xview.experiment\n"
+            f"xview.experiment.get_config_data = lambda key: {str(folder)!r}\n"
+            "xview.experiment.EXP_INFOS_DEBOUNCE = 60\n"
+            "exp = xview.experiment.Experiment('run')\n"
+            "for epoch in range(5):\n"
+            "    exp.set_info('epoch', epoch)\n")
+    env = dict(os.environ, XVIEW_SKIP_VERSION_CHECK="1")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT, env=env)
+    with open(folder / "run" / "exp_infos.json") as f:
+        assert json.load(f) == {"epoch": 4}
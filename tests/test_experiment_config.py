@@ -0,0 +1,53 @@
+import json
+
+import xview.experiment
+from xview.experiment import Experiment
+
+
+def _config(exp):
+    with open(exp.exp_config_path) as f:
+        return json.load(f)
+
+
+def test_new_metric_monitoring_is_written_at_once(data_folder):
+    exp = Experiment("run")
+    exp.add_score("loss", 1.0, monitor="min")
+    exp.add_score("acc", 0.5)
+    # le GUI peut lire acc.txt dès maintenant : son mode doit déjà être sur disque
+    assert _config(exp)["scores_monitoring"] == {"loss": "min", "acc": "max,min"}
+
+    exp.add_scores({"f1": 0.1, "acc": 0.6}, monitor="max")
+    assert _config(exp)["scores_monitoring"]["f1"] == "max"
+    exp.close()
+
+
+def test_changed_keys_are_debounced_and_flushed_on_close(data_folder, monkeypatch):
+    monkeypatch.setattr(xview.experiment, "EXP_CONFIG_DEBOUNCE", 60)
+    exp = Experiment("run")
+    exp.set_exp_config_data("x_min", 0)
+    exp.add_score("loss", 1.0)
+    # le premier changement d'une clé existante est écrit, les suivants attendent l'intervalle
+    exp.set_exp_config_data("x_min", 5)
+    exp.set_exp_config_data("x_min", 10)
+    exp.add_score("loss", 0.9, monitor="min")
+    assert _config(exp)["x_min"] == 5
+    assert _config(exp)["scores_monitoring"] == {"loss": "max,min"}
+    # les lectures voient les changements en attente
+    assert exp.get_exp_config_data("x_min") == 10
+
+    exp.close()
+    assert _config(exp)["x_min"] == 10
+    assert _config(exp)["scores_monitoring"] == {"loss": "min"}
+
+
+def test_infos_are_flushed_on_status_update_and_close(data_folder):
+    exp = Experiment("run", infos={"lr": 0.1})
+    exp.set_info("epoch", 1)
+    exp.set_info("epoch", 2)
+    exp.set_train_status()
+    with open(exp.infos_path) as f:
+        assert json.load(f) == {"lr": 0.1, "epoch": 2}
+    exp.set_info("epoch", 3)
+    exp.close()
+    with open(exp.infos_path) as f:
+        assert json.load(f)["epoch"] == 3
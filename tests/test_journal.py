@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from xview.experiment import Experiment
+from xview.journal import JOURNAL_FILE, SNAPSHOT_FILE, read_journal_state
+
+
+def _log(exp, start, stop):
+    for i in range(start, stop):
+        exp.add_score("loss", 1.0 / (i + 1), x=i)
+        exp.add_score("acc", i / 100.0, x=i)
+    exp.add_flag("epoch", x=stop)
+
+
+@pytest.mark.parametrize("buffered", [False, True])
+def test_compacted_journal_reopens_with_the_same_points(data_folder, buffered):
+    exp = Experiment("run", storage="journal", buffered=buffered, infos={"lr": 0.1})
+    _log(exp, 0, 50)
+    exp.set_info("epoch", 1)
+    exp.add_flag("best", x=10, unique=True)
+    exp.add_flag("best", x=30, unique=True)
+    before = exp.get_score("loss")
+
+    exp.compact()
+    folder = exp.get_folder()
+    assert os.path.getsize(os.path.join(folder, JOURNAL_FILE)) == 0
+    assert os.path.exists(os.path.join(folder, SNAPSHOT_FILE))
+    assert exp.get_score("loss") == before
+
+    # les enregistrements suivants repartent du numéro de séquence du snapshot
+    _log(exp, 50, 80)
+    exp.close()
+
+    exp = Experiment("run", storage="journal", buffered=buffered)
+    assert exp.journal.n_points("scores", "loss") == 80
+    assert exp.journal.n_points("flags", "epoch") == 2
+    assert exp.journal.n_points("flags", "best") == 1
+    assert exp.get_infos() == {"lr": 0.1, "epoch": 1}
+    x, y = exp.get_score("loss")
+    assert x == list(range(80))
+    assert y == [1.0 / (i + 1) for i in range(80)]
+
+    _log(exp, 80, 90)
+    exp.close()
+    state = read_journal_state(folder)
+    assert state["scores"]["acc"]["y"] == [i / 100.0 for i in range(90)]
+    assert state["flags"]["epoch"]["y"] == [50, 80, 90]
+    assert state["flags"]["best"]["y"] == [30]
+    assert state["config"]["scores_monitoring"] == {"loss": "max,min", "acc": "max,min"}
+
+
+def test_reader_ignores_a_partial_record(data_folder):
+    exp = Experiment("run", storage="journal")
+    _log(exp, 0, 5)
+    exp.close()
+    # écrivain interrompu au milieu d'une ligne
+    with open(os.path.join(exp.get_folder(), JOURNAL_FILE), "a") as f:
+        f.write('{"seq": 1000, "op": "sco')
+    assert read_journal_state(exp.get_folder())["scores"]["loss"]["x"] == list(range(5))
@@ -0,0 +1,69 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from xview.utils.utils import compute_moving_average, extend_moving_average
+
+
+def _baseline_moving_average(values, window_size=15):
+    # implémentation d'origine, en O(n * window_size)
+    means = []
+    for i in range(len(values)):
+        low = max(0, i - window_size + 1)
+        current_window = values[low: i + 1]
+        means.append(np.mean(current_window))
+    return means
+
+
+def _baseline_ema(values, window_size=15):
+    alpha = 2.0 / (window_size + 1)
+    state, means = 0.0, []
+    for t, value in enumerate(values, start=1):
+        state = (1 - alpha) * state + alpha * value
+        means.append(state / (1 - (1 - alpha) ** t))
+    return means
+
+
+SERIES = {
+    "large offset": np.random.default_rng(0).normal(1e6, 1.0, 20000),
+    "centered": np.random.default_rng(1).normal(0.0, 1.0, 5000),
+    "ramp": np.arange(3000) * 1e3,
+    "short": np.array([3.0, 1.0, 2.0]),
+}
+
+
+@pytest.mark.parametrize("name", list(SERIES))
+@pytest.mark.parametrize("window_size", [1, 2, 7, 15, 100])
+def test_sma_matches_the_baseline(name, window_size):
+    values = SERIES[name]
+    expected = np.array(_baseline_moving_average(values, window_size))
+    means = compute_moving_average(values, window_size)
+    if window_size <= 2:
+        np.testing.assert_array_equal(means, expected)
+    else:
+        # seul l'ordre des additions diffère : quelques ulps des valeurs de la fenêtre
+        assert np.max(np.abs(means - expected)) <= 8 * np.finfo(float).eps * np.max(np.abs(values))
+
+
+def test_sma_propagates_non_finite_values_like_np_mean():
+    values = np.array([1.0, np.nan, 2.0, 3.0, np.inf, 4.0, 5.0, -np.inf, np.inf, 6.0, 7.0, 8.0, 9.0])
+    for window_size in (1, 2, 3, 5):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            expected = np.array(_baseline_moving_average(values, window_size))
+        np.testing.assert_array_equal(compute_moving_average(values, window_size), expected)
+
+
+@pytest.mark.parametrize("mode", ["sma", "ema"])
+def test_extension_matches_a_full_computation(mode):
+    values = SERIES["large offset"][:3000]
+    full = compute_moving_average(values, 15, mode)
+    for cut in (0, 1, 14, 15, 1000, 2999, 3000):
+        extended = extend_moving_average(values, compute_moving_average(values[:cut], 15, mode), 15, mode)
+        np.testing.assert_allclose(extended, full, rtol=1e-12)
+
+
+def test_ema_matches_the_recursive_definition():
+    values = SERIES["centered"]
+    np.testing.assert_allclose(compute_moving_average(values, 15, "ema"), _baseline_ema(values, 15), rtol=1e-9, atol=1e-12)
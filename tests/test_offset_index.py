@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pytest
+
+from xview.experiment import Experiment
+from xview.score import Score
+from xview.utils.offset_index import OFFSET_INDEX_STRIDE, has_offset_index, read_offset_index, read_score_range
+
+
+def _fill(score, start, stop):
+    for i in range(start, stop):
+        score.add_score_point(0.5 * i, float(i))
+
+
+def test_index_is_opt_in(data_folder):
+    exp = Experiment("plain")
+    exp.add_score("loss", 1.0, x=0)
+    assert not os.path.exists(os.path.join(exp.scores_folder, ".index"))
+    assert not os.path.exists(os.path.join(exp.scores_folder, ".pyramid"))
+    exp.close()
+
+    exp = Experiment("indexed", offset_index=True)
+    for i in range(3000):
+        exp.add_score("loss", float(i), x=i)
+    assert list(exp.get_score("loss", x_min=1500, x_max=1502)[1]) == [1500.0, 1501.0, 1502.0]
+    assert has_offset_index(os.path.join(exp.scores_folder, "loss.txt"))
+    exp.close()
+
+
+@pytest.mark.parametrize("fmt", ["txt", "bin"])
+def test_range_reads_match_a_full_read(tmp_path, fmt):
+    score = Score("loss", str(tmp_path), fmt=fmt, offset_index=True)
+    _fill(score, 0, 5000)
+    assert len(read_offset_index(score.score_file)) == -(-5000 // OFFSET_INDEX_STRIDE)
+    x, y = 0.5 * np.arange(5000), np.arange(5000, dtype=float)
+    for x_min, x_max, last_n in [(100, 700.25, None), (511.5, 512, None), (None, 10, None), (2600, None, None),
+                                 (None, None, 1), (None, None, 2048), (None, None, 9999), (0, 2000, 30), (-5, -1, None)]:
+        keep = np.ones(5000, dtype=bool)
+        if x_min is not None:
+            keep &= x >= x_min
+        if x_max is not None:
+            keep &= x <= x_max
+        expected_x, expected_y = x[keep], y[keep]
+        if last_n is not None:
+            expected_x, expected_y = expected_x[-last_n:], expected_y[-last_n:]
+        got_x, got_y = read_score_range(score.score_file, x_min, x_max, last_n)
+        np.testing.assert_array_equal(got_x, expected_x)
+        np.testing.assert_array_equal(got_y, expected_y)
+
+
+def test_stale_index_is_rebuilt_on_reopen(tmp_path):
+    score = Score("loss", str(tmp_path), offset_index=True)
+    _fill(score, 0, 1500)
+    # points ajoutés par un écrivain sans index
+    plain = Score("loss", str(tmp_path))
+    _fill(plain, 1500, 4000)
+
+    score = Score("loss", str(tmp_path), offset_index=True)
+    _fill(score, 4000, 4100)
+    assert len(read_offset_index(score.score_file)) == 5
+    np.testing.assert_array_equal(read_score_range(score.score_file, 1000, 1001)[1], [2000.0, 2001.0, 2002.0])
+
+
+def test_decreasing_x_drops_the_index(tmp_path):
+    score = Score("loss", str(tmp_path), offset_index=True)
+    _fill(score, 0, 10)
+    score.add_score_point(0.0, -1.0)
+    assert not has_offset_index(score.score_file)
+    np.testing.assert_array_equal(read_score_range(score.score_file, 0, 0)[1], [0.0, -1.0])
@@ -0,0 +1,46 @@
+import threading
+
+from xview.experiment import Experiment
+
+
+def test_mirror_gets_the_calls_and_stays_open(data_folder):
+    exp = Experiment("run")
+    mirror = Experiment("mirror", group="backup", async_mode=True)
+    exp.pipe_to(mirror)
+    for i in range(100):
+        exp.add_score("loss", float(i), x=i)
+    exp.set_info("lr", 0.1)
+    exp.close()
+    assert list(mirror.get_score("loss")[1]) == [float(i) for i in range(100)]
+    assert mirror.get_infos()["lr"] == 0.1
+    # close() de la source ne ferme pas le miroir de l'appelant
+    assert not mirror._worker.closed
+    mirror.add_score("loss", 100.0, x=100)
+    mirror.flush()
+    assert len(mirror.get_score("loss")[1]) == 101
+    mirror.close()
+
+
+def test_dropped_pipe_calls_are_reported(data_folder, capsys):
+    exp = Experiment("run")
+    mirror = Experiment("mirror", group="backup")
+    started, release = threading.Event(), threading.Event()
+    add_score = mirror.add_score
+
+    def slow_add_score(*args, **kwargs):
+        started.set()
+        release.wait()
+        add_score(*args, **kwargs)
+    mirror.add_score = slow_add_score
+
+    exp.pipe_to(mirror, max_queue_size=2, backpressure="drop")
+    exp.add_score("loss", 0.0, x=0)
+    started.wait()
+    for i in range(1, 6):
+        exp.add_score("loss", float(i), x=i)
+    release.set()
+    exp.close()
+    assert exp.get_pipe_stats()["mirror"]["dropped"] == 3
+    # un avertissement au premier appel ignoré, pas à chacun
+    assert capsys.readouterr().out.count("File du pipe vers mirror pleine") == 1
+    assert len(mirror.get_score("loss")[1]) == 3
@@ -0,0 +1,45 @@
+import json
+
+import numpy as np
+import pytest
+
+from xview.experiment import Experiment
+
+
+@pytest.mark.parametrize("buffered", [False, True])
+def test_reopened_experiment_knows_its_series(data_folder, buffered):
+    exp = Experiment("run", buffered=buffered, score_format="bin")
+    for i in range(20):
+        exp.add_score("loss", 1.0 / (i + 1), x=i, monitor="min")
+    exp.add_score("acc", 0.5, x=0)
+    exp.add_flag("epoch", x=10)
+    exp.close()
+
+    # le format par défaut a changé : les séries gardent celui de leur fichier
+    exp = Experiment("run", buffered=buffered)
+    assert sorted(exp.scores.scores) == ["acc", "loss"]
+    assert list(exp.flags.scores) == ["epoch"]
+    assert exp.scores.scores["loss"].score_file.endswith("loss.bin")
+    assert len(exp.scores) == 20
+    assert exp.scores_monitoring == {"loss": "min", "acc": "max,min"}
+    # un flag sans x se place après le dernier point
+    exp.add_flag("epoch")
+    exp.add_score("loss", 0.01, x=20, monitor="min")
+    exp.close()
+
+    x, y = exp.get_score("loss")
+    np.testing.assert_array_equal(x, np.arange(21))
+    assert y[-1] == 0.01
+    np.testing.assert_array_equal(exp.flags.get_score("epoch", get_x=False), [10, 20])
+    with open(exp.exp_config_path) as f:
+        assert json.load(f)["scores_monitoring"] == {"loss": "min", "acc": "max,min"}
+
+
+def test_cleared_experiment_starts_empty(data_folder):
+    exp = Experiment("run")
+    exp.add_score("loss", 1.0)
+    exp.close()
+    exp = Experiment("run", clear=True)
+    assert exp.scores.scores == {}
+    assert exp.scores_monitoring == {}
+    assert len(exp.scores) == 0
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from xview.utils.score_io import _parse_score_lines, parse_score_text, parse_complete_score_bytes, encode_bin_record
+
+
+@pytest.mark.parametrize("data", [
+    b"1,2\n3,4\n",
+    b"1\n2\n3",
+    b"  1,2\n3,4\n\n",
+    b"1,2\n3,abc\n5,6\n",
+    b"1\nabc\n2\n",
+    b"1,2\n,\n3,4\n",
+    b"1,2\n3,4,5\n6,7\n",
+    b"1,2\n3\n4,5\n",
+    b"1e3,-2.5\nnan,inf\n",
+    b"",
+    b"\n\n",
+])
+def test_fast_path_agrees_with_line_parser(data):
+    x, y = parse_score_text(data)
+    expected_x, expected_y = _parse_score_lines(data.strip())
+    np.testing.assert_array_equal(x, expected_x)
+    np.testing.assert_array_equal(y, expected_y)
+
+
+def test_malformed_lines_are_skipped():
+    x, y = parse_score_text(b"1,2\n3,abc\n5,6\n")
+    np.testing.assert_array_equal(x, [1.0, 5.0])
+    np.testing.assert_array_equal(y, [2.0, 6.0])
+    np.testing.assert_array_equal(parse_score_text(b"1\n2\n3")[1], [1.0, 2.0, 3.0])
+    assert len(parse_score_text(b"1\n2\n3")[0]) == 0
+
+
+def test_trailing_partial_record_is_ignored():
+    x, y = parse_complete_score_bytes(b"1,2\n3,4\n5,", is_bin=False)
+    np.testing.assert_array_equal(y, [2.0, 4.0])
+    data = encode_bin_record(1.0, 2.0) + encode_bin_record(3.0, 4.0)
+    x, y = parse_complete_score_bytes(data + data[:5], is_bin=True)
+    np.testing.assert_array_equal(x, [1.0, 3.0])
+    # série sans x : NaN dans le slot x
+    x, y = parse_complete_score_bytes(encode_bin_record(y=7.0), is_bin=True)
+    assert len(x) == 0 and list(y) == [7.0]
@@ -0,0 +1,138 @@
+import os
+import json
+
+import numpy as np
+import pytest
+
+from xview.score import Score
+from xview.utils.score_io import (SEGMENT_INDEX, segments_folder, read_segment_index, recover_segments, read_score_path,
+                                  read_score_bytes, parse_complete_score_bytes)
+from xview.utils.offset_index import ScoreOffsetIndex, read_offset_index
+from xview.utils.pyramid import LEAF_SIZE, ScorePyramid, read_pyramid_level
+
+
+def _log(score, start, stop, with_x=True):
+    for i in range(start, stop):
+        if with_x:
+            score.add_score_point(2 * i, float(i % 97))
+        else:
+            score.add_score_point(y=float(i % 97))
+
+
+def _expected(stop, with_x=True):
+    i = np.arange(stop)
+    return (2.0 * i if with_x else np.empty(0)), (i % 97).astype(float)
+
+
+def _assert_points(points, expected):
+    np.testing.assert_array_equal(points[0], expected[0])
+    np.testing.assert_array_equal(points[1], expected[1])
+
+
+@pytest.mark.parametrize("fmt", ["txt", "bin"])
+def test_interrupted_seal_is_recovered(tmp_path, fmt):
+    score = Score("loss", str(tmp_path), fmt=fmt, segment_points=100)
+    _log(score, 0, 250)
+    # arrêt entre le renommage du fichier actif et sa compression
+    folder = segments_folder(score.score_file)
+    pending = os.path.join(folder, f"seg_{len(read_segment_index(score.score_file)):06d}.pending")
+    os.replace(score.score_file, pending)
+    open(score.score_file, "ab").close()
+    assert read_segment_index(score.score_file)[-1]["compression"] is None
+    _assert_points(read_score_path(score.score_file), _expected(250))
+
+    recover_segments(score.score_file)
+    segments = read_segment_index(score.score_file)
+    assert not os.path.exists(pending)
+    assert all(segment["compression"] == "zlib" for segment in segments)
+    assert [segment["n_points"] for segment in segments] == [100, 100, 50]
+    _assert_points(read_score_path(score.score_file), _expected(250))
+
+
+def test_stale_pending_file_is_not_read_twice(tmp_path):
+    score = Score("loss", str(tmp_path), segment_points=100)
+    _log(score, 0, 200)
+    # arrêt après l'écriture de l'index, avant la suppression du fichier pending
+    with open(os.path.join(segments_folder(score.score_file), SEGMENT_INDEX)) as f:
+        last = json.load(f)[-1]
+    stale = os.path.join(segments_folder(score.score_file), f"seg_{len(read_segment_index(score.score_file)) - 1:06d}.pending")
+    with open(stale, "wb") as f:
+        f.write(read_score_bytes(score.score_file, last["start_offset"], last["start_offset"] + last["raw_bytes"]))
+
+    recover_segments(score.score_file)
+    assert not os.path.exists(stale)
+    _assert_points(read_score_path(score.score_file), _expected(200))
+
+
+@pytest.mark.parametrize("fmt", ["txt", "bin"])
+@pytest.mark.parametrize("buffered", [False, True])
+def test_reopen_after_sealing(tmp_path, fmt, buffered):
+    score = Score("loss", str(tmp_path), fmt=fmt, buffered=buffered, segment_points=100, pyramid=True, offset_index=True)
+    _log(score, 0, 250)
+    score.close()
+
+    score = Score("loss", str(tmp_path), fmt=fmt, buffered=buffered, segment_points=100, pyramid=True, offset_index=True)
+    assert len(score) == 250
+    _log(score, 250, 420)
+    score.close()
+    assert len(score) == 420
+    assert [segment["n_points"] for segment in read_segment_index(score.score_file)] == [100, 100, 100, 100]
+    _assert_points(score.read_scores(), _expected(420))
+
+
+@pytest.mark.parametrize("fmt", ["txt", "bin"])
+@pytest.mark.parametrize("with_x", [True, False])
+def test_range_reads_span_segments(tmp_path, fmt, with_x):
+    score = Score("loss", str(tmp_path), fmt=fmt, segment_points=700, offset_index=True)
+    _log(score, 0, 3000, with_x)
+    x, y = _expected(3000, with_x)
+    steps = x if with_x else np.arange(3000, dtype=float)
+
+    for x_min, x_max in [(None, None), (1000, 1600), (1390, 1410), (None, 800), (5000, None), (2 * 2999, None)]:
+        keep = np.ones(3000, dtype=bool)
+        if x_min is not None:
+            keep &= steps >= x_min
+        if x_max is not None:
+            keep &= steps <= x_max
+        _assert_points(score.read_scores(x_min=x_min, x_max=x_max), (x[keep] if with_x else x, y[keep]))
+
+        if with_x:
+            # read_score_path ne décompresse que les segments utiles, sans couper aux bornes
+            x_read, _ = read_score_path(score.score_file, x_min, x_max)
+            assert np.isin(x[keep], x_read).all()
+            if x_min is not None or x_max is not None:
+                assert len(x_read) < 3000
+
+    for last_n in [1, 300, 701, 1500, 2999, 5000]:
+        _assert_points(score.read_scores(last_n=last_n), (x[-last_n:] if with_x else x, y[-last_n:]))
+    _assert_points(score.read_scores(x_min=1000, x_max=1600, last_n=50),
+                   (x[steps <= 1600][-50:] if with_x else x, y[steps <= 1600][-50:]))
+
+
+@pytest.mark.parametrize("fmt", ["txt", "bin"])
+def test_sidecar_offsets_survive_seals(tmp_path, fmt):
+    score = Score("loss", str(tmp_path), fmt=fmt, segment_points=500, pyramid=True, offset_index=True)
+    _log(score, 0, 3000)
+    score.close()
+    assert len(read_segment_index(score.score_file)) == 6
+    is_bin = fmt == "bin"
+
+    # chaque enregistrement de l'index pointe sur le début de son point, segments compris
+    index = np.array(read_offset_index(score.score_file))
+    for record in index:
+        x, _ = parse_complete_score_bytes(read_score_bytes(score.score_file, int(record["offset"])), is_bin)
+        assert x[0] == record["x"] == 2 * record["index"]
+    ScoreOffsetIndex(score.score_file).rebuild()
+    np.testing.assert_array_equal(read_offset_index(score.score_file), index)
+
+    # chaque bucket du niveau 0 finit après son dernier point
+    leaves = np.array(read_pyramid_level(score.score_file, 0))
+    for i, record in enumerate(leaves):
+        _, y = parse_complete_score_bytes(read_score_bytes(score.score_file, 0, int(record["end_offset"])), is_bin)
+        assert len(y) == (i + 1) * LEAF_SIZE
+    levels = [np.array(read_pyramid_level(score.score_file, level)) for level in range(4)]
+    ScorePyramid(score.score_file).rebuild()
+    for level, records in enumerate(levels):
+        rebuilt = read_pyramid_level(score.score_file, level)
+        for field in records.dtype.names:
+            np.testing.assert_allclose(rebuilt[field], records[field])
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from xview.experiment import Experiment
+from xview.utils.score_io import merge_shards
+
+
+@pytest.mark.parametrize("score_format", ["txt", "bin"])
+def test_ranks_are_merged_by_step(data_folder, score_format):
+    ranks = [Experiment("run", rank=rank, score_format=score_format) for rank in range(3)]
+    # chaque rank logge un pas sur trois, à son rythme
+    for step in range(30):
+        ranks[step % 3].add_score("loss", float(step), x=step)
+    ranks[1].add_score("acc", 0.5, x=100)
+    for exp in ranks:
+        exp.close()
+
+    for exp in ranks + [Experiment("run", check_exists=True)]:
+        x, y = exp.get_score("loss")
+        np.testing.assert_array_equal(x, np.arange(30))
+        np.testing.assert_array_equal(y, np.arange(30))
+        np.testing.assert_array_equal(exp.get_score("loss", x_min=10, x_max=14)[1], [10, 11, 12, 13, 14])
+        np.testing.assert_array_equal(exp.get_score("loss", last_n=4)[0], [26, 27, 28, 29])
+    assert len(ranks[0].scores.scores["loss"]) == 10
+
+
+def test_merge_shards():
+    x, y = merge_shards([([0, 2, 4], [0.0, 2.0, 4.0]), ([], []), ([1, 3], [1.0, 3.0])])
+    np.testing.assert_array_equal(x, [0, 1, 2, 3, 4])
+    np.testing.assert_array_equal(y, [0, 1, 2, 3, 4])
+    # un pas logué par deux ranks garde l'ordre des shards
+    np.testing.assert_array_equal(merge_shards([([0, 1], [1.0, 2.0]), ([1], [3.0])])[1], [1.0, 2.0, 3.0])
+
+    # sans x, les shards sont fusionnés par indice de point
+    x, y = merge_shards([([], [0.0, 2.0, 4.0]), ([], [1.0, 3.0])])
+    assert len(x) == 0
+    np.testing.assert_array_equal(y, [0, 1, 2, 3, 4])
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import pytest
+
+from xview.score import Score
+from xview.utils.score_io import encode_bin_record, read_score_path
+from xview.utils.tail_reader import ScoreTailReader
+
+
+def _append(path, data):
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def _assert_points(points, x, y):
+    np.testing.assert_array_equal(points[0], x)
+    np.testing.assert_array_equal(points[1], y)
+
+
+def test_appended_lines_are_parsed_once_complete(tmp_path):
+    path = str(tmp_path / "loss.txt")
+    reader = ScoreTailReader(path)
+    _assert_points(reader.read(), [], [])
+    _append(path, b"0,1.0\n1,2.0\n2,")
+    _assert_points(reader.read(), [0, 1], [1.0, 2.0])
+    # la fin de la ligne coupée arrive au rafraîchissement suivant
+    _append(path, b"3.0\n3,4.0\n")
+    _assert_points(reader.read(), [0, 1, 2, 3], [1.0, 2.0, 3.0, 4.0])
+    assert reader._offset == os.path.getsize(path)
+
+
+def test_partial_binary_record(tmp_path):
+    path = str(tmp_path / "loss.bin")
+    reader = ScoreTailReader(path)
+    record = encode_bin_record(1.0, 2.0)
+    _append(path, encode_bin_record(0.0, 1.0) + record[:5])
+    _assert_points(reader.read(), [0.0], [1.0])
+    _append(path, record[5:])
+    _assert_points(reader.read(), [0.0, 1.0], [1.0, 2.0])
+
+
+def test_truncated_file_is_read_again(tmp_path):
+    path = str(tmp_path / "loss.txt")
+    reader = ScoreTailReader(path)
+    _append(path, b"0,1.0\n1,2.0\n")
+    reader.read()
+    with open(path, "wb") as f:
+        f.write(b"0,5.0\n")
+    _assert_points(reader.read(), [0], [5.0])
+    os.remove(path)
+    _assert_points(reader.read(), [], [])
+
+
+def test_in_place_rewrite_of_the_same_size_is_detected(tmp_path):
+    score = Score("best", str(tmp_path))
+    reader = ScoreTailReader(score.score_file)
+    score.add_score_point(x=10, unique=True)
+    _assert_points(reader.read(), [], [10])
+    # même taille, même inode : seule la signature change
+    score.add_score_point(x=20, unique=True)
+    _assert_points(reader.read(), [], [20])
+    score.add_score_point(x=300, unique=True)
+    _assert_points(reader.read(), [], [300])
+
+
+def test_replaced_file_is_read_again(tmp_path):
+    path = str(tmp_path / "loss.txt")
+    reader = ScoreTailReader(path)
+    _append(path, b"0,1.0\n1,2.0\n")
+    reader.read()
+    # rotation : nouveau fichier plus long, renommé par-dessus l'ancien
+    other = str(tmp_path / "loss.tmp")
+    _append(other, b"0,7.0\n1,8.0\n2,9.0\n")
+    os.replace(other, path)
+    _assert_points(reader.read(), [0, 1, 2], [7.0, 8.0, 9.0])
+
+
+@pytest.mark.parametrize("fmt", ["txt", "bin"])
+def test_sealed_segments_are_kept_in_front(tmp_path, fmt):
+    score = Score("loss", str(tmp_path), fmt=fmt, segment_points=100)
+    reader = ScoreTailReader(score.score_file)
+    for stop in (40, 100, 130, 250, 251):
+        for i in range(len(score), stop):
+            score.add_score_point(float(i), 2 * i)
+        x, y = reader.read()
+        _assert_points((x, y), *read_score_path(score.score_file))
+        assert len(y) == stop
@@ -5,7 +5,7 @@ ensures missing keys are populated from defaults. Also ships default palettes.
 """
 
 import os
-import json
+from xview.utils.utils import read_json_cached, write_json
 
 # /home/<username>/.xview/config.json
 ENVIRON_CONFIG_PATH = os.getenv("XVIEW_PATH", None)
@@ -31,6 +31,7 @@ default_config = {
     "ma_curves_alpha": 0.5,
     "palette_name": "default",
     "ma_window_size": 15,
+    "ma_mode": "sma",  # "sma" ou "ema"
     "update_interval": 60,
     "remote_fetch_interval": 10,
     "dark_mode": False,
@@ -127,12 +128,13 @@ def config_exists():
 def get_config_file():
     """Load and return the entire config JSON as a dict.
 
+    The file is parsed again only when it changed on disk (see read_json_cached).
     Raises FileNotFoundError if the config does not exist.
     """
-    if not os.path.exists(CONFIG_FILE_PATH):
+    try:
+        return read_json_cached(CONFIG_FILE_PATH)
+    except FileNotFoundError:
         raise FileNotFoundError(f"No config file found, launch config.py before running any xview functions.")
-    config = json.load(open(CONFIG_FILE_PATH))
-    return config
 
 
 def get_config_data(key):
@@ -141,9 +143,8 @@ def get_config_data(key):
 
 
 def set_config_file(config):
-    """Write the full config dict to disk with indentation."""
-    with open(CONFIG_FILE_PATH, 'w') as f:
-        json.dump(config, f, indent=4)
+    """Write the full config dict to disk with indentation, atomically."""
+    write_json(CONFIG_FILE_PATH, config)
 
 
 def set_config_data(key, value):
@@ -173,5 +174,4 @@ def check_config_integrity():
     set_config_data("version", default_config["version"])  # Ensure version is set to the default version
 
     if not os.path.exists(os.path.join(CONFIG_FILE_DIR, "palette_config.json")):
-        with open(os.path.join(CONFIG_FILE_DIR, "palette_config.json"), 'w') as f:
-            json.dump(default_palette_config, f, indent=4)
+        write_json(os.path.join(CONFIG_FILE_DIR, "palette_config.json"), default_palette_config)
@@ -1,12 +1,40 @@
 """Utilities to inspect experiment folders for available metrics."""
 
 import os
+import numpy as np
+from xview.utils.score_io import list_score_files, read_score_path
+from xview.utils.pyramid import has_pyramid, read_pyramid_extrema
+from xview.journal import has_journal, read_journal_state
 
 
 def get_metrics(exp_folder):
-    """Return metric names (without .txt) found under exp_folder/scores."""
-    scores_folder = os.path.join(exp_folder, "scores")
-    scores_files = os.listdir(scores_folder)
-    # garder uniquement les dossiers
-    metrics = [f.replace(".txt", "") for f in sorted(scores_files)]
-    return metrics
+    """Return the sorted metric names found under exp_folder/scores, once per series (shards and formats grouped)."""
+    if has_journal(exp_folder):
+        return sorted(read_journal_state(exp_folder)["scores"].keys())
+    return sorted(list_score_files(os.path.join(exp_folder, "scores")))
+
+
+def get_journal_metric(exp_folder, metric):
+    """Return the y values of a metric of a journal experiment, or None if absent."""
+    series = read_journal_state(exp_folder)["scores"].get(metric)
+    return None if series is None else series["y"]
+
+
+def get_metric_extrema(score_files):
+    """Return (min, max) of a metric over its score files, read from their pyramids when available.
+
+    Returns None when every file is empty.
+    """
+    y_min, y_max = None, None
+    for score_file in score_files:
+        extrema = read_pyramid_extrema(score_file) if has_pyramid(score_file) else None
+        if extrema is None:
+            _, y = read_score_path(score_file)
+            if len(y) == 0:
+                continue
+            extrema = (np.min(y), np.max(y))
+        y_min = extrema[0] if y_min is None else min(y_min, extrema[0])
+        y_max = extrema[1] if y_max is None else max(y_max, extrema[1])
+    if y_min is None:
+        return None
+    return y_min, y_max
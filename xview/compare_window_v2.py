@@ -8,7 +8,9 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from xview import get_config_data
 import os
-from xview.compare_utils import get_metrics
+from xview.compare_utils import get_metrics, get_journal_metric, get_metric_extrema
+from xview.journal import has_journal
+from xview.utils.score_io import read_score_path, list_score_files
 import numpy as np
 import subprocess
 import tempfile
@@ -181,7 +183,7 @@ class ComparisonWindow(QDialog):
         group_folder = os.path.join(experiments_folder, self.group_path)
         exps = os.listdir(group_folder)
         # garder uniquement les dossiers
-        exps = [d for d in sorted(exps) if os.path.isdir(os.path.join(group_folder, d))]
+        exps = [d for d in sorted(exps) if os.path.isdir(os.path.join(group_folder, d)) and not d.startswith(".")]
 
         for exp in exps:
             exp_folder = os.path.join(group_folder, exp)
@@ -248,17 +250,9 @@ class ComparisonWindow(QDialog):
 
     @staticmethod
     def read_scores(file_path):
-        """Read scores from a .txt file; lines are either 'y' or 'x,y'."""
+        """Read y values from a .txt file (lines 'y' or 'x,y') or a binary .bin file."""
         if os.path.exists(file_path):
-            with open(file_path, "r") as f:
-                lines = f.readlines()
-            y = []
-            for line in lines:
-                values = line.strip().split(",")
-                if len(values) == 1:
-                    y.append(float(values[0]))
-                else:
-                    y.append(float(values[1]))
+            _, y = read_score_path(file_path)
             return y
 
         else:
@@ -279,10 +273,16 @@ class ComparisonWindow(QDialog):
             best_scores = []
 
             for exp in exps:
-                scores_folder = os.path.join(group_folder, exp, "scores")
-                if os.path.exists(os.path.join(scores_folder, f"{selected_metric}.txt")):
-                    score = self.read_scores(os.path.join(scores_folder, f"{selected_metric}.txt"))
-                    best_scores.append(np.min(score) if min_max == "min" else np.max(score))
+                exp_folder = os.path.join(group_folder, exp)
+                if has_journal(exp_folder):
+                    score = get_journal_metric(exp_folder, selected_metric)
+                    extrema = None if score is None else (np.min(score), np.max(score))
+                else:
+                    # une expérience multi-process a un fichier par rank ; min/max lus dans les pyramides
+                    score_files = list_score_files(os.path.join(exp_folder, "scores")).get(selected_metric)
+                    extrema = None if score_files is None else get_metric_extrema(score_files)
+                if extrema is not None:
+                    best_scores.append(extrema[0] if min_max == "min" else extrema[1])
 
             if best_scores:
                 # trier les scores par ordre croissant en les gardant alignés avec le nom de l'exp
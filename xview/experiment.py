@@ -1,11 +1,44 @@
 """Experiment abstraction to create, track, and log metrics/flags on disk."""
 
 import os
+import copy
+import contextlib
+import functools
+import threading
 from xview.utils.utils import *
+from xview.utils.debounce import Debouncer
+from xview.utils.file_lock import file_lock
 from xview.score import MultiScores
+from xview.journal import ExperimentJournal
 import shutil
 from xview.version.update_project import warn_if_outdated
 from xview import get_config_data
+from xview.utils.async_writer import AsyncWriter
+from xview.utils.score_io import slice_scores
+from xview.utils.histogram import HistogramSeries, HISTOGRAM_BINS, compute_histogram, read_histograms
+from xview.utils.artifacts import store_folder, store_blob, blob_path, read_artifacts, write_artifacts
+
+
+EXP_CONFIG_DEBOUNCE = 1.0  # in seconds, min delay between two config.json writes
+EXP_INFOS_DEBOUNCE = 0.5  # in seconds, min delay between two exp_infos.json writes by set_info
+PIPE_DROP_WARNING_EVERY = 1000  # un avertissement au premier appel ignoré par un pipe, puis tous les N
+
+
+def deferred(method):
+    """Run the method on the experiment's writer thread when async mode is on.
+
+    The call is queued and returns None immediately; arguments are captured by
+    reference, so mutable ones (dicts) should not be modified afterwards. Once
+    the writer is closed, calls run synchronously, as without async mode.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        worker = self._worker
+        if worker is not None and not worker.closed and not worker.in_worker_thread():
+            worker.submit(method, self, *args, **kwargs)
+            return None
+        return method(self, *args, **kwargs)
+    return wrapper
 
 
 @warn_if_outdated
@@ -17,7 +50,9 @@ class Experiment(object):
     and keep a small JSON config for per-experiment settings.
     """
 
-    def __init__(self, name, infos=None, group=None, clear=None, check_exists=False):
+    def __init__(self, name, infos=None, group=None, clear=None, check_exists=False, buffered=False, score_format="txt", storage="files",
+                 async_mode=False, max_queue_size=10000, backpressure="block", rank=None, pyramid=False,
+                 segment_points=None, segment_mb=None, compression="zlib", offset_index=False, live=False):
         """Object to manage an experiment folder.
         This class creates a folder for the experiment, manages its status, scores, and flags.
         It also allows to store and retrieve information about the experiment in a JSON file.
@@ -26,6 +61,7 @@ class Experiment(object):
             └── group_name/
                 └── experiment_name/
                     ├── exp_infos.json
+                    ├── artifacts.json
                     ├── status.txt
                     ├── scores_training.txt
                     ├── scores_validation.txt
@@ -36,8 +72,19 @@ class Experiment(object):
         The `name` parameter is the name of the experiment, which will be used to create the folder and files.
         The `infos` parameter allows to set initial information for the experiment, which will be stored in a JSON file.
         The 'group' parameter allows to create a subfolder for the experiment, useful for organizing multiple experiments under a common group name.
-        The `clear` parameter allows to delete the experiment folder if it already exists.
+        The `clear` parameter allows to delete the experiment folder if it already exists. Otherwise, an existing experiment is resumed: the series found in `scores/` and `flags/` are registered (point counts are read lazily, no point is parsed) and the monitoring modes are restored from `config.json`.
         The `check_exists` parameter raises an error if the experiment folder does not exist when set to True. It also ignore the `clear` parameter.
+        The `buffered` parameter keeps score and flag files open and batches points in memory. Buffers are flushed when they grow large, after at most one second, on status updates, on `flush()`/`close()` and at interpreter exit.
+        The `score_format` parameter selects how score points are stored: "txt" for `x,y` lines, or "bin" for fixed-width float64 records read back with `numpy.memmap`. Text files can be converted with `xview.utils.score_io.convert_scores_folder`.
+        The `storage` parameter selects where mutations go: "files" for the layout above, or "journal" to append every mutation (score point, flag, infos, status, monitor mode) to a single `journal.log` file, folded into `journal_snapshot.json` by `compact()`. `status.txt` is still written in journal mode since the GUI lists experiments from it.
+        The `async_mode` parameter moves all disk writes to a dedicated writer thread: `add_score`, `add_scores`, `add_flag`, `set_info(s)`, `update_status` and config updates are queued and return immediately. The queue holds at most `max_queue_size` calls; when full, `backpressure="block"` waits for room and `backpressure="drop"` discards the call. Use `flush()`/`close()` to wait for pending writes (done at exit too), and `get_logging_stats()` for queue depth and write latency. Writes made after `close()` are done synchronously, as without async mode.
+        The `rank` parameter enables multi-process logging (e.g. DDP) where several processes open the same experiment. Each rank appends its points to its own shard `scores/<name>.rank<k>.txt`, without any lock on this hot path, and readers merge shards by step. Shared JSON files (infos, config) are updated under an advisory file lock and replaced atomically, keys are merged instead of overwritten. Only rank 0 writes `status.txt`, the plt_args/label files and honours `clear`. Pass "auto" to read the rank from the RANK (or LOCAL_RANK) environment variable. Not available with journal storage.
+        The `pyramid` parameter maintains, for each score series, a multi-resolution min/max/mean summary in `scores/.pyramid/` as points are appended, so that the GUI draws long curves without reading every point. It is resumed when an existing series is reopened. Off by default: worth it for series of several hundred thousand points.
+        The `segment_points` and `segment_mb` parameters roll score files over once they hold that many points or megabytes: older points are sealed into compressed segments (`compression` is "zlib" or "lzma") under `scores/.segments/`, with an index of their x ranges, and only the active file stays plain. Readers decompress only the segments they need, and remote syncs only transfer the new segment and the active file.
+        The `offset_index` parameter maintains, for each score series, a sparse index of the byte offset of every 1024th point in `scores/.index/`, so that `get_score(name, x_min=..., x_max=..., last_n=...)` seeks straight to the requested range instead of parsing the whole file. A missing index is rebuilt on the first append or range query. Off by default: without it, range queries read the whole series then slice it.
+        Distributions (weights, activations...) are logged with `add_histogram(name, values, x)`: each call stores quantiles, min/max/mean/std and fixed-bin counts as one fixed-width record in `histograms/<name>.hist`, drawn by the GUI as quantile bands.
+        Files such as an architecture diagram are attached with `add_artifact(name, path_or_bytes)`: their content is stored once per data folder in `data_folder/.artifacts/`, addressed by its SHA-256, and the experiment only keeps a reference in `artifacts.json`. The same file attached to every run of a sweep takes the disk space of one, and copying or moving an experiment only copies its references.
+        The `live` parameter publishes every score point into a shared memory ring buffer registered in `data_folder/.live/`, so that a GUI running on the same machine draws new points within a fraction of a second without reading the score files. Files are still written as usual and remain the reference: the buffer only keeps the last points, and a GUI that misses some gets them from disk. Requires storage="files" and no rank.
 
         The 'data_folder' is read from the configuration file, and defaults to '~/.xview/exps/' if not set. You can change this in the configuration file, or by running the `config.py` script.
         Args:
@@ -46,17 +93,45 @@ class Experiment(object):
             group (string, optional): Name of the group in which to put the experiment. Defaults to None.
             clear (bool, optional): Set to True if you want to erase the experiment before running. Defaults to None.
             check_exists (bool, optional): Set to True if you want to assert the existence of the experiment in security, ignoring the clear parameter. Useful for inference for example. Defaults to False.
+            buffered (bool, optional): Set to True to batch score and flag writes in memory. Useful for step-level logging. Defaults to False.
+            score_format (string, optional): "txt" or "bin". Defaults to "txt".
+            storage (string, optional): "files" or "journal". Defaults to "files".
+            async_mode (bool, optional): Set to True to write from a background thread. Defaults to False.
+            max_queue_size (int, optional): Max number of queued calls in async mode. Defaults to 10000.
+            backpressure (string, optional): "block" or "drop", policy when the queue is full. Defaults to "block".
+            rank (int or string, optional): Rank of this process for multi-process logging, or "auto". Defaults to None.
+            pyramid (bool, optional): Set to True to maintain multi-resolution summaries of scores. Defaults to False.
+            segment_points (int, optional): Number of points after which a score file is sealed. Defaults to None (no rollover).
+            segment_mb (float, optional): Size in MB after which a score file is sealed. Defaults to None (no rollover).
+            compression (string, optional): "zlib" or "lzma", compression of sealed segments. Defaults to "zlib".
+            offset_index (bool, optional): Set to True to maintain the offset index used by range queries. Defaults to False.
+            live (bool, optional): Set to True to publish score points to a GUI on the same machine through shared memory. Defaults to False.
 
         Raises:
             FileNotFoundError: _description_
         """
+        self._worker = None
         self.name = name
         self.group = group
         self.check_exists = check_exists
+        self.buffered = buffered
+        self.score_format = score_format
+        assert storage in ("files", "journal"), f"Unknown storage mode {storage}."
+        self.storage = storage
+        if rank == "auto":
+            rank = int(os.environ.get("RANK", os.environ.get("LOCAL_RANK", 0)))
+        assert rank is None or storage == "files", "Multi-process logging (rank) requires storage='files'."
+        assert not live or (storage == "files" and rank is None), "The live channel requires storage='files' and no rank."
+        self.rank = rank
+        self.is_main_rank = rank is None or rank == 0
         self.pipes = list()
+        self._pipe_writers = {}  # id(pipe) -> AsyncWriter livrant les appels à ce miroir
 
         # lecture du fichier de config et création du dossier de l'expérience
         self.data_folder = get_config_data("data_folder")
+        # artefacts et canaux live sont partagés par toutes les expériences du data_folder, groupes compris
+        self.root_folder = self.data_folder
+        self.artifacts_store = store_folder(self.root_folder)
 
         if self.group is not None:
             self.data_folder = os.path.join(self.data_folder, self.group)
@@ -69,13 +144,21 @@ class Experiment(object):
             if not exists:
                 raise FileNotFoundError(f"Experiment folder {self.experiment_folder} does not exist.")
 
-        if clear == True and os.path.exists(self.experiment_folder):
+        if clear == True and self.is_main_rank and os.path.exists(self.experiment_folder):
             shutil.rmtree(self.experiment_folder)
 
         os.makedirs(self.experiment_folder, exist_ok=True)
 
+        self.journal = None
+        if self.storage == "journal":
+            self.journal = ExperimentJournal(self.experiment_folder, buffered=self.buffered)
+
         # créer le fichier d'infos si donnés
         self.infos_path = os.path.join(self.experiment_folder, "exp_infos.json")
+        # set_info met à jour self.infos tout de suite ; le fichier est réécrit au plus une fois par EXP_INFOS_DEBOUNCE
+        self._infos_lock = threading.RLock()
+        self._infos_pending = {}
+        self._infos_debouncer = Debouncer(self.flush_infos, EXP_INFOS_DEBOUNCE)
         self.infos = self.get_infos()
         if infos is not None:
             self.set_infos(infos)
@@ -83,7 +166,10 @@ class Experiment(object):
         # créer le fichier de status
         self.status = "init"
         self.status_file = os.path.join(self.experiment_folder, "status.txt")
-        write_file(self.status_file, self.status, flag="w")
+        if self.journal is not None:
+            self.journal.append("status", status=self.status)
+        if self.is_main_rank:
+            write_file(self.status_file, self.status, flag="w")
 
         # fichier de score training
         self.score_file_training = os.path.join(self.experiment_folder, "scores_training.txt")
@@ -92,55 +178,183 @@ class Experiment(object):
 
         #  dossier de scores
         self.scores_folder = os.path.join(self.experiment_folder, "scores")
-        os.makedirs(self.scores_folder, exist_ok=True)
-        self.scores = MultiScores(self.scores_folder)
+        if self.journal is None:
+            os.makedirs(self.scores_folder, exist_ok=True)
+        segment_bytes = None if segment_mb is None else int(segment_mb * 1024 * 1024)
+        self.scores = MultiScores(self.scores_folder, buffered=self.buffered, fmt=self.score_format, shard=self.rank,
+                                  pyramid=pyramid, segment_points=segment_points, segment_bytes=segment_bytes,
+                                  compression=compression, offset_index=offset_index)
 
         #  dossier de flags
         self.flags_folder = os.path.join(self.experiment_folder, "flags")
-        os.makedirs(self.flags_folder, exist_ok=True)
-        self.flags = MultiScores(self.flags_folder)
+        if self.journal is None:
+            os.makedirs(self.flags_folder, exist_ok=True)
+        self.flags = MultiScores(self.flags_folder, buffered=self.buffered, shard=self.rank)
+
+        #  dossier d'histogrammes, créé au premier histogramme
+        self.histograms_folder = os.path.join(self.experiment_folder, "histograms")
+        self.histograms = {}
+
+        # références vers le store d'artefacts : nom -> hash, taille, nom de fichier d'origine
+        self.artifacts = read_artifacts(self.experiment_folder)
+
+        # canal live : chaque point de score est aussi publié en mémoire partagée pour le GUI local
+        self.live = None
+        if live:
+            # import à la demande : multiprocessing.shared_memory allonge l'import d'une vingtaine de ms
+            from xview.utils.live_channel import LiveChannelWriter
+            self.live = LiveChannelWriter(self.root_folder, os.path.relpath(self.experiment_folder, self.root_folder))
+
+        # config.json : seules les clés modifiées sont réécrites, au plus une fois par EXP_CONFIG_DEBOUNCE
+        self.exp_config_path = os.path.join(self.experiment_folder, "config.json")
+        self._config_lock = threading.RLock()
+        self._config_pending = {}
+        self._config_on_disk = self._read_exp_config_file() if self.journal is None else {}
+        self._config_debouncer = Debouncer(self.flush_exp_config, EXP_CONFIG_DEBOUNCE)
+
+        # reprise d'une expérience existante : séries déjà sur disque et modes de monitoring
+        self.scores.discover()
+        self.flags.discover()
+        if self.journal is not None:
+            self.scores_monitoring = dict(self.journal.state["config"].get("scores_monitoring") or {})
+        else:
+            self.scores_monitoring = dict(self._config_on_disk.get("scores_monitoring") or {})
+
+        if async_mode:
+            self._worker = AsyncWriter(name=f"xview-writer-{self.name}", max_queue_size=max_queue_size,
+                                       backpressure=backpressure)
 
-        self.scores_monitoring = {}
+    def pipe_to(self, other_experiment, max_queue_size=10000, backpressure="block"):
+        """Forward write operations to another Experiment instance.
 
-    def pipe_to(self, other_experiment):
-        """Forward write operations to another Experiment instance."""
+        Calls are queued and delivered in batches by a thread dedicated to the
+        pipe, so a failing mirror never breaks this experiment: errors are
+        counted and printed by that thread only. When the queue of a pipe is
+        full, backpressure="block" waits for room and "drop" skips the call
+        with a warning. See get_pipe_stats() for the per-pipe counters. The
+        mirror stays owned by the caller: close() flushes it but does not close it.
+        """
         if hasattr(other_experiment, "__class__") and other_experiment.__class__.__name__ == "Experiment":
             self.pipes.append(other_experiment)
+            self._pipe_writers[id(other_experiment)] = AsyncWriter(
+                name=f"xview-pipe-{other_experiment.name}", max_queue_size=max_queue_size, backpressure=backpressure)
         else:
             raise TypeError("other_experiment must be an instance of Experiment")
 
     def pipe_break(self, other_experiment):
-        """Stop forwarding to the provided Experiment instance."""
+        """Stop forwarding to the provided Experiment instance, after delivering its pending calls."""
         if other_experiment in self.pipes:
             self.pipes.remove(other_experiment)
+            self._pipe_writers.pop(id(other_experiment)).close()
         else:
             raise ValueError("other_experiment is not in the list of pipes")
 
     def __act_pipe(self, method, *args, **kwargs):
+        # les dicts sont copiés : l'appelant peut les réutiliser avant la livraison
+        args = tuple(copy.copy(arg) if isinstance(arg, dict) else arg for arg in args)
+        kwargs = {key: copy.copy(value) if isinstance(value, dict) else value for key, value in kwargs.items()}
+        for pipe in self.pipes:
+            writer = self._pipe_writers[id(pipe)]
+            if not writer.submit(getattr(pipe, method), *args, **kwargs):
+                dropped = writer.stats()["dropped"]
+                if dropped == 1 or dropped % PIPE_DROP_WARNING_EVERY == 0:
+                    print(f"/!\\ File du pipe vers {pipe.name} pleine : {dropped} appel(s) ignoré(s) (backpressure='drop').")
+
+    def _flush_pipes(self):
+        # file vidée d'abord : avec backpressure="drop", le flush du miroir ne doit pas être ignoré
+        for pipe in self.pipes:
+            self._pipe_writers[id(pipe)].flush()
+        for pipe in self.pipes:
+            self._pipe_writers[id(pipe)].submit(pipe.flush)
         for pipe in self.pipes:
-            getattr(pipe, method)(*args, **kwargs)
+            self._pipe_writers[id(pipe)].flush()
+
+    def get_pipe_stats(self):
+        """Return the delivery counters (queue depth, dropped calls, errors, latency...) of each pipe, by name."""
+        return {pipe.name: self._pipe_writers[id(pipe)].stats() for pipe in self.pipes}
+
+    def _shared_file_lock(self, path):
+        """Advisory lock on a file shared by all ranks (no-op for single-process logging)."""
+        if self.rank is None:
+            return contextlib.nullcontext()
+        return file_lock(path)
+
+    def _update_shared_json(self, path, values, merge_dicts=False):
+        """Merge values into a JSON file shared by all ranks, under lock and atomically.
+
+        With merge_dicts, dict values are merged with the ones on disk (e.g. the
+        scores_monitoring map, where each rank may know only some metrics).
+        """
+        with file_lock(path):
+            content = read_json(path) if os.path.exists(path) else {}
+            for key, value in values.items():
+                if merge_dicts and isinstance(value, dict) and isinstance(content.get(key), dict):
+                    content[key].update(value)
+                else:
+                    content[key] = value
+            write_json(path, content)
+        return content
 
     def get_infos(self):
         """Return experiment metadata dict, creating an empty file if missing."""
+        if self.journal is not None:
+            self.infos = dict(self.journal.state["infos"])
+            return self.infos
+        self.flush_infos()
         if os.path.exists(self.infos_path):
-            self.infos = read_json(self.infos_path)
+            with self._shared_file_lock(self.infos_path):
+                self.infos = read_json(self.infos_path)
+        elif self.rank is not None:
+            self.infos = self._update_shared_json(self.infos_path, {})
         else:
             self.infos = {}
             self.set_infos({})
         return self.infos
 
+    @deferred
     def set_infos(self, infos):
         """Overwrite experiment metadata JSON with the provided dict."""
         self.__act_pipe("set_infos", infos)
         self.infos = infos
-        if infos is not None:
-            write_json(self.infos_path, infos)
-
+        if infos is not None and self.journal is not None:
+            self.journal.append("infos", infos=infos)
+        elif infos is not None:
+            with self._infos_lock:
+                if self.rank is not None:
+                    self.infos = self._update_shared_json(self.infos_path, {**self._infos_pending, **infos})
+                else:
+                    write_json(self.infos_path, infos)
+                self._infos_pending = {}
+            self._infos_debouncer.cancel()
+
+    @deferred
     def set_info(self, key, value):
-        """Set a single metadata key and persist to JSON."""
+        """Set a single metadata key.
+
+        The in-memory infos are updated at once; exp_infos.json is rewritten at
+        most once every EXP_INFOS_DEBOUNCE seconds, and on status update,
+        flush(), close() and flush_infos().
+        """
         self.__act_pipe("set_info", key, value)
-        self.infos[key] = value
-        write_json(self.infos_path, self.infos)
+        if self.journal is not None:
+            self.infos[key] = value
+            self.journal.append("info", key=key, value=value)
+            return
+        with self._infos_lock:
+            self.infos[key] = value
+            self._infos_pending[key] = copy.deepcopy(value)
+        self._infos_debouncer.touch()
+
+    def flush_infos(self):
+        """Write pending set_info changes to exp_infos.json, replaced atomically."""
+        with self._infos_lock:
+            if not self._infos_pending:
+                return
+            if self.rank is not None:
+                self.infos = self._update_shared_json(self.infos_path, self._infos_pending)
+            else:
+                write_json(self.infos_path, self.infos)
+            self._infos_pending = {}
 
     def set_train_status(self):
         """Mark experiment status as 'training'."""
@@ -150,55 +364,311 @@ class Experiment(object):
         """Mark experiment status as 'finished'."""
         self.update_status("finished")
 
+    @deferred
     def update_status(self, status):
         """Write the status string to the status file and propagate to pipes."""
         self.__act_pipe("update_status", status)
+        self._flush_files()
+        self.flush_exp_config()
         self.status = status
-        write_file(self.status_file, self.status, flag="w")
-
+        if self.journal is not None:
+            self.journal.append("status", status=status)
+            self.journal.flush()
+        if self.is_main_rank:
+            write_file(self.status_file, self.status, flag="w")
+
+    def flush(self):
+        """Wait for queued async writes and pipe deliveries, then write buffered points to disk."""
+        if self._worker is not None:
+            self._worker.flush()
+        self._flush_pipes()
+        self._flush_files()
+
+    def _flush_files(self):
+        self.flush_infos()
+        self.scores.flush()
+        self.flags.flush()
+        for histogram in self.histograms.values():
+            histogram.flush()
+        if self.journal is not None:
+            self.journal.flush()
+
+    def close(self):
+        """Flush buffered points and release the open score and flag files."""
+        if self._worker is not None:
+            self._worker.close()
+        # les miroirs appartiennent à l'appelant : livrés et écrits sur disque, mais pas fermés ;
+        # le thread du pipe reste en attente, l'expérience pouvant encore être écrite après close()
+        self._flush_pipes()
+        self.flush_infos()
+        self.flush_exp_config()
+        self.scores.close()
+        self.flags.close()
+        for histogram in self.histograms.values():
+            histogram.close()
+        if self.live is not None:
+            self.live.close()
+        if self.journal is not None:
+            self.journal.close()
+
+    @deferred
+    def compact(self):
+        """Fold the journal into its snapshot file (journal storage only)."""
+        self.__act_pipe("compact")
+        if self.journal is not None:
+            self.journal.compact()
+
+    @deferred
     def add_score(self, name, y, x=None, plt_args: dict = None, label_value=None, monitor="max,min"):
         """Append a score point and ensure its Score exists with optional args."""
         self.__act_pipe("add_score", name, y, x, plt_args=plt_args, label_value=label_value, monitor=monitor)
-        if name not in self.scores.scores:
+        # mode de monitoring enregistré avant le premier point, que le GUI peut lire aussitôt
+        if self.scores_monitoring.get(name) != monitor:
+            self.scores_monitoring[name] = monitor
+            self.set_exp_config_data("scores_monitoring", self.scores_monitoring)
+        if self.journal is not None:
+            new_series = name not in self.journal.state["scores"]
+            self.journal.append("scores", name=name, x=x, y=y, label_value=label_value,
+                                plt_args=plt_args if new_series else None)
+        else:
             self.scores.add_score(name, plt_args=plt_args)
-        self.scores.add_score_point(name, y, x, label_value=label_value)
-        self.scores_monitoring[name] = monitor
-        self.set_exp_config_data("scores_monitoring", self.scores_monitoring)
+            self.scores.add_score_point(name, y, x, label_value=label_value)
+            self._publish_live(name, x, y)
 
+    @deferred
+    def add_scores(self, scores: dict, x=None, plt_args: dict = None, label_values: dict = None, monitor="max,min"):
+        """Append one point to several scores sharing the same x in a single call.
+
+        Args:
+            scores (dict): Mapping metric name -> y value.
+            x (float, optional): x value shared by every metric. Defaults to None.
+            plt_args (dict, optional): Mapping metric name -> plt_args dict, used when the score is created. Defaults to None.
+            label_values (dict, optional): Mapping metric name -> label value. Defaults to None.
+            monitor (str or dict, optional): Monitor mode shared by every metric, or mapping metric name -> monitor mode. Defaults to "max,min".
+
+        The batch is forwarded once to the pipes, each metric file gets one
+        append, and the per-experiment config is written at most once.
+        """
+        self.__act_pipe("add_scores", scores, x=x, plt_args=plt_args, label_values=label_values, monitor=monitor)
+        plt_args = plt_args or {}
+        label_values = label_values or {}
+
+        monitoring = dict(self.scores_monitoring)
+        for name in scores:
+            monitoring[name] = monitor.get(name, "max,min") if isinstance(monitor, dict) else monitor
+        if monitoring != self.scores_monitoring:
+            self.scores_monitoring = monitoring
+            self.set_exp_config_data("scores_monitoring", self.scores_monitoring)
+
+        for name, y in scores.items():
+            if self.journal is not None:
+                new_series = name not in self.journal.state["scores"]
+                self.journal.append("scores", name=name, x=x, y=y, label_value=label_values.get(name),
+                                    plt_args=plt_args.get(name) if new_series else None)
+                continue
+            self.scores.add_score(name, plt_args=plt_args.get(name))
+            self.scores.add_score_point(name, y, x, label_value=label_values.get(name))
+            self._publish_live(name, x, y)
+
+    def _publish_live(self, name, x, y):
+        if self.live is not None:
+            # indice du point dans la série : le GUI ignore ceux qu'il a déjà lus sur disque
+            self.live.publish(name, len(self.scores.scores[name]) - 1, x, y)
+
+    @deferred
     def add_flag(self, name, x=None, unique=False, plt_args: dict = None, label_value=None):
         """Append a flag event (vertical line) to the flags collection."""
         self.__act_pipe("add_flag", name, x, unique=unique, plt_args=plt_args, label_value=label_value)
-        if name not in self.flags.scores:
-            self.flags.add_score(name, plt_args=plt_args)
+        if self.journal is not None:
+            if x is None:
+                x = max([self.journal.n_points(kind, series) for kind in ("scores", "flags")
+                         for series in self.journal.state[kind]], default=0)
+            new_series = name not in self.journal.state["flags"]
+            self.journal.append("flags", name=name, y=x, unique=unique, label_value=label_value,
+                                plt_args=plt_args if new_series else None)
+            return
+        self.flags.add_score(name, plt_args=plt_args)
         if x is None:
             x = max(len(self.scores), len(self.flags))
         self.flags.add_score_point(name, x=x, unique=unique, label_value=label_value)
 
-    def get_score(self, name, get_x=True, ma=False):
-        return self.scores.get_score(name, get_x=get_x, ma=ma)
+    def add_histogram(self, name, values, x=None, n_bins=HISTOGRAM_BINS):
+        """Log the distribution of values (weights, activations...) at step x as one compact record.
+
+        Quantiles, min/max/mean/std and an n_bins histogram are computed right
+        away, so values may be modified after the call; the record is then
+        appended to histograms/<name>.hist (see xview.utils.histogram). With
+        rank, only rank 0 logs histograms.
+        """
+        self.add_histogram_record(name, compute_histogram(values, x, n_bins=n_bins))
+
+    @deferred
+    def add_histogram_record(self, name, record):
+        """Append a record computed by compute_histogram to the histogram series name."""
+        self.__act_pipe("add_histogram_record", name, record)
+        if not self.is_main_rank:
+            return
+        if name not in self.histograms:
+            os.makedirs(self.histograms_folder, exist_ok=True)
+            self.histograms[name] = HistogramSeries(os.path.join(self.histograms_folder, f"{name}.hist"),
+                                                    n_bins=record.dtype["bins"].shape[0], buffered=self.buffered)
+        self.histograms[name].add_record(record)
+
+    def get_histogram(self, name):
+        """Return the histogram records of a series as a structured array (fields x, count, min, max, mean, std, quantiles, bins)."""
+        if self._worker is not None:
+            self._worker.flush()
+        if name in self.histograms:
+            self.histograms[name].flush()
+        return read_histograms(os.path.join(self.histograms_folder, f"{name}.hist"))
+
+    def add_artifact(self, name, source, file_name=None):
+        """Attach a file (path) or bytes to the experiment under name, and return its SHA-256.
+
+        The content is hashed and added to the data folder's artifact store
+        right away (nothing is written if it is already there), so the source
+        file may be modified after the call. Only the reference in
+        artifacts.json is written afterwards, by rank 0.
+        """
+        digest, size = store_blob(self.artifacts_store, source)
+        if file_name is None:
+            file_name = os.path.basename(source) if isinstance(source, (str, os.PathLike)) else name
+        self.add_artifact_ref(name, {"hash": digest, "size": size, "file_name": file_name},
+                              blob_path(self.artifacts_store, digest))
+        return digest
+
+    @deferred
+    def add_artifact_ref(self, name, ref, blob):
+        """Record the reference of an artifact whose content is the stored blob (copied if this store lacks it)."""
+        self.__act_pipe("add_artifact_ref", name, ref, blob)
+        if not self.is_main_rank:
+            return
+        # miroir dans un autre data_folder : le blob y est copié une fois
+        if not os.path.exists(blob_path(self.artifacts_store, ref["hash"])):
+            store_blob(self.artifacts_store, blob)
+        self.artifacts[name] = ref
+        write_artifacts(self.experiment_folder, self.artifacts)
+
+    def get_artifact_path(self, name):
+        """Return the path of an artifact's content in the store, or None if the experiment has no such artifact."""
+        if self._worker is not None:
+            self._worker.flush()
+        if name not in self.artifacts:
+            return None
+        return blob_path(self.artifacts_store, self.artifacts[name]["hash"])
+
+    def get_logging_stats(self):
+        """Return the writer thread counters (queue depth, latency...), or None if not async."""
+        if self._worker is None:
+            return None
+        return self._worker.stats()
+
+    def get_score(self, name, get_x=True, ma=False, x_min=None, x_max=None, last_n=None):
+        """Return (x, y) of a score series, or only y, optionally limited to [x_min, x_max] and/or its last_n points."""
+        if self._worker is not None:
+            self._worker.flush()
+        if self.journal is not None:
+            return self._get_journal_score(name, get_x=get_x, ma=ma, x_min=x_min, x_max=x_max, last_n=last_n)
+        return self.scores.get_score(name, get_x=get_x, ma=ma, x_min=x_min, x_max=x_max, last_n=last_n)
+
+    def _get_journal_score(self, name, get_x=True, ma=False, x_min=None, x_max=None, last_n=None):
+        assert name in self.journal.state["scores"], f"Score {name} not found."
+        series = self.journal.read_state()["scores"][name]
+        x = [v for v in series["x"] if v is not None]
+        y = list(series["y"])
+        if x_min is not None or x_max is not None or last_n is not None:
+            x, y = slice_scores(x, y, x_min=x_min, x_max=x_max, last_n=last_n)
+            x, y = x.tolist(), y.tolist()
+        if ma is not None and ma is not False:
+            window = ma if not isinstance(ma, bool) else 15
+            y = compute_moving_average(y, window)
+        if get_x:
+            return (x, y)
+        return y
 
     def get_folder(self):
         """Return the absolute path to the experiment folder."""
         return self.experiment_folder
 
+    def _read_exp_config_file(self):
+        if not os.path.exists(self.exp_config_path):
+            return {}
+        return read_json(self.exp_config_path)
+
     def get_exp_config_file(self):
-        """Load or create the per-experiment config JSON."""
-        if not os.path.exists(os.path.join(self.experiment_folder, "config.json")):
+        """Load or create the per-experiment config JSON, including unsaved changes."""
+        if self._worker is not None:
+            self._worker.flush()
+        if self.journal is not None:
+            # le config.json reste écrit par le GUI (plages d'affichage, etc.)
+            config = self._read_exp_config_file()
+            config.update(self.journal.state["config"])
+            return config
+        if not os.path.exists(self.exp_config_path):
             self.set_exp_config_file({})
-        config = json.load(open(os.path.join(self.experiment_folder, "config.json")))
+        with self._config_lock, self._shared_file_lock(self.exp_config_path):
+            config = self._read_exp_config_file()
+            config.update(copy.deepcopy(self._config_pending))
         return config
 
     def get_exp_config_data(self, key):
         """Read a single key from the per-experiment config JSON."""
         return self.get_exp_config_file().get(key, None)
 
+    @deferred
     def set_exp_config_file(self, config):
         """Write the per-experiment config JSON dict to disk."""
-        with open(os.path.join(self.experiment_folder, "config.json"), "w") as f:
-            json.dump(config, f, indent=4)
-
+        if self.journal is not None:
+            for key, value in config.items():
+                self.journal.append("config", key=key, value=value)
+            return
+        with self._config_lock:
+            self._config_pending = {}
+            self._config_debouncer.cancel()
+            if self.rank is not None:
+                config = self._update_shared_json(self.exp_config_path, config)
+            else:
+                write_json(self.exp_config_path, config)
+            self._config_on_disk = copy.deepcopy(config)
+
+    @deferred
     def set_exp_config_data(self, key, value):
-        """Update a single key in the per-experiment config file."""
-        config = self.get_exp_config_file()
-        config[key] = value
-        self.set_exp_config_file(config)
+        """Update a single key in the per-experiment config file.
+
+        Nothing is written if the value equals the one on disk. A key (or, for
+        dict values, a sub-key such as a new metric of scores_monitoring) not
+        yet on disk is written at once; changes to existing keys are persisted
+        at most once every EXP_CONFIG_DEBOUNCE seconds, and on status update,
+        close() and flush_exp_config().
+        """
+        if self.journal is not None:
+            if self.journal.state["config"].get(key) != value:
+                self.journal.append("config", key=key, value=value)
+            return
+        with self._config_lock:
+            on_disk = self._config_on_disk.get(key)
+            if key not in self._config_pending and key in self._config_on_disk and on_disk == value:
+                return
+            self._config_pending[key] = copy.deepcopy(value)
+            # le GUI lit une nouvelle métrique dès que son fichier existe : sa clé ne doit pas attendre
+            new_key = key not in self._config_on_disk or \
+                (isinstance(value, dict) and isinstance(on_disk, dict) and not value.keys() <= on_disk.keys())
+            if new_key:
+                self.flush_exp_config()
+                return
+        self._config_debouncer.touch()
+
+    def flush_exp_config(self):
+        """Write pending per-experiment config changes to disk."""
+        with self._config_lock:
+            if not self._config_pending:
+                return
+            # relecture pour ne pas écraser les clés écrites par le GUI (x_min, normalize, ...)
+            if self.rank is not None:
+                config = self._update_shared_json(self.exp_config_path, self._config_pending, merge_dicts=True)
+            else:
+                config = self._read_exp_config_file()
+                config.update(self._config_pending)
+                write_json(self.exp_config_path, config)
+            self._config_pending = {}
+            self._config_on_disk = copy.deepcopy(config)
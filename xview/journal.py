@@ -0,0 +1,153 @@
+"""Per-experiment append-only journal used by the ``storage="journal"`` mode.
+
+Every mutation of an Experiment (score point, flag, infos, status, config) is
+appended as one JSON line to ``journal.log`` instead of being spread over many
+small files. ``compact`` folds the log into ``journal_snapshot.json`` and
+empties it. Each record carries a sequence number; the snapshot stores the
+last one it contains, so readers can skip records already folded in and detect
+a compaction that happened while they were reading.
+
+The writer only keeps a summary of the state (point counts per series,
+infos, config, status); points are folded by read_journal_state and compact.
+"""
+
+import os
+import json
+from xview.utils.utils import replace_file
+from xview.utils.buffered_writer import BufferedFileWriter
+
+
+JOURNAL_FILE = "journal.log"
+SNAPSHOT_FILE = "journal_snapshot.json"
+
+
+def _to_json(value):
+    # numpy scalars / arrays -> types natifs
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def empty_state():
+    """Return the state of an experiment with nothing logged."""
+    return {"seq": 0, "status": None, "infos": {}, "config": {}, "scores": {}, "flags": {}}
+
+
+def apply_record(state, record):
+    """Fold one journal record into a state dict (in place)."""
+    op = record["op"]
+    if op in ("scores", "flags"):
+        series = state[op].setdefault(record["name"], {"x": [], "y": [], "plt_args": None, "label_value": None})
+        if record.get("unique", False):
+            series["x"], series["y"] = [], []
+        series["x"].append(record.get("x"))
+        series["y"].append(record["y"])
+        if record.get("plt_args") is not None:
+            series["plt_args"] = record["plt_args"]
+        if record.get("label_value") is not None:
+            series["label_value"] = str(record["label_value"])
+    elif op == "infos":
+        state["infos"] = record["infos"]
+    elif op == "info":
+        state["infos"][record["key"]] = record["value"]
+    elif op == "status":
+        state["status"] = record["status"]
+    elif op == "config":
+        state["config"][record["key"]] = record["value"]
+    state["seq"] = record["seq"]
+
+
+def summarize_state(state):
+    """Return the writer-side summary of a state: series reduced to their number of points."""
+    summary = {key: value for key, value in state.items() if key not in ("scores", "flags")}
+    for kind in ("scores", "flags"):
+        summary[kind] = {name: len(series["y"]) for name, series in state[kind].items()}
+    return summary
+
+
+def has_journal(experiment_folder):
+    """Return True if the experiment folder uses journal storage."""
+    return os.path.exists(os.path.join(experiment_folder, JOURNAL_FILE)) or \
+        os.path.exists(os.path.join(experiment_folder, SNAPSHOT_FILE))
+
+
+def read_journal_state(experiment_folder, max_attempts=5):
+    """Read snapshot + log sequentially and return the folded state dict.
+
+    Retries if the log was compacted between reading the snapshot and the log.
+    """
+    snapshot_path = os.path.join(experiment_folder, SNAPSHOT_FILE)
+    log_path = os.path.join(experiment_folder, JOURNAL_FILE)
+    for _ in range(max_attempts):
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, "r") as f:
+                state = json.load(f)
+        else:
+            state = empty_state()
+        consistent = True
+        if os.path.exists(log_path):
+            with open(log_path, "r") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break  # enregistrement en cours d'écriture
+                    record = json.loads(line)
+                    if record["seq"] <= state["seq"]:
+                        continue
+                    if record["seq"] != state["seq"] + 1:
+                        consistent = False
+                        break
+                    apply_record(state, record)
+        if consistent:
+            return state
+    return state
+
+
+class ExperimentJournal(object):
+    """Append-only writer of an experiment journal, with snapshot compaction."""
+
+    def __init__(self, experiment_folder, buffered=False):
+        self.experiment_folder = experiment_folder
+        self.path = os.path.join(experiment_folder, JOURNAL_FILE)
+        self.snapshot_path = os.path.join(experiment_folder, SNAPSHOT_FILE)
+        # résumé de l'état : les points eux-mêmes ne restent pas en mémoire côté écrivain
+        self.state = summarize_state(read_journal_state(experiment_folder))
+        self.seq = self.state["seq"]
+        self.writer = BufferedFileWriter(self.path) if buffered else BufferedFileWriter(self.path, max_lines=1)
+
+    def append(self, op, **fields):
+        """Append one mutation record and update the in-memory summary of the state."""
+        self.seq += 1
+        record = {"seq": self.seq, "op": op, **fields}
+        line = json.dumps(record, default=_to_json)
+        if op in ("scores", "flags"):
+            counts = self.state[op]
+            counts[fields["name"]] = 1 if fields.get("unique", False) else counts.get(fields["name"], 0) + 1
+            self.state["seq"] = self.seq
+        else:
+            # infos/config : on relit la ligne pour garder les mêmes valeurs que les lecteurs
+            apply_record(self.state, json.loads(line))
+        self.writer.write(line + "\n")
+
+    def n_points(self, kind, name):
+        """Return the number of points logged for a score or flag series."""
+        return self.state[kind].get(name, 0)
+
+    def read_state(self):
+        """Return the full state (every point of every series), read back from disk."""
+        self.writer.flush()
+        return read_journal_state(self.experiment_folder)
+
+    def flush(self):
+        """Write buffered records to disk."""
+        self.writer.flush()
+
+    def compact(self):
+        """Fold the log into the snapshot file and empty the log."""
+        state = self.read_state()
+        replace_file(self.snapshot_path, json.dumps(state, default=_to_json).encode("utf-8"))
+        self.writer.write(b"", truncate=True)
+        self.writer.flush()
+
+    def close(self):
+        """Flush pending records and release the log file."""
+        self.writer.close()
@@ -1,18 +1,63 @@
 """Score file helpers to append/read values and manage multiple series."""
 
 import os
-from xview.utils.utils import write_file, write_json, compute_moving_average
+from xview.utils.utils import write_file, write_json, replace_file, count_lines, compute_moving_average
+from xview.utils.buffered_writer import BufferedFileWriter
+from xview.utils.score_io import (encode_bin_record, count_bin_records, read_score_path, list_score_files, read_merged_scores,
+                                  parse_score_file_name, merge_shards, slice_scores, seal_segment, recover_segments, remove_segments, count_sealed_points)
+from xview.utils.pyramid import ScorePyramid, remove_pyramid
+from xview.utils.offset_index import ScoreOffsetIndex, remove_offset_index, read_score_range
 
 
 class Score(object):
-    """Represent a single score series persisted as a text file."""
+    """Represent a single score series persisted as a text or binary file.
 
-    def __init__(self, name, score_dir, plt_args: dict = None):
+    With ``fmt="bin"`` points are stored as fixed-width float64 (x, y) records
+    in ``<name>.bin`` instead of ``x,y`` lines in ``<name>.txt``.
+    With ``buffered=True`` the file handle stays open and points are batched in
+    memory (see BufferedFileWriter) instead of opening the file on every point.
+    With ``shard=k`` (multi-process logging) points go to ``<name>.rank<k>.<fmt>``
+    and only shard 0 writes the shared plt_args and label value files.
+    With ``pyramid=True`` a min/max/mean pyramid of the series is maintained in
+    a sidecar folder as points are appended (see xview.utils.pyramid); it is
+    resumed when an existing series is reopened. Shards get no pyramid.
+    With ``segment_points`` and/or ``segment_bytes`` the file is rolled over
+    once it holds that many points or bytes: its content is sealed into a
+    compressed segment (see score_io.seal_segment) and a new file is started.
+    With ``offset_index=True`` a sparse index of the byte offset of every
+    OFFSET_INDEX_STRIDE-th point is maintained (see xview.utils.offset_index),
+    so that x ranges and last points are read without parsing the whole file.
+    """
+
+    def __init__(self, name, score_dir, plt_args: dict = None, buffered=False, fmt="txt", shard=None, pyramid=False,
+                 segment_points=None, segment_bytes=None, compression="zlib", offset_index=False):
+        assert fmt in ("txt", "bin"), f"Unknown score format {fmt}."
         self.name = name
         self.score_dir = score_dir
-        self.score_file = os.path.join(self.score_dir, f"{self.name}.txt")
+        self.fmt = fmt
+        self.shard = shard
+        file_name = self.name if self.shard is None else f"{self.name}.rank{self.shard}"
+        self.score_file = os.path.join(self.score_dir, f"{file_name}.{self.fmt}")
+        self.writer = BufferedFileWriter(self.score_file) if buffered else None
+        self.writes_shared_files = self.shard is None or self.shard == 0
+        self._n_points = None  # compté une seule fois depuis le disque, puis tenu à jour en mémoire
+        self.use_pyramid = pyramid and self.shard is None
+        self.pyramid = None  # ouverte au premier point ajouté
+        self.segment_points = segment_points
+        self.segment_bytes = segment_bytes
+        self.compression = compression
+        self.use_offset_index = offset_index
+        self.offset_index = None  # ouvert au premier point ajouté ou à la première lecture d'une plage
+        self._active_points = None  # points et octets du fichier actif, lus depuis le disque au premier point
+        self._active_bytes = None
+        self.plt_args = None
+        if plt_args is not None:
+            self.set_plt_args(plt_args)
+
+    def set_plt_args(self, plt_args: dict):
+        """Store the matplotlib arguments of the series in its plt_args JSON file."""
         self.plt_args = plt_args
-        if self.plt_args is not None:
+        if self.writes_shared_files:
             plt_args_file = os.path.join(self.score_dir, f"{self.name}_plt_args.json")
             write_json(plt_args_file, self.plt_args)
 
@@ -21,6 +66,30 @@ class Score(object):
 
         Also writes optional label value to a companion file.
         """
+        n_points = 1 if unique else len(self) + 1
+        if self.use_pyramid and self.pyramid is None and not unique:
+            self.flush()
+            self.pyramid = ScorePyramid(self.score_file)
+            self.pyramid.open()
+        if self.use_offset_index and self.offset_index is None and not unique:
+            self._open_offset_index()
+        if self.fmt == "bin":
+            n_bytes = self._add_bin_point(x, y, unique=unique)
+        else:
+            n_bytes = self._add_txt_point(x, y, unique=unique)
+        self._n_points = n_points
+        if self.use_pyramid:
+            self._update_pyramid(x, y, n_bytes, unique)
+        if self.use_offset_index:
+            self._update_offset_index(x, y, n_bytes, unique)
+        if self.segment_points or self.segment_bytes:
+            self._roll_segment(n_bytes, unique)
+
+        if label_value is not None and self.writes_shared_files:
+            label_file = os.path.join(self.score_dir, f"{self.name}_label_value.txt")
+            write_file(label_file, label_value, flag="w")
+
+    def _add_txt_point(self, x, y, unique=False):
         if x is not None and y is not None:
             line = f"{x},{y}"
         elif x is not None:
@@ -28,39 +97,128 @@ class Score(object):
         elif y is not None:
             line = f"{y}"
 
-        write_file(self.score_file, line, flag="a" if not unique else "w")
+        if self.writer is not None:
+            self.writer.write(line + "\n", truncate=unique)
+        else:
+            write_file(self.score_file, line, flag="a" if not unique else "w")
+        return len(line) + 1
 
-        if label_value is not None:
-            label_file = os.path.join(self.score_dir, f"{self.name}_label_value.txt")
-            write_file(label_file, label_value, flag="w")
+    def _add_bin_point(self, x, y, unique=False):
+        # un point sans x est stocké comme en texte : la valeur seule va dans y
+        if x is None or y is None:
+            x, y = None, x if x is not None else y
+        record = encode_bin_record(x, y)
 
-    def __len__(self):
-        """Return number of lines (points) in the score file."""
-        if os.path.exists(self.score_file):
-            with open(self.score_file, "r") as f:
-                lines = f.readlines()
-            return len(lines)
+        # réécriture atomique : un lecteur qui a mappé l'ancien fichier reste valide
+        if unique:
+            if self.writer is not None:
+                self.writer.replace(record)
+            else:
+                replace_file(self.score_file, record)
+        elif self.writer is not None:
+            self.writer.write(record)
         else:
-            return 0
+            with open(self.score_file, "ab") as f:
+                f.write(record)
+        return len(record)
+
+    def _update_pyramid(self, x, y, n_bytes, unique):
+        if unique:
+            # une série réécrite à chaque point n'a pas besoin de pyramide
+            self.use_pyramid = False
+            self.pyramid = None
+            remove_pyramid(self.score_file)
+            return
+        # comme dans les fichiers, un point sans x garde sa valeur dans y
+        if x is None or y is None:
+            x, y = None, x if x is not None else y
+        try:
+            self.pyramid.add_point(x, float(y), n_bytes)
+        except (TypeError, ValueError):
+            self.pyramid.disable()
+
+    def _open_offset_index(self):
+        self.flush()
+        self.offset_index = ScoreOffsetIndex(self.score_file)
+        self.offset_index.open()
+
+    def _update_offset_index(self, x, y, n_bytes, unique):
+        if unique:
+            self.use_offset_index = False
+            self.offset_index = None
+            remove_offset_index(self.score_file)
+            return
+        try:
+            self.offset_index.add_point(float(x) if x is not None and y is not None else None, n_bytes)
+        except (TypeError, ValueError):
+            self.offset_index.disable()
+
+    def _roll_segment(self, n_bytes, unique):
+        if unique:
+            remove_segments(self.score_file)
+            self._active_points, self._active_bytes = 1, n_bytes
+            return
+        if self._active_points is None:
+            # reprise d'une série : le fichier actif contient déjà des points
+            self.flush()
+            recover_segments(self.score_file, self.compression)
+            self._active_points = count_bin_records(self.score_file) if self.fmt == "bin" else count_lines(self.score_file)
+            self._active_bytes = os.path.getsize(self.score_file)
+        else:
+            self._active_points += 1
+            self._active_bytes += n_bytes
+        if (self.segment_points and self._active_points >= self.segment_points) or \
+                (self.segment_bytes and self._active_bytes >= self.segment_bytes):
+            self.seal_segment()
+
+    def seal_segment(self):
+        """Compress the points of the active file into a sealed segment and start a new file."""
+        if self.writer is not None:
+            self.writer.release()
+        seal_segment(self.score_file, self.compression)
+        self._active_points, self._active_bytes = 0, 0
+
+    def flush(self):
+        """Write buffered points to disk (no-op when unbuffered)."""
+        if self.writer is not None:
+            self.writer.flush()
 
-    def read_scores(self, get_x: bool = True, ma=False):
+    def close(self):
+        """Flush and release the file handle (no-op when unbuffered)."""
+        if self.writer is not None:
+            self.writer.close()
+
+    def __len__(self):
+        """Return number of points (buffered ones included) in O(1).
+
+        The count is read from disk once, then maintained on every append.
+        """
+        if self._n_points is None:
+            self.flush()
+            if self.fmt == "bin":
+                self._n_points = count_bin_records(self.score_file)
+            else:
+                self._n_points = count_lines(self.score_file)
+            self._n_points += count_sealed_points(self.score_file)[0]
+        return self._n_points
+
+    def read_scores(self, get_x: bool = True, ma=False, x_min=None, x_max=None, last_n=None):
         """Read scores from file and return (x, y) or only y.
 
         If ma is truthy, apply a moving average with provided window size
         (or 15 when ma is True). When get_x is False, only y is returned.
+        With x_min/x_max and/or last_n, only the points in [x_min, x_max] (then
+        the last_n of them) are returned, read through the offset index; the
+        moving average is then computed on those points only.
         """
+        self.flush()
         if os.path.exists(self.score_file):
-            with open(self.score_file, "r") as f:
-                lines = f.readlines()
-            x = []
-            y = []
-            for line in lines:
-                values = line.strip().split(",")
-                if len(values) == 1:
-                    y.append(float(values[0]))
-                else:
-                    x.append(float(values[0]))
-                    y.append(float(values[1]))
+            if x_min is None and x_max is None and last_n is None:
+                x, y = read_score_path(self.score_file)
+            else:
+                if self.use_offset_index and self.offset_index is None:
+                    self._open_offset_index()
+                x, y = read_score_range(self.score_file, x_min=x_min, x_max=x_max, last_n=last_n)
             if ma is not None and ma is not False:
                 window = ma if not isinstance(ma, bool) else 15
                 y = compute_moving_average(y, window)
@@ -76,21 +234,61 @@ class Score(object):
 class MultiScores(object):
     """Container for multiple Score series under one directory."""
 
-    def __init__(self, score_dir):
+    def __init__(self, score_dir, buffered=False, fmt="txt", shard=None, pyramid=False, segment_points=None,
+                 segment_bytes=None, compression="zlib", offset_index=False):
         self.score_dir = score_dir
+        self.buffered = buffered
+        self.fmt = fmt
+        self.shard = shard
+        self.pyramid = pyramid
+        self.segment_points = segment_points
+        self.segment_bytes = segment_bytes
+        self.compression = compression
+        self.offset_index = offset_index
         self.scores: dict[str, Score] = {}
+        self._max_len = 0  # None : à recompter depuis les séries, au premier besoin
 
-    def add_score(self, name, plt_args=None):
-        """Create a new Score series if missing."""
-        if name not in self.scores:
-            self.scores[name] = Score(name, self.score_dir, plt_args=plt_args)
+    def add_score(self, name, plt_args=None, fmt=None):
+        """Create a new Score series if missing (a discovered series only gets its plt_args)."""
+        if name in self.scores:
+            if plt_args is not None and self.scores[name].plt_args is None:
+                self.scores[name].set_plt_args(plt_args)
+        else:
+            self.scores[name] = Score(name, self.score_dir, plt_args=plt_args, buffered=self.buffered, fmt=fmt or self.fmt,
+                                      shard=self.shard, pyramid=self.pyramid, segment_points=self.segment_points,
+                                      segment_bytes=self.segment_bytes, compression=self.compression,
+                                      offset_index=self.offset_index)
+            if os.path.exists(self.scores[name].score_file):
+                self._max_len = None
 
-    def get_max_len(self):
-        """Return the maximum number of points across all series."""
-        max_len = 0
+    def discover(self):
+        """Register the series already present in the folder, e.g. when an experiment is reopened.
+
+        Only file names are read: point counts are computed on first use. A
+        series keeps the format of its existing file, whatever ``fmt`` is.
+        """
+        if not os.path.isdir(self.score_dir):
+            return
+        for name, paths in list_score_files(self.score_dir).items():
+            own_files = [path for path in paths if parse_score_file_name(os.path.basename(path))[1] == self.shard]
+            fmt = os.path.splitext(own_files[0])[1][1:] if len(own_files) > 0 else None
+            self.add_score(name, fmt=fmt)
+
+    def flush(self):
+        """Write buffered points of every series to disk."""
+        for score in self.scores.values():
+            score.flush()
+
+    def close(self):
+        """Flush every series and release their file handles."""
         for score in self.scores.values():
-            max_len = max(max_len, len(score))
-        return max_len
+            score.close()
+
+    def get_max_len(self):
+        """Return the maximum number of points across all series in O(1) (once counted)."""
+        if self._max_len is None:
+            self._max_len = max((len(score) for score in self.scores.values()), default=0)
+        return self._max_len
 
     def __len__(self):
         """Alias for get_max_len()."""
@@ -100,9 +298,34 @@ class MultiScores(object):
         """Append a point to a named Score (must be added first)."""
         assert name in self.scores, f"Score {name} not found. Please add it first."
         self.scores[name].add_score_point(y, x, unique=unique, label_value=label_value)
+        if unique:
+            # une réécriture peut faire baisser le max : il sera recalculé sur les compteurs
+            self._max_len = None
+        elif self._max_len is not None:
+            self._max_len = max(self._max_len, len(self.scores[name]))
 
-    def get_score(self, name, get_x=True, ma=False):
-        """Read a named Score series; supports moving average and x omission."""
+    def get_score(self, name, get_x=True, ma=False, x_min=None, x_max=None, last_n=None):
+        """Read a named Score series; supports moving average, x omission and range slicing.
+
+        When sharded, or when the series was only written by ranks, the shards
+        written by every rank are merged by step.
+        See Score.read_scores for x_min, x_max and last_n.
+        """
         assert name in self.scores, f"Score {name} not found."
-        score = self.scores[name].read_scores(get_x=get_x, ma=ma)
-        return score
+        if self.shard is None and os.path.exists(self.scores[name].score_file):
+            return self.scores[name].read_scores(get_x=get_x, ma=ma, x_min=x_min, x_max=x_max, last_n=last_n)
+
+        self.scores[name].flush()
+        paths = list_score_files(self.score_dir).get(name, [])
+        if x_min is None and x_max is None and last_n is None:
+            x, y = read_merged_scores(paths)
+        else:
+            # les last_n derniers points fusionnés sont parmi les last_n derniers de chaque shard
+            x, y = merge_shards([read_score_range(path, x_min=x_min, x_max=x_max, last_n=last_n) for path in paths])
+            x, y = slice_scores(x, y, last_n=last_n)
+        if ma is not None and ma is not False:
+            window = ma if not isinstance(ma, bool) else 15
+            y = compute_moving_average(y, window)
+        if get_x:
+            return (x, y)
+        return y
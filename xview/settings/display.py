@@ -252,6 +252,7 @@ class DisplaySettings(QWidget):
         self.dark_mode_enabled = get_config_file()["dark_mode"]
         self.interval = self.get_interval()
         self.ma_window_size = get_config_data("ma_window_size")
+        self.ma_mode = get_config_data("ma_mode") or "sma"
 
         self.curve_colors = self.get_curve_colors()
         self.flag_colors = self.get_flag_colors()
@@ -355,6 +356,21 @@ class DisplaySettings(QWidget):
         self.ma_window_input.editingFinished.connect(self.set_ma_window_size)
         self.left_layout.addWidget(self.ma_window_widget)
 
+        # ------------------------------------------------------------------------------------------
+        # region - MA MODE
+        self.ma_mode_widget = QWidget()
+        self.ma_mode_layout = QHBoxLayout()
+
+        self.ma_mode_label = QLabel("Moving Avg type :")
+        self.ma_mode_combo = QComboBox()
+        self.ma_mode_combo.addItems(["sma", "ema"])
+        self.ma_mode_combo.setCurrentText(self.ma_mode)
+        self.ma_mode_combo.currentTextChanged.connect(self.set_ma_mode)
+        self.ma_mode_layout.addWidget(self.ma_mode_label)
+        self.ma_mode_layout.addWidget(self.ma_mode_combo)
+        self.ma_mode_widget.setLayout(self.ma_mode_layout)
+        self.left_layout.addWidget(self.ma_mode_widget)
+
         # ----------------------------------------------------------- FLAGS
         section_label_2 = QLabel("Flags style")
         section_label_2.setAlignment(Qt.AlignCenter)
@@ -565,6 +581,11 @@ class DisplaySettings(QWidget):
         self.ma_window_size = int(ma_window_size)
         set_config_data('ma_window_size', self.ma_window_size)
 
+    def set_ma_mode(self, ma_mode):
+        """Persist the MA type ("sma" or "ema") to config."""
+        self.ma_mode = ma_mode
+        set_config_data('ma_mode', self.ma_mode)
+
     def add_palette(self):
         """Create a new named palette and select it."""
         new_palette_name, ok = QInputDialog.getText(self, "Add Palette", "Enter new palette name:")
@@ -21,7 +21,7 @@ Example structure:
 """
 
 from xview import CONFIG_FILE_DIR
-import json
+from xview.utils.utils import read_json, write_json
 import os
 from xview import set_config_data
 
@@ -64,7 +64,7 @@ class Palette(object):
         """Read and return the palette JSON config as a dictionary."""
         if not os.path.exists(self.config_file):
             raise FileNotFoundError(f"No palette config file found at {self.config_file}.")
-        config = json.load(open(self.config_file))
+        config = read_json(self.config_file)
         return config
 
     #  lire une seule palette
@@ -78,8 +78,7 @@ class Palette(object):
     #  réécrire le fichier de configuration des palettes
     def set_config_file(self, config):
         """Overwrite the palette config file with the provided mapping."""
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=4)
+        write_json(self.config_file, config)
 
     # écrire une palette dans le fichier de configuration
     def set_config_palette(self):
@@ -9,7 +9,7 @@ from xview.compare_window import ComparisonWindow
 class MyTreeWidget(QTreeWidget):
     """QTreeWidget with helpers to populate, filter, and context-menu actions."""
 
-    def __init__(self, parent=None, display_exp=None, display_range=None, items=None, remove_folders_callback=None, move_exp_callback=None, copy_exp_callback=None):
+    def __init__(self, parent=None, display_exp=None, display_range=None, items=None, remove_folders_callback=None, move_exp_callback=None, copy_exp_callback=None, export_artifacts_callback=None):
         super().__init__(parent)
         self.setHeaderHidden(True)  # Masque le titre
         # Rendre explicite le mode de sélection pour éviter les surprises
@@ -19,6 +19,7 @@ class MyTreeWidget(QTreeWidget):
         self.remove_folders_callback = remove_folders_callback
         self.move_exp_callback = move_exp_callback
         self.copy_exp_callback = copy_exp_callback
+        self.export_artifacts_callback = export_artifacts_callback
 
         self.itemClicked.connect(self.on_click_item)
 
@@ -225,6 +226,10 @@ class MyTreeWidget(QTreeWidget):
         if item.childCount() > 0:
             compare_action = menu.addAction("Compare")
 
+        export_action = None
+        if item.childCount() == 0 and self.export_artifacts_callback is not None:
+            export_action = menu.addAction("Export artifacts")
+
         action_rm = menu.addAction("Remove")
 
         action = menu.exec_(self.mapToGlobal(pos))
@@ -234,6 +239,8 @@ class MyTreeWidget(QTreeWidget):
                 self.remove_folders_callback(item_data)
         elif compare_action is not None and action == compare_action:
             self.compare_exp_from_group(full_path)
+        elif export_action is not None and action == export_action:
+            self.export_artifacts_callback(full_path)
 
     def confirm_removal(self, item_name, is_group, children_to_remove=0):
         """Ask for confirmation before removing an experiment or a group."""
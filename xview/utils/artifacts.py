@@ -0,0 +1,144 @@
+"""Content-addressed store for the files attached to experiments (images, diagrams...).
+
+Blobs are stored once per data folder, under ``<data_folder>/.artifacts/<ab>/<sha256>``
+where ``ab`` are the first two characters of the SHA-256 of their content. Each
+experiment only keeps references in ``artifacts.json``: artifact name -> hash,
+size and original file name. Copying or moving an experiment therefore copies
+a few bytes of JSON, and the same file attached to 200 runs is stored once.
+
+Blobs are never modified once written (they are made read-only) and never
+linked into experiment folders: export_artifacts writes regular copies on
+demand. Unreferenced blobs are removed by collect_artifacts, run by the GUI
+after each Trash cleanup.
+"""
+
+import os
+import shutil
+import hashlib
+import stat
+import time
+import threading
+from xview.utils.utils import read_json, write_json, replace_file
+
+
+ARTIFACTS_DIR = ".artifacts"
+ARTIFACTS_FILE = "artifacts.json"
+_HASH_CHUNK = 1024 * 1024
+# in seconds, âge minimal d'un blob non référencé avant suppression : laisse à un
+# entraînement le temps d'écrire la référence d'un blob qu'il vient de stocker
+ARTIFACTS_GC_MIN_AGE = 3600
+
+
+def store_folder(data_folder):
+    """Return the artifact store of a data folder."""
+    return os.path.join(data_folder, ARTIFACTS_DIR)
+
+
+def blob_path(store, digest):
+    """Return the path of the blob with the given SHA-256 in a store."""
+    return os.path.join(store, digest[:2], digest)
+
+
+def hash_file(path):
+    """Return the SHA-256 (hex) of a file, read in 1 MB chunks."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def store_blob(store, source):
+    """Add a file (path) or bytes to the store and return (sha256, size).
+
+    Nothing is written if the store already holds this content.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = bytes(source)
+        digest, size = hashlib.sha256(data).hexdigest(), len(data)
+    else:
+        data = None
+        digest, size = hash_file(source), os.path.getsize(source)
+    path = blob_path(store, digest)
+    if os.path.exists(path):
+        # blob réutilisé : rajeuni pour que collect_artifacts ne le supprime pas avant sa référence
+        os.utime(path)
+        return digest, size
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if data is not None:
+        replace_file(path, data)
+    else:
+        # copie sous un nom temporaire puis os.replace : un lecteur ne voit jamais de blob partiel
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+    os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    return digest, size
+
+
+def read_artifacts(experiment_folder):
+    """Return the artifact references of an experiment: name -> {"hash", "size", "file_name"}."""
+    path = os.path.join(experiment_folder, ARTIFACTS_FILE)
+    if not os.path.exists(path):
+        return {}
+    return read_json(path)
+
+
+def write_artifacts(experiment_folder, artifacts):
+    """Replace the artifact references of an experiment."""
+    write_json(os.path.join(experiment_folder, ARTIFACTS_FILE), artifacts)
+
+
+def export_artifacts(data_folder, experiment_folder, dest_folder):
+    """Write a regular, writable copy of each artifact of an experiment under dest_folder; return their paths.
+
+    Each artifact is copied under its original file name, in the sub-folder
+    of its name if any (figures/<date>.png for the graphs saved by the GUI),
+    so that it can be opened or edited without touching the read-only blob.
+    """
+    store = store_folder(data_folder)
+    paths = []
+    for name, ref in read_artifacts(experiment_folder).items():
+        path = os.path.join(dest_folder, os.path.dirname(name), ref["file_name"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # copyfile ne reprend pas le mode du blob : la copie reste modifiable
+        shutil.copyfile(blob_path(store, ref["hash"]), path)
+        paths.append(path)
+    return paths
+
+
+def collect_artifacts(data_folder, extra_folders=(), min_age=ARTIFACTS_GC_MIN_AGE):
+    """Delete the blobs no experiment refers to anymore; return the number of bytes freed.
+
+    References are looked up in every artifacts.json under data_folder and
+    extra_folders (e.g. the Trash, so that restored experiments keep their files).
+    Blobs stored or reused less than min_age seconds ago are kept, since the
+    experiment adding them may not have written its reference yet.
+    """
+    referenced = set()
+    for root in (data_folder, *extra_folders):
+        for folder, dirs, files in os.walk(root):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            if ARTIFACTS_FILE in files:
+                referenced.update(ref["hash"] for ref in read_artifacts(folder).values())
+
+    freed = 0
+    now = time.time()
+    store = store_folder(data_folder)
+    if not os.path.isdir(store):
+        return freed
+    for prefix in os.listdir(store):
+        prefix_folder = os.path.join(store, prefix)
+        for digest in os.listdir(prefix_folder):
+            # les .tmp sont des blobs en cours d'écriture par un autre processus
+            if digest in referenced or digest.endswith(".tmp"):
+                continue
+            path = os.path.join(prefix_folder, digest)
+            info = os.stat(path)
+            if now - info.st_mtime < min_age:
+                continue
+            # blob en lecture seule : Windows refuse de le supprimer sinon
+            os.chmod(path, stat.S_IWUSR | stat.S_IRUSR)
+            os.remove(path)
+            freed += info.st_size
+    return freed
@@ -0,0 +1,157 @@
+"""Background writer thread used by the asynchronous logging mode.
+
+Calls are appended to a ``collections.deque`` (append/popleft are atomic, so
+the producer never takes a lock) and a dedicated thread drains it in batches.
+The queue is bounded: when full, ``backpressure="block"`` makes the producer
+wait for room and ``backpressure="drop"`` discards the new call. Every worker
+is drained at interpreter exit.
+"""
+
+import atexit
+import collections
+import threading
+import time
+import weakref
+
+
+DEFAULT_MAX_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 256
+
+_workers = weakref.WeakSet()
+
+
+class AsyncWriter(object):
+    """Execute submitted calls in order on a dedicated daemon thread."""
+
+    def __init__(self, name="xview-writer", max_queue_size=DEFAULT_MAX_QUEUE_SIZE, backpressure="block",
+                 batch_size=DEFAULT_BATCH_SIZE):
+        assert backpressure in ("block", "drop"), f"Unknown backpressure policy {backpressure}."
+        self.max_queue_size = max_queue_size
+        self.backpressure = backpressure
+        self.batch_size = batch_size
+
+        self._queue = collections.deque()
+        self._wakeup = threading.Event()
+        self._room = threading.Event()
+        self._room.set()
+        self._done = threading.Condition()
+        self._closed = False
+
+        self._submitted = 0
+        self._processed = 0
+        self._dropped = 0
+        self._errors = 0
+        self._last_error = None
+        self._batches = 0
+        self._max_depth = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        _workers.add(self)
+
+    @property
+    def closed(self):
+        """True once close() has drained the queue and stopped the thread."""
+        return self._closed
+
+    def in_worker_thread(self):
+        """True when called from the writer thread itself."""
+        return threading.current_thread() is self._thread
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs); return False if it was dropped."""
+        if self._closed:
+            raise RuntimeError("AsyncWriter is closed.")
+        while len(self._queue) >= self.max_queue_size:
+            if self.backpressure == "drop":
+                self._dropped += 1
+                return False
+            self._room.clear()
+            self._wakeup.set()
+            self._room.wait(0.1)
+        self._queue.append((fn, args, kwargs, time.perf_counter()))
+        self._submitted += 1
+        depth = len(self._queue)
+        if depth > self._max_depth:
+            self._max_depth = depth
+        self._wakeup.set()
+        return True
+
+    def flush(self, timeout=None):
+        """Block until every call submitted so far has been executed."""
+        if self.in_worker_thread():
+            return True
+        target = self._submitted
+        self._wakeup.set()
+        with self._done:
+            return self._done.wait_for(lambda: self._processed >= target, timeout)
+
+    def close(self, timeout=None):
+        """Drain the queue and stop the thread."""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        self._wakeup.set()
+        if not self.in_worker_thread():
+            self._thread.join(timeout)
+
+    def stats(self):
+        """Return queue depth, throughput and latency counters.
+
+        Latencies are in seconds, from submission to the end of the write.
+        last_error is the repr of the last exception raised by a call, or None.
+        """
+        processed = self._processed
+        return {
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self._max_depth,
+            "submitted": self._submitted,
+            "processed": processed,
+            "dropped": self._dropped,
+            "errors": self._errors,
+            "last_error": self._last_error,
+            "batches": self._batches,
+            "mean_latency": self._total_latency / processed if processed else 0.0,
+            "max_latency": self._max_latency,
+        }
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue:
+                batch = []
+                while self._queue and len(batch) < self.batch_size:
+                    batch.append(self._queue.popleft())
+                self._room.set()
+                for fn, args, kwargs, submit_time in batch:
+                    try:
+                        fn(*args, **kwargs)
+                    except Exception as e:
+                        self._errors += 1
+                        # une même erreur répétée (ex. partage réseau indisponible) n'est affichée qu'une fois
+                        if repr(e) != self._last_error:
+                            print(f"/!\\ Erreur dans le thread d'écriture : {e!r}")
+                        self._last_error = repr(e)
+                    latency = time.perf_counter() - submit_time
+                    self._total_latency += latency
+                    if latency > self._max_latency:
+                        self._max_latency = latency
+                self._batches += 1
+                with self._done:
+                    self._processed += len(batch)
+                    self._done.notify_all()
+            if self._closed:
+                return
+
+
+def drain_all_writers():
+    """Flush every AsyncWriter of the process."""
+    for worker in list(_workers):
+        worker.flush()
+
+
+atexit.register(drain_all_writers)
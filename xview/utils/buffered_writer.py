@@ -0,0 +1,194 @@
+"""Append-only file writers that keep their handle open and batch lines in memory.
+
+Used by Score when an Experiment is created with ``buffered=True``: points are
+queued in memory and written in one call once a size or age threshold is hit.
+A daemon thread flushes stale buffers so readers (the GUI) see new points
+within ``flush_interval`` seconds. Every open writer is flushed at exit, and a
+writer dropped without close() is flushed when garbage collected.
+"""
+
+import atexit
+import threading
+import time
+import weakref
+from xview.utils.utils import replace_file
+
+
+DEFAULT_MAX_LINES = 1000
+DEFAULT_FLUSH_INTERVAL = 1.0  # in seconds
+_FLUSHER_TICK = 0.25  # in seconds
+
+_open_writers = weakref.WeakSet()  # un écrivain abandonné n'est pas retenu jusqu'à la sortie
+_registry_lock = threading.Lock()
+_flusher_thread = None
+
+
+class _WriterState(object):
+    """Buffer and file handle of a BufferedFileWriter, kept apart so a finalizer can flush them."""
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+        self.buffer = []
+        self.buffer_size = 0
+        self.first_pending_time = None
+        self.truncate_pending = False
+        self.lock = threading.Lock()
+
+    def flush_locked(self):
+        if not self.buffer and not self.truncate_pending:
+            return
+        if self.truncate_pending:
+            if self.handle is not None:
+                self.handle.close()
+            self.handle = open(self.path, "wb")
+            self.truncate_pending = False
+        elif self.handle is None:
+            self.handle = open(self.path, "ab")
+        self.handle.write(b"".join(self.buffer))
+        self.handle.flush()
+        self.buffer = []
+        self.buffer_size = 0
+        self.first_pending_time = None
+
+    def close(self):
+        with self.lock:
+            self.flush_locked()
+            if self.handle is not None:
+                self.handle.close()
+                self.handle = None
+
+
+def _finalize_state(state):
+    # écrivain abandonné sans close() : ses points sont écrits et son fichier fermé
+    try:
+        state.close()
+    except OSError as e:
+        print(f"/!\\ Erreur lors de l'écriture de {state.path} : {e}")
+
+
+class BufferedFileWriter(object):
+    """Buffered appender for one file, flushed on size, age, or explicit request.
+
+    A writer dropped without close() is flushed and closed when garbage collected.
+    """
+
+    def __init__(self, path, max_lines=DEFAULT_MAX_LINES, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.max_lines = max_lines
+        self.flush_interval = flush_interval
+        self._state = _WriterState(path)
+        self._finalizer = weakref.finalize(self, _finalize_state, self._state)
+        _register(self)
+
+    @property
+    def pending_lines(self):
+        """Number of chunks buffered and not yet written to disk."""
+        return len(self._state.buffer)
+
+    @property
+    def pending_bytes(self):
+        """Number of bytes buffered and not yet written to disk."""
+        return self._state.buffer_size
+
+    @property
+    def truncate_pending(self):
+        """True if the file will be truncated on the next flush."""
+        return self._state.truncate_pending
+
+    def write(self, data, truncate=False):
+        """Queue a str or bytes chunk; drop file content first if truncate is set."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        state = self._state
+        with state.lock:
+            if truncate:
+                state.buffer = []
+                state.buffer_size = 0
+                state.truncate_pending = True
+            if not state.buffer:
+                state.first_pending_time = time.monotonic()
+            state.buffer.append(data)
+            state.buffer_size += len(data)
+            if len(state.buffer) >= self.max_lines or self._is_stale():
+                state.flush_locked()
+
+    def replace(self, data):
+        """Drop buffered chunks and atomically replace the file with data."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        state = self._state
+        with state.lock:
+            state.buffer = []
+            state.buffer_size = 0
+            state.truncate_pending = False
+            if state.handle is not None:
+                state.handle.close()
+                state.handle = None
+            replace_file(self.path, data)
+
+    def flush(self):
+        """Write all buffered chunks to disk."""
+        with self._state.lock:
+            self._state.flush_locked()
+
+    def flush_if_stale(self):
+        """Flush only if the oldest buffered chunk is older than flush_interval."""
+        with self._state.lock:
+            if self._is_stale():
+                self._state.flush_locked()
+
+    def release(self):
+        """Flush pending data and close the handle; the next write reopens the file."""
+        self._state.close()
+
+    def close(self):
+        """Flush pending data, close the handle and unregister the writer."""
+        self._state.close()
+        _unregister(self)
+
+    def _is_stale(self):
+        state = self._state
+        return bool(state.buffer) and time.monotonic() - state.first_pending_time >= self.flush_interval
+
+
+def _register(writer):
+    global _flusher_thread
+    with _registry_lock:
+        _open_writers.add(writer)
+        if _flusher_thread is None:
+            _flusher_thread = threading.Thread(target=_flusher_loop, name="xview-flusher", daemon=True)
+            _flusher_thread.start()
+
+
+def _unregister(writer):
+    with _registry_lock:
+        _open_writers.discard(writer)
+
+
+def _flush_stale_writers():
+    # références fortes limitées à cet appel : le thread ne retient aucun écrivain pendant son sommeil
+    with _registry_lock:
+        writers = list(_open_writers)
+    for writer in writers:
+        try:
+            writer.flush_if_stale()
+        except OSError as e:
+            print(f"/!\\ Erreur lors de l'écriture de {writer.path} : {e}")
+
+
+def _flusher_loop():
+    while True:
+        time.sleep(_FLUSHER_TICK)
+        _flush_stale_writers()
+
+
+def flush_all_writers():
+    """Flush every open BufferedFileWriter of the process."""
+    with _registry_lock:
+        writers = list(_open_writers)
+    for writer in writers:
+        writer.flush()
+
+
+atexit.register(flush_all_writers)
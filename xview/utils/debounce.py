@@ -0,0 +1,82 @@
+"""Debounced callbacks used to coalesce frequent small file rewrites.
+
+A Debouncer runs its callback at most once every ``interval`` seconds. A call
+arriving too early is not lost: a trailing timer runs the callback once the
+interval has elapsed. Pending callbacks are run at interpreter exit.
+"""
+
+import atexit
+import threading
+import time
+import weakref
+
+
+_debouncers = weakref.WeakSet()
+
+
+class Debouncer(object):
+    """Coalesce ``touch()`` calls into at most one callback run per interval."""
+
+    def __init__(self, callback, interval):
+        self.callback = callback
+        self.interval = interval
+        self._last_run = None
+        self._pending = False
+        self._timer = None
+        self._lock = threading.RLock()
+        _debouncers.add(self)
+
+    @property
+    def pending(self):
+        """True if a callback run has been requested but not done yet."""
+        return self._pending
+
+    def touch(self):
+        """Request a callback run, now if the interval elapsed, else at its end."""
+        with self._lock:
+            self._pending = True
+            elapsed = None if self._last_run is None else time.monotonic() - self._last_run
+            if elapsed is None or elapsed >= self.interval:
+                self._run_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.interval - elapsed, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Run the callback now if a run is pending."""
+        with self._lock:
+            if self._pending:
+                self._run_locked()
+
+    def cancel(self):
+        """Drop the pending run, if any."""
+        with self._lock:
+            self._pending = False
+            self._cancel_timer()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            if self._pending:
+                self._run_locked()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _run_locked(self):
+        self._cancel_timer()
+        self._pending = False
+        self._last_run = time.monotonic()
+        self.callback()
+
+
+def flush_all_debouncers():
+    """Run every pending debounced callback of the process."""
+    for debouncer in list(_debouncers):
+        debouncer.flush()
+
+
+atexit.register(flush_all_debouncers)
@@ -0,0 +1,58 @@
+"""Viewport-aware decimation of curves before they are handed to matplotlib.
+
+The visible x range is cut into one bucket per horizontal pixel and only the
+first, last, min and max points of each bucket are kept, in their original
+order. Spikes stay visible and a curve never has more than about
+``4 * n_buckets`` vertices, whatever its length.
+"""
+
+import numpy as np
+
+
+def visible_slice(x, x_min=None, x_max=None):
+    """Return the slice of a sorted x covering [x_min, x_max], plus one point on each side."""
+    start = 0 if x_min is None else max(int(np.searchsorted(x, x_min, side="left")) - 1, 0)
+    stop = len(x) if x_max is None else min(int(np.searchsorted(x, x_max, side="right")) + 1, len(x))
+    return slice(start, stop)
+
+
+def minmax_decimate(x, y, n_buckets, x_min=None, x_max=None):
+    """Reduce (x, y) to the first/last/min/max points of n_buckets equal-width x buckets.
+
+    x may be None (or empty) for series logged without steps: the point index
+    is used instead. The returned x is then that index. Curves whose x is not
+    sorted are returned untouched, as are curves already small enough.
+    """
+    y = np.asarray(y, dtype=float)
+    if x is None or len(x) == 0:
+        x = np.arange(len(y), dtype=float)
+    else:
+        x = np.asarray(x, dtype=float)
+    if len(x) != len(y) or len(y) <= 4 * n_buckets or n_buckets < 1:
+        return x, y
+    if np.any(x[1:] < x[:-1]):
+        return x, y
+
+    visible = visible_slice(x, x_min, x_max)
+    x, y = x[visible], y[visible]
+    n = len(y)
+    if n <= 4 * n_buckets:
+        return x, y
+
+    # début de chaque bucket (les buckets vides sont ignorés)
+    edges = np.linspace(x[0], x[-1], n_buckets + 1)[1:-1]
+    starts = np.unique(np.concatenate(([0], np.searchsorted(x, edges, side="left"))))
+    starts = starts[starts < n]
+    ends = np.append(starts[1:], n) - 1
+
+    # indices des min/max de chaque bucket, les NaN sont ignorés
+    index = np.arange(n)
+    y_low = np.fmin.reduceat(y, starts)
+    y_high = np.fmax.reduceat(y, starts)
+    counts = np.diff(np.append(starts, n))
+    arg_low = np.minimum.reduceat(np.where(y == np.repeat(y_low, counts), index, n), starts)
+    arg_high = np.minimum.reduceat(np.where(y == np.repeat(y_high, counts), index, n), starts)
+
+    keep = np.unique(np.concatenate((starts, ends, arg_low, arg_high)))
+    keep = keep[keep < n]
+    return x[keep], y[keep]
@@ -0,0 +1,26 @@
+"""Advisory inter-process file locks for files shared by several writers.
+
+Locks are taken with ``fcntl.flock`` on a ``<path>.lock`` companion file. On
+platforms without fcntl the lock is a no-op.
+"""
+
+import contextlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+@contextlib.contextmanager
+def file_lock(path, shared=False):
+    """Hold an exclusive (or shared) advisory lock on ``path`` for the with-block."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,147 @@
+"""Compact per-step distributions (weights, activations...) stored one file per series.
+
+Each call to Experiment.add_histogram summarises an array of values into one
+fixed-width record: step, count, min, max, mean, std, the HISTOGRAM_QUANTILES
+quantiles and the counts of ``n_bins`` equal-width bins between min and max.
+Records are appended to ``histograms/<name>.hist`` after a small header
+(magic, then the JSON layout: number of bins and quantile levels), so a reader
+memory-maps the whole series as one structured array.
+
+Steps logged without x are stored as NaN and read back as the record index.
+"""
+
+import os
+import json
+import struct
+import numpy as np
+from xview.utils.buffered_writer import BufferedFileWriter
+
+
+HISTOGRAM_MAGIC = b"XVHIST01"
+HISTOGRAM_EXTENSION = ".hist"
+HISTOGRAM_BINS = 32
+HISTOGRAM_QUANTILES = (0.0, 0.05, 0.25, 0.5, 0.75, 0.95, 1.0)
+# paires de quantiles tracées en bandes par le GUI, de la plus large à la plus étroite
+HISTOGRAM_BANDS = ((0.05, 0.95), (0.25, 0.75))
+
+
+def histogram_dtype(n_bins, n_quantiles=len(HISTOGRAM_QUANTILES)):
+    """Return the record dtype of a histogram series with n_bins bins."""
+    return np.dtype([
+        ("x", "<f8"), ("count", "<i8"),
+        ("min", "<f8"), ("max", "<f8"), ("mean", "<f8"), ("std", "<f8"),
+        ("quantiles", "<f8", (n_quantiles,)), ("bins", "<i8", (n_bins,)),
+    ])
+
+
+def _as_array(values):
+    # tenseurs (torch...) : détachés et copiés sur CPU avant conversion
+    if hasattr(values, "detach"):
+        values = values.detach().cpu().numpy()
+    return np.asarray(values, dtype=float).ravel()
+
+
+def compute_histogram(values, x=None, n_bins=HISTOGRAM_BINS):
+    """Summarise values (array-like, any shape) into one histogram record.
+
+    NaN and infinite values are left out; count is the number of finite values.
+    """
+    record = np.zeros(1, dtype=histogram_dtype(n_bins))
+    values = _as_array(values)
+    values = values[np.isfinite(values)]
+    record["x"] = np.nan if x is None else x
+    record["count"] = len(values)
+    if len(values) == 0:
+        for field in ("min", "max", "mean", "std", "quantiles"):
+            record[field] = np.nan
+        return record
+    low, high = values.min(), values.max()
+    record["min"], record["max"] = low, high
+    record["mean"], record["std"] = values.mean(), values.std()
+    record["quantiles"] = np.quantile(values, HISTOGRAM_QUANTILES)
+    # bins de même largeur entre min et max : indice calculé directement, sans recherche des bords
+    scale = n_bins / (high - low) if high > low else 0.0
+    record["bins"] = np.bincount(np.minimum(((values - low) * scale).astype(np.intp), n_bins - 1), minlength=n_bins)
+    return record
+
+
+def _header(n_bins):
+    layout = json.dumps({"n_bins": n_bins, "quantiles": list(HISTOGRAM_QUANTILES)}).encode("utf-8")
+    return HISTOGRAM_MAGIC + struct.pack("<I", len(layout)) + layout
+
+
+def read_histogram_header(path):
+    """Return (layout dict, offset of the first record) of a histogram file, or (None, 0) if invalid."""
+    with open(path, "rb") as f:
+        start = f.read(len(HISTOGRAM_MAGIC) + 4)
+        if len(start) < len(HISTOGRAM_MAGIC) + 4 or not start.startswith(HISTOGRAM_MAGIC):
+            return None, 0
+        length = struct.unpack("<I", start[len(HISTOGRAM_MAGIC):])[0]
+        layout = f.read(length)
+    if len(layout) < length:
+        return None, 0
+    return json.loads(layout), len(start) + length
+
+
+def read_histograms(path, start=0):
+    """Read the records of a histogram file from the start-th one (x replaced by the index when not logged)."""
+    layout, offset = read_histogram_header(path) if os.path.exists(path) else (None, 0)
+    if layout is None:
+        return np.empty(0, dtype=histogram_dtype(HISTOGRAM_BINS))
+    dtype = histogram_dtype(layout["n_bins"], len(layout["quantiles"]))
+    n_records = (os.path.getsize(path) - offset) // dtype.itemsize - start
+    if n_records <= 0:
+        return np.empty(0, dtype=dtype)
+    records = np.array(np.memmap(path, dtype=dtype, mode="r", offset=offset + start * dtype.itemsize, shape=(n_records,)))
+    records["x"] = np.where(np.isnan(records["x"]), np.arange(start, start + n_records), records["x"])
+    return records
+
+
+def list_histogram_files(folder):
+    """Return a dict series name -> path of the histogram files of a folder."""
+    if not os.path.isdir(folder):
+        return {}
+    return {file_name[:-len(HISTOGRAM_EXTENSION)]: os.path.join(folder, file_name)
+            for file_name in sorted(os.listdir(folder)) if file_name.endswith(HISTOGRAM_EXTENSION)}
+
+
+class HistogramSeries(object):
+    """Append histogram records to one file, optionally through a BufferedFileWriter."""
+
+    def __init__(self, path, n_bins=HISTOGRAM_BINS, buffered=False):
+        self.path = path
+        self.n_bins = n_bins
+        self.dtype = histogram_dtype(n_bins)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            layout, offset = read_histogram_header(path)
+            if layout is None or layout["n_bins"] != n_bins or tuple(layout["quantiles"]) != HISTOGRAM_QUANTILES:
+                raise ValueError(f"Histogram file {path} has another layout than {n_bins} bins.")
+            # un enregistrement interrompu (arrêt brutal) décalerait tous les suivants
+            extra = (os.path.getsize(path) - offset) % self.dtype.itemsize
+            if extra:
+                os.truncate(path, os.path.getsize(path) - extra)
+        else:
+            with open(path, "wb") as f:
+                f.write(_header(n_bins))
+        self.writer = BufferedFileWriter(path) if buffered else None
+
+    def add_record(self, record):
+        """Append one record computed by compute_histogram."""
+        if record.dtype != self.dtype:
+            raise ValueError(f"Histogram record does not match the {self.n_bins} bins of {self.path}.")
+        data = record.tobytes()
+        if self.writer is not None:
+            self.writer.write(data)
+        else:
+            with open(self.path, "ab") as f:
+                f.write(data)
+
+    def flush(self):
+        """Write buffered records to disk (no-op when unbuffered)."""
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self):
+        """Flush and release the file handle (no-op when unbuffered)."""
+        if self.writer is not None:
+            self.writer.close()
@@ -0,0 +1,238 @@
+"""Same-host live channel from a training process to the GUI, through shared memory.
+
+An Experiment created with ``live=True`` publishes each score point into a ring
+buffer (``multiprocessing.shared_memory``) and registers it in
+``<data_folder>/.live/<key>.json`` (shared memory name, pid, series names).
+The GUI attaches to it and gets the new points without reading any file.
+
+The files stay the source of truth: the ring buffer only holds the last
+``capacity`` points, and a reader that falls behind (or attaches late) just
+misses points, which it gets back from disk on its next refresh. Each point
+carries its index in the series so that the reader can skip those already on
+disk.
+
+Layout of the shared memory: magic, capacity and number of points written so
+far (int64), then ``capacity`` LIVE_RECORD slots. There is one writer per
+channel; the count is increased after the slot is written.
+"""
+
+import os
+import sys
+import atexit
+import struct
+import hashlib
+import weakref
+import numpy as np
+from multiprocessing import shared_memory
+from xview.utils.utils import read_json_cached, write_json
+
+
+LIVE_DIR = ".live"
+LIVE_MAGIC = b"XVLIVE01"
+LIVE_CAPACITY = 65536  # points gardés dans l'anneau (2 Mo)
+LIVE_RECORD = np.dtype([("series", "<i8"), ("index", "<i8"), ("x", "<f8"), ("y", "<f8")])
+_HEADER_SIZE = 32  # magic, capacité, nombre de points écrits, réservé
+_COUNT_OFFSET = 16
+# côté écrivain, struct.pack_into est plus rapide qu'une affectation dans un tableau structuré numpy
+_RECORD_STRUCT = struct.Struct("<qqdd")
+_COUNT_STRUCT = struct.Struct("<q")
+# API Windows utilisée par _pid_alive
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_ERROR_ACCESS_DENIED = 5
+_STILL_ACTIVE = 259
+
+_writers = weakref.WeakSet()
+
+
+def registry_path(data_folder, experiment):
+    """Return the registry file of the live channel of an experiment (path relative to data_folder)."""
+    key = hashlib.sha1(os.path.normpath(experiment).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(data_folder, LIVE_DIR, f"{key}.json")
+
+
+def _pid_alive(pid):
+    if os.name == "nt":
+        # sous Windows, os.kill(pid, 0) termine le processus : on interroge son code de sortie
+        import ctypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.OpenProcess.restype = ctypes.c_void_p  # HANDLE, tronqué en int 32 bits sinon
+        kernel32.GetExitCodeProcess.argtypes = (ctypes.c_void_p, ctypes.POINTER(ctypes.c_ulong))
+        kernel32.CloseHandle.argtypes = (ctypes.c_void_p,)
+        handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            # processus inexistant, ou accès refusé : il existe alors bel et bien
+            return ctypes.get_last_error() == _ERROR_ACCESS_DENIED
+        try:
+            exit_code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            return exit_code.value == _STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        pass
+    return True
+
+
+def _attach(name, untrack=True):
+    # Avant Python 3.13, s'attacher enregistre le segment auprès du resource_tracker,
+    # qui le détruirait à la sortie du lecteur : seul l'écrivain le possède.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if not untrack:
+        # même processus que l'écrivain : le resource_tracker est partagé
+        return shm
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+def _views(shm):
+    # (compteur de points écrits, tableau des slots) sur la mémoire partagée
+    count = np.ndarray((1,), dtype="<i8", buffer=shm.buf, offset=_COUNT_OFFSET)
+    capacity = int(np.ndarray((1,), dtype="<i8", buffer=shm.buf, offset=8)[0])
+    records = np.ndarray((capacity,), dtype=LIVE_RECORD, buffer=shm.buf, offset=_HEADER_SIZE)
+    return count, records
+
+
+class LiveChannelWriter(object):
+    """Publish score points of one experiment into a shared memory ring buffer."""
+
+    def __init__(self, data_folder, experiment, capacity=LIVE_CAPACITY):
+        self.registry = registry_path(data_folder, experiment)
+        self.experiment = experiment
+        self.capacity = capacity
+        self.series = {}  # nom -> identifiant dans les enregistrements
+        self._shm = shared_memory.SharedMemory(create=True, size=_HEADER_SIZE + capacity * LIVE_RECORD.itemsize)
+        self._shm.buf[:8] = LIVE_MAGIC
+        struct.pack_into("<qq", self._shm.buf, 8, capacity, 0)
+        self._count = 0
+        os.makedirs(os.path.dirname(self.registry), exist_ok=True)
+        self._write_registry()
+        _writers.add(self)
+
+    def _write_registry(self):
+        write_json(self.registry, {"experiment": self.experiment, "shm_name": self._shm.name, "pid": os.getpid(),
+                                   "capacity": self.capacity, "series": list(self.series)})
+
+    def publish(self, name, index, x, y):
+        """Publish the index-th point of the series name (x None when logged without x)."""
+        if self._shm is None:
+            return
+        series = self.series.get(name)
+        if series is None:
+            # le registre connaît la série avant qu'un point ne la référence
+            series = self.series[name] = len(self.series)
+            self._write_registry()
+        buf = self._shm.buf
+        _RECORD_STRUCT.pack_into(buf, _HEADER_SIZE + (self._count % self.capacity) * LIVE_RECORD.itemsize,
+                                 series, index, np.nan if x is None else x, y)
+        self._count += 1
+        _COUNT_STRUCT.pack_into(buf, _COUNT_OFFSET, self._count)
+
+    def close(self):
+        """Unregister the channel and destroy the shared memory."""
+        if self._shm is None:
+            return
+        try:
+            if read_json_cached(self.registry).get("shm_name") == self._shm.name:
+                os.remove(self.registry)
+        except (OSError, ValueError):
+            pass
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        self._shm = None
+
+
+class LiveChannelReader(object):
+    """Read the points published on the live channel of one experiment, if any."""
+
+    def __init__(self, data_folder, experiment):
+        self.registry = registry_path(data_folder, experiment)
+        self.experiment = experiment
+        self.series = []
+        self._shm = None
+        self._shm_name = None
+        self._cursor = 0
+
+    @property
+    def attached(self):
+        """True while attached to a running writer."""
+        return self._shm is not None
+
+    def _sync_registry(self):
+        # (ré)attache quand un écrivain (re)démarre, détache quand il disparaît
+        try:
+            registry = read_json_cached(self.registry)
+        except (OSError, ValueError):
+            registry = None
+        if registry is None or not _pid_alive(registry["pid"]):
+            self.close()
+            return
+        self.series = registry["series"]
+        if registry["shm_name"] == self._shm_name:
+            return
+        self.close()
+        try:
+            shm = _attach(registry["shm_name"], untrack=registry["pid"] != os.getpid())
+        except (OSError, ValueError):
+            return
+        if bytes(shm.buf[:8]) != LIVE_MAGIC:
+            shm.close()
+            return
+        self._shm, self._shm_name = shm, registry["shm_name"]
+        self._count, self._records = _views(shm)
+        # les points déjà publiés sont sur disque (ou le seront) : on part du compteur actuel
+        self._cursor = int(self._count[0])
+
+    def read(self):
+        """Return {series name: (index, x, y)} of the points published since the last call (arrays, x NaN if not logged)."""
+        self._sync_registry()
+        if self._shm is None:
+            return {}
+        capacity = len(self._records)
+        count = int(self._count[0])
+        start = max(self._cursor, count - capacity)
+        slots = np.arange(start, count) % capacity
+        records = self._records[slots]
+        # slots réécrits pendant la copie : ces points restent à lire sur disque
+        lost = int(self._count[0]) - capacity - start
+        if lost > 0:
+            records = records[lost:]
+        self._cursor = count
+        points = {}
+        for series in np.unique(records["series"]):
+            if series >= len(self.series):
+                continue
+            selected = records[records["series"] == series]
+            points[self.series[series]] = (selected["index"], selected["x"], selected["y"])
+        return points
+
+    def close(self):
+        """Detach from the shared memory (the writer keeps it)."""
+        if self._shm is None:
+            return
+        self._count = self._records = None
+        self._shm.close()
+        self._shm = None
+        self._shm_name = None
+
+
+def close_all_writers():
+    """Close every live channel writer of the process."""
+    for writer in list(_writers):
+        writer.close()
+
+
+atexit.register(close_all_writers)
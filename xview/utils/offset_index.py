@@ -0,0 +1,183 @@
+"""Sparse step -> byte offset index kept next to each score file.
+
+Every ``OFFSET_INDEX_STRIDE`` points, ``scores/.index/<file>.idx`` gets one
+record holding the index of the point, its x and the byte offset where it
+starts in the series (sealed segments included, see score_io.read_score_bytes).
+Range queries (see read_score_range) look up the records around the range and
+only read and parse the bytes between them.
+
+Points logged without x use their index as x. Series whose x decreases get no
+index (readers fall back to the whole series).
+"""
+
+import os
+import numpy as np
+from xview.utils.utils import replace_file
+from xview.utils.score_io import (BIN_RECORD, read_score_path, read_score_bytes, parse_score_text,
+                                  parse_complete_score_bytes, slice_scores, series_size)
+
+
+OFFSET_INDEX_STRIDE = 1024  # points entre deux enregistrements de l'index
+OFFSET_INDEX_DIR = ".index"
+OFFSET_RECORD = np.dtype([("index", "<i8"), ("x", "<f8"), ("offset", "<i8")])
+
+
+def index_path(score_file):
+    """Return the path of the offset index of a score file."""
+    folder, file_name = os.path.split(score_file)
+    return os.path.join(folder, OFFSET_INDEX_DIR, f"{file_name}.idx")
+
+
+def has_offset_index(score_file):
+    """True if an offset index exists for the score file."""
+    return os.path.exists(index_path(score_file))
+
+
+def remove_offset_index(score_file):
+    """Delete the offset index of a score file, if any."""
+    if has_offset_index(score_file):
+        os.remove(index_path(score_file))
+
+
+def read_offset_index(score_file):
+    """Return the records of the offset index of a score file (empty if missing)."""
+    path = index_path(score_file)
+    if not os.path.exists(path):
+        return np.empty(0, dtype=OFFSET_RECORD)
+    with open(path, "rb") as f:
+        data = f.read()
+    return np.frombuffer(data, dtype=OFFSET_RECORD, count=len(data) // OFFSET_RECORD.itemsize)
+
+
+def _read_from(score_file, record, end_offset=None):
+    # points de la série à partir d'un enregistrement de l'index, et leurs indices
+    data = read_score_bytes(score_file, int(record["offset"]), end_offset)
+    x, y = parse_complete_score_bytes(data, score_file.endswith(".bin"))
+    return np.asarray(x, dtype=float), np.asarray(y, dtype=float), int(record["index"])
+
+
+def _concat(parts):
+    x = np.concatenate([part[0] for part in parts])
+    y = np.concatenate([part[1] for part in parts])
+    return x, y, parts[0][2]
+
+
+class ScoreOffsetIndex(object):
+    """Maintain the offset index of one score file as points are appended."""
+
+    def __init__(self, score_file):
+        self.score_file = score_file
+        self.path = index_path(score_file)
+        self.enabled = True
+        self._n_points = 0
+        self._offset = 0
+        self._last_x = -np.inf
+
+    def add_point(self, x, n_bytes):
+        """Account for one point appended to the score file (n_bytes long)."""
+        if not self.enabled:
+            return
+        if x is None:
+            x = self._n_points
+        if x < self._last_x:
+            self.disable()
+            return
+        self._last_x = x
+        if self._n_points % OFFSET_INDEX_STRIDE == 0:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(np.array((self._n_points, x, self._offset), dtype=OFFSET_RECORD).tobytes())
+        self._n_points += 1
+        self._offset += n_bytes
+
+    def disable(self):
+        """Stop maintaining the index and delete it (readers use the whole series)."""
+        self.enabled = False
+        remove_offset_index(self.score_file)
+
+    def open(self):
+        """Resume the index of an existing score file, rebuilding it if missing or out of date."""
+        records = read_offset_index(self.score_file)
+        size = series_size(self.score_file)
+        if len(records) == 0 or records[-1]["offset"] > size:
+            self.rebuild()
+            return
+        x, y, first_index = _read_from(self.score_file, records[-1])
+        if len(y) > OFFSET_INDEX_STRIDE or (0 < len(x) != len(y)):
+            # points ajoutés sans mettre l'index à jour
+            self.rebuild()
+            return
+        self.enabled = True
+        self._n_points = first_index + len(y)
+        self._offset = size
+        self._last_x = (x[-1] if len(x) > 0 else self._n_points - 1) if len(y) > 0 else records[-1]["x"]
+
+    def rebuild(self):
+        """Recompute the whole index from the score file."""
+        remove_offset_index(self.score_file)
+        self.enabled = True
+        if self.score_file.endswith(".bin"):
+            x, y = read_score_path(self.score_file)
+            starts = np.arange(len(y), dtype=np.int64) * BIN_RECORD.itemsize
+            self._offset = len(y) * BIN_RECORD.itemsize
+        else:
+            data = read_score_bytes(self.score_file)
+            data = data[:data.rfind(b"\n") + 1]
+            x, y = parse_score_text(data)
+            ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n")) + 1
+            if len(ends) != len(y) or (0 < len(x) != len(y)):
+                self.disable()
+                return
+            starts = np.concatenate(([0], ends[:-1])).astype(np.int64)
+            self._offset = len(data)
+        x = np.arange(len(y), dtype=float) if len(x) == 0 else np.asarray(x, dtype=float)
+        if np.any(x[1:] < x[:-1]):
+            self.disable()
+            return
+
+        self._n_points = len(y)
+        self._last_x = x[-1] if len(y) > 0 else -np.inf
+        rows = np.arange(0, len(y), OFFSET_INDEX_STRIDE)
+        records = np.empty(len(rows), dtype=OFFSET_RECORD)
+        records["index"] = rows
+        records["x"] = x[rows]
+        records["offset"] = starts[rows]
+        if len(records) > 0:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            replace_file(self.path, records.tobytes())
+
+
+def read_score_range(score_file, x_min=None, x_max=None, last_n=None):
+    """Return the (x, y) points of a score series within [x_min, x_max], then the last_n of them.
+
+    With an offset index, only the bytes between the index records around the
+    range are read and parsed. Without one the whole series is read then
+    sliced. As with read_score_path, x is empty for series logged without x.
+    """
+    records = read_offset_index(score_file)
+    if len(records) == 0:
+        x, y = read_score_path(score_file)
+        return slice_scores(x, y, x_min, x_max, last_n)
+
+    start, stop = 0, len(records)
+    if x_min is not None:
+        start = max(int(np.searchsorted(records["x"], x_min, side="right")) - 1, 0)
+    if x_max is not None:
+        stop = int(np.searchsorted(records["x"], x_max, side="right"))
+    if stop <= start:
+        # plage vide ou avant le premier point
+        return np.empty(0), np.empty(0)
+
+    end_offset = int(records[stop]["offset"]) if stop < len(records) else None
+    if last_n is not None and x_min is None and x_max is None:
+        # la fin de la série donne le nombre total de points, puis on remonte juste assez
+        tail = _read_from(score_file, records[-1])
+        n_total = tail[2] + len(tail[1])
+        first_needed = max(n_total - last_n, 0)
+        if first_needed < tail[2]:
+            start = int(np.searchsorted(records["index"], first_needed, side="right")) - 1
+            tail = _concat([_read_from(score_file, records[start], int(records[-1]["offset"])), tail])
+        x, y, first_index = tail
+    else:
+        x, y, first_index = _read_from(score_file, records[start], end_offset)
+    return slice_scores(x, y, x_min, x_max, last_n, first_index=first_index)
@@ -0,0 +1,353 @@
+"""Multi-resolution min/max/mean pyramid kept next to each score file.
+
+Level k of the pyramid of ``scores/<file>`` summarises buckets of
+``LEAF_SIZE * 2**k`` consecutive points. Each bucket holds the first and last
+x, the min and max y (with their x), the sum and the count of y, and the byte
+offset of the end of its last point in the score file (sealed segments
+included, see score_io.read_score_bytes). Levels are appended to
+``scores/.pyramid/<file>/L<k>.bin`` as buckets complete, so a reader can fetch
+the level matching the plot resolution and only parse the few raw points after
+the last complete leaf bucket.
+
+Points logged without x use their index as x. Series whose x decreases get no
+pyramid (readers fall back to the raw points).
+"""
+
+import os
+import shutil
+import numpy as np
+from xview.utils.utils import replace_file
+from xview.utils.score_io import BIN_RECORD, read_score_path, parse_score_text, parse_score_bytes, read_score_bytes, series_size
+from xview.utils.decimate import visible_slice
+
+
+LEAF_SIZE = 64  # points par bucket au niveau 0
+MAX_LEVELS = 32
+PYRAMID_DIR = ".pyramid"
+PYRAMID_RECORD = np.dtype([
+    ("x_first", "<f8"), ("x_last", "<f8"),
+    ("x_at_min", "<f8"), ("y_min", "<f8"),
+    ("x_at_max", "<f8"), ("y_max", "<f8"),
+    ("y_sum", "<f8"), ("count", "<i8"), ("end_offset", "<i8"),
+])
+
+
+def pyramid_folder(score_file):
+    """Return the sidecar folder holding the pyramid levels of a score file."""
+    folder, file_name = os.path.split(score_file)
+    return os.path.join(folder, PYRAMID_DIR, file_name)
+
+
+def level_path(score_file, level):
+    """Return the path of one pyramid level of a score file."""
+    return os.path.join(pyramid_folder(score_file), f"L{level}.bin")
+
+
+def has_pyramid(score_file):
+    """True if a pyramid exists for the score file."""
+    return os.path.exists(level_path(score_file, 0))
+
+
+def remove_pyramid(score_file):
+    """Delete the pyramid of a score file, if any."""
+    shutil.rmtree(pyramid_folder(score_file), ignore_errors=True)
+
+
+def _point_bucket(x, y, end_offset):
+    # les NaN ne participent ni au min ni au max
+    if y != y:
+        return [x, x, np.nan, np.inf, np.nan, -np.inf, y, 1, end_offset]
+    return [x, x, x, y, x, y, y, 1, end_offset]
+
+
+def _merge_bucket(bucket, other):
+    if bucket is None:
+        return list(other)
+    bucket[1] = other[1]
+    if other[3] < bucket[3]:
+        bucket[2], bucket[3] = other[2], other[3]
+    if other[5] > bucket[5]:
+        bucket[4], bucket[5] = other[4], other[5]
+    bucket[6] += other[6]
+    bucket[7] += other[7]
+    bucket[8] = other[8]
+    return bucket
+
+
+def _leaf_records(x, y, end_offsets):
+    # buckets complets du niveau 0, calculés d'un bloc
+    n_leaves = len(y) // LEAF_SIZE
+    n = n_leaves * LEAF_SIZE
+    records = np.empty(n_leaves, dtype=PYRAMID_RECORD)
+    if n_leaves == 0:
+        return records
+    xs = x[:n].reshape(n_leaves, LEAF_SIZE)
+    ys = y[:n].reshape(n_leaves, LEAF_SIZE)
+    rows = np.arange(n_leaves)
+    low = np.where(np.isnan(ys), np.inf, ys)
+    high = np.where(np.isnan(ys), -np.inf, ys)
+    arg_low, arg_high = low.argmin(axis=1), high.argmax(axis=1)
+    records["x_first"] = xs[:, 0]
+    records["x_last"] = xs[:, -1]
+    records["y_min"] = low[rows, arg_low]
+    records["x_at_min"] = np.where(np.isinf(records["y_min"]), np.nan, xs[rows, arg_low])
+    records["y_max"] = high[rows, arg_high]
+    records["x_at_max"] = np.where(np.isinf(records["y_max"]), np.nan, xs[rows, arg_high])
+    records["y_sum"] = ys.sum(axis=1)
+    records["count"] = LEAF_SIZE
+    records["end_offset"] = end_offsets[LEAF_SIZE - 1:n:LEAF_SIZE]
+    return records
+
+
+def _parent_records(children):
+    # fusion deux à deux des buckets d'un niveau
+    n_parents = len(children) // 2
+    left, right = children[0:2 * n_parents:2], children[1:2 * n_parents:2]
+    records = np.empty(n_parents, dtype=PYRAMID_RECORD)
+    records["x_first"] = left["x_first"]
+    records["x_last"] = right["x_last"]
+    use_right = right["y_min"] < left["y_min"]
+    records["y_min"] = np.where(use_right, right["y_min"], left["y_min"])
+    records["x_at_min"] = np.where(use_right, right["x_at_min"], left["x_at_min"])
+    use_right = right["y_max"] > left["y_max"]
+    records["y_max"] = np.where(use_right, right["y_max"], left["y_max"])
+    records["x_at_max"] = np.where(use_right, right["x_at_max"], left["x_at_max"])
+    records["y_sum"] = left["y_sum"] + right["y_sum"]
+    records["count"] = left["count"] + right["count"]
+    records["end_offset"] = right["end_offset"]
+    return records
+
+
+class ScorePyramid(object):
+    """Maintain the pyramid of one score file as points are appended."""
+
+    def __init__(self, score_file):
+        self.score_file = score_file
+        self.folder = pyramid_folder(score_file)
+        self.enabled = True
+        self._buckets = [None] * MAX_LEVELS  # bucket en cours de chaque niveau
+        self._n_points = 0
+        self._offset = 0
+        self._last_x = -np.inf
+
+    def add_point(self, x, y, n_bytes):
+        """Account for one point appended to the score file (n_bytes long)."""
+        if not self.enabled:
+            return
+        if x is None:
+            x = self._n_points
+        if x < self._last_x:
+            self.disable()
+            return
+        self._last_x = x
+        self._n_points += 1
+        self._offset += n_bytes
+        bucket = _merge_bucket(self._buckets[0], _point_bucket(float(x), float(y), self._offset))
+        self._buckets[0] = bucket
+        if bucket[7] == LEAF_SIZE:
+            self._complete(0, bucket)
+
+    def _complete(self, level, bucket):
+        if level == 0 and not os.path.isdir(self.folder):
+            os.makedirs(self.folder, exist_ok=True)
+        with open(level_path(self.score_file, level), "ab") as f:
+            f.write(np.array(tuple(bucket), dtype=PYRAMID_RECORD).tobytes())
+        self._buckets[level] = None
+        parent = level + 1
+        if parent < MAX_LEVELS:
+            merged = _merge_bucket(self._buckets[parent], bucket)
+            self._buckets[parent] = merged
+            if merged[7] == LEAF_SIZE << parent:
+                self._complete(parent, merged)
+
+    def disable(self):
+        """Stop maintaining the pyramid and delete it (readers use raw points)."""
+        self.enabled = False
+        remove_pyramid(self.score_file)
+
+    def open(self):
+        """Resume the pyramid of an existing score file, rebuilding it if missing or out of date.
+
+        Only the points after the last complete leaf bucket are read; the
+        buckets in progress of the upper levels are the unmerged last records
+        of the levels below.
+        """
+        levels = _read_levels(self.score_file)
+        size = series_size(self.score_file)
+        if not levels or int(levels[0][-1]["end_offset"]) > size or \
+                any(len(levels[level]) != len(levels[0]) >> level for level in range(len(levels))) or \
+                (len(levels) < MAX_LEVELS and len(levels[0]) >> len(levels) > 0):
+            self.rebuild()
+            return
+        end_offset = int(levels[0][-1]["end_offset"])
+        n_leaves = len(levels[0])
+        data = read_score_bytes(self.score_file, end_offset)
+        if self.score_file.endswith(".bin"):
+            data = data[:len(data) - len(data) % BIN_RECORD.itemsize]
+            x, y = parse_score_bytes(data, is_bin=True)
+            end_offsets = end_offset + (np.arange(len(y), dtype=np.int64) + 1) * BIN_RECORD.itemsize
+        else:
+            data = data[:data.rfind(b"\n") + 1]
+            x, y = parse_score_text(data)
+            end_offsets = end_offset + np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n")) + 1
+        if len(y) >= LEAF_SIZE or len(end_offsets) != len(y) or (0 < len(x) != len(y)) or \
+                end_offset + len(data) != size:
+            # points ajoutés sans mettre la pyramide à jour
+            self.rebuild()
+            return
+        first_index = n_leaves * LEAF_SIZE
+        y = np.asarray(y, dtype=float)
+        x = np.arange(first_index, first_index + len(y), dtype=float) if len(x) == 0 else np.asarray(x, dtype=float)
+        last_x = levels[0][-1]["x_last"]
+        if len(y) > 0 and (x[0] < last_x or np.any(x[1:] < x[:-1])):
+            self.disable()
+            return
+
+        self.enabled = True
+        self._buckets = [None] * MAX_LEVELS
+        for level in range(1, min(len(levels) + 1, MAX_LEVELS)):
+            if len(levels[level - 1]) % 2 == 1:
+                self._buckets[level] = list(levels[level - 1][-1].item())
+        for i in range(len(y)):
+            self._buckets[0] = _merge_bucket(self._buckets[0], _point_bucket(x[i], y[i], int(end_offsets[i])))
+        self._n_points = first_index + len(y)
+        self._offset = size
+        self._last_x = x[-1] if len(y) > 0 else last_x
+
+    def rebuild(self):
+        """Recompute the whole pyramid from the score file."""
+        remove_pyramid(self.score_file)
+        self.enabled = True
+        self._buckets = [None] * MAX_LEVELS
+        if self.score_file.endswith(".bin"):
+            x, y = read_score_path(self.score_file)
+            end_offsets = (np.arange(len(y), dtype=np.int64) + 1) * BIN_RECORD.itemsize
+        else:
+            data = read_score_bytes(self.score_file)
+            x, y = parse_score_text(data)
+            end_offsets = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n")) + 1
+            if len(end_offsets) != len(y) or (0 < len(x) != len(y)):
+                self.disable()
+                return
+        y = np.asarray(y, dtype=float)
+        x = np.arange(len(y), dtype=float) if len(x) == 0 else np.asarray(x, dtype=float)
+        if np.any(x[1:] < x[:-1]):
+            self.disable()
+            return
+
+        self._n_points = len(y)
+        self._offset = int(end_offsets[-1]) if len(y) > 0 else 0
+        self._last_x = x[-1] if len(y) > 0 else -np.inf
+
+        records = _leaf_records(x, y, end_offsets)
+        level = 0
+        while len(records) > 0 and level < MAX_LEVELS:
+            os.makedirs(self.folder, exist_ok=True)
+            replace_file(level_path(self.score_file, level), records.tobytes())
+            # un bucket complet non encore fusionné dans le niveau supérieur
+            if len(records) % 2 == 1 and level + 1 < MAX_LEVELS:
+                self._buckets[level + 1] = list(records[-1].item())
+            records = _parent_records(records)
+            level += 1
+        start = (len(y) // LEAF_SIZE) * LEAF_SIZE
+        for i in range(start, len(y)):
+            self._buckets[0] = _merge_bucket(self._buckets[0], _point_bucket(x[i], y[i], int(end_offsets[i])))
+
+
+def read_pyramid_level(score_file, level):
+    """Memory-map one pyramid level and return its records (empty if missing)."""
+    path = level_path(score_file, level)
+    n_records = os.path.getsize(path) // PYRAMID_RECORD.itemsize if os.path.exists(path) else 0
+    if n_records == 0:
+        return np.empty(0, dtype=PYRAMID_RECORD)
+    return np.memmap(path, dtype=PYRAMID_RECORD, mode="r", shape=(n_records,))
+
+
+def _read_levels(score_file):
+    levels = []
+    for level in range(MAX_LEVELS):
+        records = read_pyramid_level(score_file, level)
+        if len(records) == 0:
+            break
+        levels.append(records)
+    return levels
+
+
+def _visible_records(records, x_min=None, x_max=None):
+    start = 0 if x_min is None else int(np.searchsorted(records["x_last"], x_min, side="left"))
+    stop = len(records) if x_max is None else int(np.searchsorted(records["x_first"], x_max, side="right"))
+    return records[start:max(start, stop)]
+
+
+def _read_tail(score_file, end_offset, first_index):
+    # points non encore couverts par un bucket complet du niveau 0
+    data = read_score_bytes(score_file, end_offset)
+    if score_file.endswith(".bin"):
+        x, y = parse_score_bytes(data, is_bin=True)
+    else:
+        x, y = parse_score_text(data[:data.rfind(b"\n") + 1])
+    if len(x) == 0:
+        x = np.arange(first_index, first_index + len(y), dtype=float)
+    return np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+
+
+def _covering_records(levels, top_level, x_min=None, x_max=None):
+    # buckets visibles du niveau choisi, puis des niveaux plus fins pour la fin de la série
+    parts = []
+    n_covered = 0
+    for level in range(top_level, -1, -1):
+        size = LEAF_SIZE << level
+        records = levels[level][n_covered // size:]
+        n_covered += len(records) * size
+        parts.append(_visible_records(records, x_min, x_max))
+    return parts, n_covered
+
+
+def read_pyramid(score_file, n_buckets, x_min=None, x_max=None):
+    """Return a min/max envelope (x, y) of the score file with about n_buckets to 2*n_buckets buckets.
+
+    The coarsest level still having n_buckets buckets in [x_min, x_max] is
+    used. Returns None when the score file has no pyramid.
+    """
+    levels = _read_levels(score_file)
+    if not levels:
+        return None
+    top_level = 0
+    for level in range(len(levels) - 1, -1, -1):
+        if len(_visible_records(levels[level], x_min, x_max)) >= n_buckets:
+            top_level = level
+            break
+    parts, n_covered = _covering_records(levels, top_level, x_min, x_max)
+    records = np.concatenate(parts)
+    records = records[np.isfinite(records["y_min"])]
+
+    # deux points par bucket (min et max) dans l'ordre des x
+    min_first = records["x_at_min"] <= records["x_at_max"]
+    x = np.empty(2 * len(records))
+    y = np.empty(2 * len(records))
+    x[0::2] = np.where(min_first, records["x_at_min"], records["x_at_max"])
+    x[1::2] = np.where(min_first, records["x_at_max"], records["x_at_min"])
+    y[0::2] = np.where(min_first, records["y_min"], records["y_max"])
+    y[1::2] = np.where(min_first, records["y_max"], records["y_min"])
+
+    x_tail, y_tail = _read_tail(score_file, int(levels[0][-1]["end_offset"]), n_covered)
+    visible = visible_slice(x_tail, x_min, x_max)
+    return np.concatenate((x, x_tail[visible])), np.concatenate((y, y_tail[visible]))
+
+
+def read_pyramid_extrema(score_file):
+    """Return (y_min, y_max) of the whole score file from its pyramid, or None without pyramid."""
+    levels = _read_levels(score_file)
+    if not levels:
+        return None
+    parts, n_covered = _covering_records(levels, len(levels) - 1)
+    records = np.concatenate(parts)
+    _, y_tail = _read_tail(score_file, int(levels[0][-1]["end_offset"]), n_covered)
+    y_min = np.min(records["y_min"], initial=np.inf)
+    y_max = np.max(records["y_max"], initial=-np.inf)
+    if len(y_tail) > 0 and not np.all(np.isnan(y_tail)):
+        y_min = min(y_min, np.nanmin(y_tail))
+        y_max = max(y_max, np.nanmax(y_tail))
+    if np.isinf(y_min):
+        return None
+    return float(y_min), float(y_max)
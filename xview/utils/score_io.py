@@ -0,0 +1,424 @@
+"""Score file formats: text ``x,y`` lines and binary fixed-width float64 records.
+
+Binary files (``<name>.bin``) hold little-endian (x, y) float64 pairs appended
+one after another. Points logged without x store NaN in the x slot. They are
+read back through ``numpy.memmap`` so no parsing nor copy is needed.
+
+In multi-process mode each rank writes its own shard ``<name>.rank<k>.<ext>``;
+readers merge the shards of a series by x (see ``list_score_files``).
+
+Long series can be split into segments: the active file ``<name>.<ext>`` stays
+plain while older points are sealed, compressed (zlib or lzma), in
+``.segments/<name>.<ext>/seg_<k>.<ext>.<compression>``, listed with their x
+range in ``index.json``. Readers decompress only the segments they need.
+"""
+
+import os
+import re
+import json
+import lzma
+import shutil
+import zlib
+import numpy as np
+from xview.utils.utils import replace_file
+
+
+SCORE_EXTENSIONS = (".txt", ".bin")
+_SHARD_RE = re.compile(r"^(.*)\.rank(\d+)$")
+BIN_RECORD = np.dtype([("x", "<f8"), ("y", "<f8")])
+SEGMENTS_DIR = ".segments"
+SEGMENT_INDEX = "index.json"
+COMPRESSIONS = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+def encode_bin_record(x=None, y=None):
+    """Return the bytes of one binary (x, y) record; missing x is stored as NaN."""
+    record = np.empty(1, dtype=BIN_RECORD)
+    record["x"] = np.nan if x is None else x
+    record["y"] = y
+    return record.tobytes()
+
+
+def count_bin_records(path):
+    """Return the number of complete records of a binary score file."""
+    if not os.path.exists(path):
+        return 0
+    return os.path.getsize(path) // BIN_RECORD.itemsize
+
+
+def read_bin_scores(path):
+    """Memory-map a binary score file and return (x, y) float64 views.
+
+    x is an empty array when the series was logged without x values. A record
+    being appended concurrently (incomplete trailing bytes) is ignored.
+    """
+    n_records = count_bin_records(path)
+    if n_records == 0:
+        return np.empty(0), np.empty(0)
+    records = np.memmap(path, dtype=BIN_RECORD, mode="r", shape=(n_records,))
+    x, y = records["x"], records["y"]
+    if np.isnan(x[0]):
+        x = np.empty(0)
+    return x, y
+
+
+def _parse_score_lines(data):
+    # repli ligne par ligne pour les fichiers qui mélangent lignes 'y' et 'x,y'
+    # (ou dont la dernière ligne est en cours d'écriture : elle est ignorée)
+    x = []
+    y = []
+    for line in data.decode("utf-8").splitlines():
+        values = line.strip().split(",")
+        try:
+            if len(values) == 1:
+                if values[0]:
+                    y.append(float(values[0]))
+            else:
+                x_value, y_value = float(values[0]), float(values[1])
+                x.append(x_value)
+                y.append(y_value)
+        except ValueError:
+            continue
+    return np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+
+
+def parse_score_text(data):
+    """Parse score lines ('y' or 'x,y', as bytes) into (x, y) float64 arrays.
+
+    The whole buffer is converted by NumPy's C parser; x is empty for the
+    one-column layout. Files mixing both layouts fall back to a line loop.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    data = data.strip()
+    if not data:
+        return np.empty(0), np.empty(0)
+    n_lines = data.count(b"\n") + 1
+    n_commas = data.count(b",")
+    if n_commas not in (0, n_lines):
+        return _parse_score_lines(data)
+    try:
+        values = np.fromstring(data.replace(b"\n", b","), dtype=float, sep=",")
+    except ValueError:
+        # ligne complète mais invalide : le repli ligne par ligne l'ignore
+        return _parse_score_lines(data)
+    n_columns = 1 if n_commas == 0 else 2
+    if len(values) != n_lines * n_columns:
+        return _parse_score_lines(data)
+    if n_columns == 1:
+        return np.empty(0), values
+    values = values.reshape(-1, 2)
+    return values[:, 0], values[:, 1]
+
+
+def read_txt_scores(path):
+    """Read a text score file and return (x, y) float64 arrays; lines are 'y' or 'x,y'."""
+    with open(path, "rb") as f:
+        return parse_score_text(f.read())
+
+
+def parse_score_bytes(data, is_bin):
+    """Parse the raw bytes of a text or binary score file into (x, y) float64 arrays."""
+    if not is_bin:
+        return parse_score_text(data)
+    records = np.frombuffer(data, dtype=BIN_RECORD, count=len(data) // BIN_RECORD.itemsize)
+    x, y = records["x"], records["y"]
+    if len(x) > 0 and np.isnan(x[0]):
+        x = np.empty(0)
+    return x, y
+
+
+def segments_folder(path):
+    """Return the folder holding the sealed segments of a score file."""
+    folder, file_name = os.path.split(path)
+    return os.path.join(folder, SEGMENTS_DIR, file_name)
+
+
+def read_segment_index(path):
+    """Return the list of sealed segments of a score file, oldest first.
+
+    A segment being sealed (renamed but not compressed yet) is listed too, with
+    compression None, so readers never miss its points.
+    """
+    folder = segments_folder(path)
+    if not os.path.isdir(folder):
+        return []
+    index_path = os.path.join(folder, SEGMENT_INDEX)
+    segments = []
+    if os.path.exists(index_path):
+        with open(index_path, "r") as f:
+            segments = json.load(f)
+    pending = os.path.join(folder, f"seg_{len(segments):06d}.pending")
+    if os.path.exists(pending):
+        segments = segments + [{"file": os.path.basename(pending), "compression": None}]
+    return segments
+
+
+def read_segment(path, segment):
+    """Return the raw (decompressed) bytes of one sealed segment."""
+    with open(os.path.join(segments_folder(path), segment["file"]), "rb") as f:
+        data = f.read()
+    if segment["compression"] is None:
+        return data
+    return COMPRESSIONS[segment["compression"]][1](data)
+
+
+def seal_segment(path, compression="zlib"):
+    """Move the content of a score file to a new compressed segment and start an empty one.
+
+    The file is first renamed to ``seg_<k>.pending`` (new points go to a fresh
+    file), then compressed and added to the index, so that an interruption
+    never loses nor duplicates points: a leftover pending segment is sealed by
+    the next call or by ``recover_segments``.
+    """
+    assert compression in COMPRESSIONS, f"Unknown compression {compression}."
+    recover_segments(path, compression)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    folder = segments_folder(path)
+    os.makedirs(folder, exist_ok=True)
+    n_segments = len(read_segment_index(path))
+    pending = os.path.join(folder, f"seg_{n_segments:06d}.pending")
+    os.replace(path, pending)
+    # le fichier actif existe toujours, pour que la série reste listée
+    open(path, "ab").close()
+    return _seal_pending(path, pending, compression)
+
+
+def recover_segments(path, compression="zlib"):
+    """Seal a segment left pending by an interrupted ``seal_segment``."""
+    segments = read_segment_index(path)
+    if segments and segments[-1]["compression"] is None:
+        _seal_pending(path, os.path.join(segments_folder(path), segments[-1]["file"]), compression)
+    elif segments:
+        # segment déjà indexé dont le fichier pending n'a pas été supprimé
+        stale = os.path.join(segments_folder(path), f"seg_{len(segments) - 1:06d}.pending")
+        if os.path.exists(stale):
+            os.remove(stale)
+
+
+def _seal_pending(path, pending, compression):
+    folder = segments_folder(path)
+    segments = [segment for segment in read_segment_index(path) if segment["compression"] is not None]
+    with open(pending, "rb") as f:
+        data = f.read()
+    is_bin = path.endswith(".bin")
+    if not is_bin:
+        data = data[:data.rfind(b"\n") + 1]
+    x, y = parse_score_bytes(data, is_bin)
+
+    first_index = 0
+    start_offset = 0
+    if segments:
+        first_index = segments[-1]["first_index"] + segments[-1]["n_points"]
+        start_offset = segments[-1]["start_offset"] + segments[-1]["raw_bytes"]
+    if len(x) == 0:
+        # série sans x : la plage est celle des indices des points
+        x = np.arange(first_index, first_index + len(y), dtype=float)
+    ext = os.path.splitext(path)[1]
+    segment = {
+        "file": f"seg_{len(segments):06d}{ext}.{compression}",
+        "compression": compression,
+        "n_points": int(len(y)),
+        "first_index": int(first_index),
+        "x_first": float(np.min(x)) if len(x) > 0 else None,
+        "x_last": float(np.max(x)) if len(x) > 0 else None,
+        "start_offset": int(start_offset),
+        "raw_bytes": len(data),
+    }
+    replace_file(os.path.join(folder, segment["file"]), COMPRESSIONS[compression][0](data))
+    replace_file(os.path.join(folder, SEGMENT_INDEX), json.dumps(segments + [segment], indent=4).encode("utf-8"))
+    os.remove(pending)
+    return segment
+
+
+def remove_segments(path):
+    """Delete the sealed segments of a score file, if any."""
+    shutil.rmtree(segments_folder(path), ignore_errors=True)
+
+
+def count_sealed_points(path):
+    """Return (number of points, number of raw bytes) held in the sealed segments of a score file."""
+    n_points, n_bytes = 0, 0
+    for segment in read_segment_index(path):
+        if segment["compression"] is None:
+            data = read_segment(path, segment)
+            n_points += len(parse_score_bytes(data, path.endswith(".bin"))[1])
+            n_bytes += len(data)
+        else:
+            n_points += segment["n_points"]
+            n_bytes += segment["raw_bytes"]
+    return n_points, n_bytes
+
+
+def series_size(path):
+    """Return the logical size of a score series: raw bytes of its sealed segments, then of its active file."""
+    active_size = os.path.getsize(path) if os.path.exists(path) else 0
+    return count_sealed_points(path)[1] + active_size
+
+
+def read_score_bytes(path, start_offset=0, end_offset=None):
+    """Return the raw bytes of a score series between two logical offsets, across segments and active file.
+
+    Offsets count the bytes of the sealed segments (uncompressed) then those
+    of the active file. Only the segments overlapping [start_offset,
+    end_offset) are decompressed; end_offset None reads to the end.
+    """
+    chunks = []
+    offset = 0
+    for segment in read_segment_index(path):
+        if end_offset is not None and offset >= end_offset:
+            return b"".join(chunks)
+        if segment["compression"] is not None and segment["start_offset"] + segment["raw_bytes"] <= start_offset:
+            offset = segment["start_offset"] + segment["raw_bytes"]
+            continue
+        data = read_segment(path, segment)
+        chunks.append(data[max(start_offset - offset, 0):None if end_offset is None else max(end_offset - offset, 0)])
+        offset += len(data)
+    if os.path.exists(path) and (end_offset is None or offset < end_offset):
+        with open(path, "rb") as f:
+            f.seek(max(start_offset - offset, 0))
+            chunks.append(f.read() if end_offset is None else f.read(max(end_offset - max(start_offset, offset), 0)))
+    return b"".join(chunks)
+
+
+def parse_complete_score_bytes(data, is_bin):
+    """Like parse_score_bytes, ignoring a trailing line or record still being written."""
+    if is_bin:
+        return parse_score_bytes(data[:len(data) - len(data) % BIN_RECORD.itemsize], is_bin)
+    return parse_score_bytes(data[:data.rfind(b"\n") + 1], is_bin)
+
+
+def slice_scores(x, y, x_min=None, x_max=None, last_n=None, first_index=0):
+    """Keep the points of (x, y) within [x_min, x_max], then the last_n of them.
+
+    For series logged without x (empty x) the point index, starting at
+    first_index, is compared to x_min/x_max; x stays empty.
+    """
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    steps = x if len(x) > 0 else np.arange(first_index, first_index + len(y), dtype=float)
+    keep = np.ones(len(y), dtype=bool)
+    if x_min is not None:
+        keep &= steps >= x_min
+    if x_max is not None:
+        keep &= steps <= x_max
+    keep = np.flatnonzero(keep)
+    if last_n is not None:
+        keep = keep[max(len(keep) - last_n, 0):]
+    return (x[keep] if len(x) > 0 else x), y[keep]
+
+
+def _read_active_scores(path):
+    if path.endswith(".bin"):
+        return read_bin_scores(path)
+    return read_txt_scores(path)
+
+
+def read_score_path(path, x_min=None, x_max=None):
+    """Read a .txt or .bin score series, sealed segments included, and return (x, y).
+
+    With x_min/x_max, only the segments overlapping [x_min, x_max] are
+    decompressed; the points are not clipped to the range.
+    """
+    segments = read_segment_index(path)
+    if not segments:
+        return _read_active_scores(path) if os.path.exists(path) else (np.empty(0), np.empty(0))
+    is_bin = path.endswith(".bin")
+    parts = []
+    for segment in segments:
+        if segment["compression"] is not None and segment["x_first"] is not None:
+            if (x_max is not None and segment["x_first"] > x_max) or (x_min is not None and segment["x_last"] < x_min):
+                continue
+        parts.append(parse_score_bytes(read_segment(path, segment), is_bin))
+    if os.path.exists(path):
+        parts.append(_read_active_scores(path))
+    if not parts:
+        return np.empty(0), np.empty(0)
+    y = np.concatenate([np.asarray(part[1], dtype=float) for part in parts])
+    if all(len(part[0]) == 0 for part in parts):
+        return np.empty(0), y
+    return np.concatenate([np.asarray(part[0], dtype=float) for part in parts]), y
+
+
+def parse_score_file_name(file_name):
+    """Return (series name, rank or None) for a score file name, or None if not a score file."""
+    base, ext = os.path.splitext(file_name)
+    if ext not in SCORE_EXTENSIONS or base.endswith("_label_value"):
+        return None
+    match = _SHARD_RE.match(base)
+    if match is not None:
+        return match.group(1), int(match.group(2))
+    return base, None
+
+
+def list_score_files(folder):
+    """Return a dict series name -> sorted list of its file paths (one per shard).
+
+    A shard present in both formats (text file kept by convert_txt_to_bin) is
+    listed once, by its binary file.
+    """
+    shards = {}
+    for file_name in sorted(os.listdir(folder)):
+        parsed = parse_score_file_name(file_name)
+        if parsed is not None and (parsed not in shards or file_name.endswith(".bin")):
+            shards[parsed] = file_name
+    series = {}
+    for (name, _), file_name in sorted(shards.items(), key=lambda item: item[1]):
+        series.setdefault(name, []).append(os.path.join(folder, file_name))
+    return series
+
+
+def merge_shards(shards):
+    """Merge (x, y) pairs read from several shards into one series sorted by step.
+
+    Shards logged without x are merged by their point index.
+    """
+    shards = [shard for shard in shards if len(shard[1]) > 0]
+    if len(shards) == 0:
+        return np.empty(0), np.empty(0)
+    if len(shards) == 1:
+        return shards[0]
+    with_x = all(len(x) > 0 for x, _ in shards)
+    steps = [np.asarray(x, dtype=float) if with_x else np.arange(len(y), dtype=float) for x, y in shards]
+    steps = np.concatenate(steps)
+    y = np.concatenate([np.asarray(y, dtype=float) for _, y in shards])
+    order = np.argsort(steps, kind="stable")
+    if with_x:
+        return steps[order], y[order]
+    return np.empty(0), y[order]
+
+
+def read_merged_scores(paths):
+    """Read every shard of a series and return the merged (x, y)."""
+    return merge_shards([read_score_path(path) for path in paths])
+
+
+def convert_txt_to_bin(txt_path, bin_path=None, remove_txt=False):
+    """Convert a text score file to the binary format and return the new path."""
+    if bin_path is None:
+        bin_path = os.path.splitext(txt_path)[0] + ".bin"
+    x, y = read_score_path(txt_path)
+    records = np.empty(len(y), dtype=BIN_RECORD)
+    records["x"] = x if len(x) > 0 else np.nan
+    records["y"] = y
+    tmp_path = bin_path + ".tmp"
+    records.tofile(tmp_path)
+    os.replace(tmp_path, bin_path)
+    if remove_txt:
+        os.remove(txt_path)
+        remove_segments(txt_path)
+    return bin_path
+
+
+def convert_scores_folder(scores_folder, remove_txt=False):
+    """Convert every text score series of a scores/ folder to the binary format."""
+    converted = []
+    for file_name in sorted(os.listdir(scores_folder)):
+        name, ext = os.path.splitext(file_name)
+        if ext == ".txt" and not name.endswith("_label_value"):
+            converted.append(convert_txt_to_bin(os.path.join(scores_folder, file_name), remove_txt=remove_txt))
+    return converted
@@ -0,0 +1,130 @@
+"""Incremental readers for score files that only grow between two refreshes.
+
+A ScoreTailReader remembers how far it read a file (byte offset, inode and the
+last bytes before the offset) and only parses what was appended since. The
+file is read again from the start when it was replaced, truncated, or rewritten
+in place (``unique=True`` flags), detected by a change of those markers.
+
+Sealed segments of the series (see score_io.seal_segment) are decompressed
+once, when they appear, and kept in front of the points of the active file.
+"""
+
+import os
+import numpy as np
+from xview.utils.score_io import BIN_RECORD, parse_score_bytes, read_segment_index, read_segment
+
+
+_SIGNATURE_SIZE = 64  # in bytes, checked before each incremental read
+
+
+class GrowingArray(object):
+    """float64 array extended in place, with a capacity doubled when full (amortized O(1) per value)."""
+
+    def __init__(self):
+        self._data = np.empty(0)
+        self._size = 0
+
+    def extend(self, values):
+        end = self._size + len(values)
+        if end > len(self._data):
+            data = np.empty(max(end, 2 * len(self._data), 1024))
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+        self._data[self._size:end] = values
+        self._size = end
+
+    def truncate(self, size):
+        self._size = min(size, self._size)
+
+    def view(self):
+        return self._data[:self._size]
+
+
+class ScoreTailReader(object):
+    """Cache the parsed (x, y) of a score file and extend it with appended lines or records."""
+
+    def __init__(self, path):
+        self.path = path
+        self.is_bin = path.endswith(".bin")
+        self._reset()
+
+    @property
+    def x(self):
+        return self._x.view()
+
+    @property
+    def y(self):
+        return self._y.view()
+
+    def _reset(self):
+        self._x = GrowingArray()
+        self._y = GrowingArray()
+        self._n_segments = 0
+        self._sealed_sizes = (0, 0)
+        self._reset_active()
+
+    def _reset_active(self):
+        # oublie les points du fichier actif, garde ceux des segments scellés
+        self._x.truncate(self._sealed_sizes[0])
+        self._y.truncate(self._sealed_sizes[1])
+        self._offset = 0
+        self._inode = None
+        self._signature = b""
+        self._partial = b""
+
+    def read(self):
+        """Return the up-to-date (x, y) of the series, parsing only the new bytes."""
+        self._sync_segments()
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset_active()
+            return self.x, self.y
+
+        with open(self.path, "rb") as f:
+            if self._offset > 0 and not self._unchanged(f, stat):
+                self._reset_active()
+            if stat.st_size == self._offset:
+                return self.x, self.y
+            f.seek(self._offset)
+            new_bytes = f.read(stat.st_size - self._offset)
+
+        self._inode = stat.st_ino
+        self._offset += len(new_bytes)
+        self._signature = (self._signature + new_bytes)[-_SIGNATURE_SIZE:]
+        self._parse(new_bytes)
+        return self.x, self.y
+
+    def _unchanged(self, f, stat):
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            return False
+        f.seek(self._offset - len(self._signature))
+        return f.read(len(self._signature)) == self._signature
+
+    def _sync_segments(self):
+        segments = read_segment_index(self.path)
+        if len(segments) == self._n_segments:
+            return
+        if len(segments) < self._n_segments:
+            self._reset()
+        else:
+            # les points du fichier actif viennent d'être scellés
+            self._reset_active()
+        for segment in segments[self._n_segments:]:
+            self._extend(*parse_score_bytes(read_segment(self.path, segment), self.is_bin))
+        self._n_segments = len(segments)
+        self._sealed_sizes = (len(self.x), len(self.y))
+        self._reset_active()
+
+    def _parse(self, new_bytes):
+        data = self._partial + new_bytes
+        if self.is_bin:
+            end = len(data) - len(data) % BIN_RECORD.itemsize
+        else:
+            end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        self._extend(*parse_score_bytes(data[:end], self.is_bin))
+
+    def _extend(self, x, y):
+        self._x.extend(x)
+        self._y.extend(y)
@@ -1,24 +1,81 @@
 """Generic JSON/file helpers and small numeric utilities used by XView."""
 
+import os
+import sys
+import copy
 import json
+import shutil
+import stat
+import time
+import threading
 import numpy as np
 
 
+READ_JSON_TIMEOUT = 2.0  # in seconds, max time spent retrying an undecodable JSON file
+_READ_JSON_MAX_DELAY = 0.1  # in seconds, cap of the backoff between two read attempts
+
+# contenu des JSON lus par read_json_cached : chemin -> (signature du fichier, dict)
+_json_cache = {}
+_json_cache_lock = threading.Lock()
+
+
 def write_json(json_path, my_dict):
-    """Write a dict to a JSON file with indentation."""
-    with open(json_path, "w") as f:
-        json.dump(my_dict, f, indent=4)
+    """Write a dict to a JSON file with indentation, atomically (temp file + os.replace)."""
+    replace_file(json_path, json.dumps(my_dict, indent=4).encode("utf-8"))
+    with _json_cache_lock:
+        if json_path in _json_cache:
+            _json_cache[json_path] = (_file_signature(json_path), copy.deepcopy(my_dict))
+
 
+def read_json(json_path, timeout=READ_JSON_TIMEOUT):
+    """Read a JSON file, retrying on decode errors with a bounded backoff.
 
-def read_json(json_path):
-    """Read a JSON file, retrying on transient decode errors."""
+    The writers of XView replace their files atomically, so a decode error only
+    comes from a foreign or older writer: it is retried with an exponential
+    backoff for up to timeout seconds, then raised.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.001
     while True:
         try:
             with open(json_path, "r") as f:
-                my_dict = json.load(f)
-            return my_dict
+                return json.load(f)
         except json.JSONDecodeError:
-            pass
+            if time.monotonic() + delay > deadline:
+                raise
+        time.sleep(delay)
+        delay = min(2 * delay, _READ_JSON_MAX_DELAY)
+
+
+def _file_signature(path):
+    # os.replace change l'inode à chaque écriture, mtime et taille couvrent les autres écrivains
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def read_json_cached(json_path, timeout=READ_JSON_TIMEOUT):
+    """Read a JSON file through an in-process cache, parsed again only when its inode, mtime or size change.
+
+    A copy is returned, so callers may modify it. write_json updates the cache
+    of the files it writes. A file that could not be decoded raises the same
+    JSONDecodeError at once until it changes, without being read again.
+    """
+    signature = _file_signature(json_path)
+    with _json_cache_lock:
+        cached = _json_cache.get(json_path)
+        if cached is not None and cached[0] == signature:
+            if isinstance(cached[1], json.JSONDecodeError):
+                raise cached[1]
+            return copy.deepcopy(cached[1])
+    try:
+        content = read_json(json_path, timeout=timeout)
+    except json.JSONDecodeError as e:
+        with _json_cache_lock:
+            _json_cache[json_path] = (signature, e)
+        raise
+    with _json_cache_lock:
+        _json_cache[json_path] = (signature, content)
+    return copy.deepcopy(content)
 
 
 def write_file(path_to_file, word, flag="w"):
@@ -29,6 +86,37 @@ def write_file(path_to_file, word, flag="w"):
         f.write(word + "\n")
 
 
+def replace_file(path_to_file, data):
+    """Atomically replace a file's content (bytes) through a temp file and os.replace."""
+    # un fichier temporaire par thread : le timer d'un Debouncer peut écrire en même temps que le thread principal
+    tmp_path = f"{path_to_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path_to_file)
+
+
+def remove_tree(path):
+    """Delete a directory tree, read-only files included (Windows refuses to delete them otherwise)."""
+    def make_writable(func, failed_path, _):
+        os.chmod(failed_path, stat.S_IWUSR | stat.S_IRUSR)
+        func(failed_path)
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(path, onexc=make_writable)
+    else:
+        shutil.rmtree(path, onerror=make_writable)
+
+
+def count_lines(path_to_file):
+    """Count newline-terminated lines of a file by scanning it in 1 MB chunks."""
+    if not os.path.exists(path_to_file):
+        return 0
+    n_lines = 0
+    with open(path_to_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            n_lines += chunk.count(b"\n")
+    return n_lines
+
+
 def read_file(file_to_path, return_str=False):
     """Read a text file; return first line (str) or all as float array.
 
@@ -48,16 +136,109 @@ def read_file(file_to_path, return_str=False):
     return np.asarray(splitted, dtype=np.float32)
 
 
-def compute_moving_average(values, window_size=15):
-    """Compute a simple moving average over a list/array."""
-    means = []
-    for i in range(len(values)):
-        low = max(0, i - window_size + 1)
-        current_window = values[low: i + 1]
-        means.append(np.mean(current_window))
+MA_MODES = ("sma", "ema")
+_EMA_CHUNK_EXPONENT = 500.0  # borne de (1 - alpha) ** -k dans un bloc de l'EMA, loin de l'overflow
+
+
+def _window_sums(values, start, stop, window_size):
+    # moyennes des fenêtres glissantes finissant aux indices [start, stop), en O(stop - start + window).
+    # Sommes cumulées repartant de zéro tous les window_size points : une fenêtre couvre au plus
+    # deux blocs et sa somme n'additionne que ses propres valeurs, sans soustraction (une somme
+    # cumulée sur toute la série perdrait les décimales des grandes valeurs). Les valeurs non finies
+    # sont comptées à part pour garder le comportement de np.mean (NaN ou +/-inf propagés).
+    low = max(0, start - window_size + 1)
+    chunk = values[low:stop]
+    finite = np.isfinite(chunk)
+    n_blocks = -(-len(chunk) // window_size)
+    blocks = np.zeros(n_blocks * window_size)
+    blocks[:len(chunk)] = np.where(finite, chunk, 0.0)
+    blocks = blocks.reshape(n_blocks, window_size)
+    # sommes depuis le début de chaque bloc, et jusqu'à sa fin
+    prefix = np.cumsum(blocks, axis=1)
+    suffix = np.cumsum(blocks[:, ::-1], axis=1)[:, ::-1]
+
+    ends = np.arange(start, stop) - low
+    block, offset = np.divmod(ends, window_size)
+    sums = prefix[block, offset]
+    # fenêtre commencée dans le bloc précédent : on ajoute la fin de ce bloc
+    spans = (offset < window_size - 1) & (block > 0)
+    sums[spans] += suffix[block[spans] - 1, offset[spans] + 1]
+    means = sums / np.minimum(ends + low + 1, window_size)
+
+    zero = np.zeros(1)
+    n_nan = np.concatenate((zero, np.cumsum(np.isnan(chunk))))
+    n_pos = np.concatenate((zero, np.cumsum(chunk == np.inf)))
+    n_neg = np.concatenate((zero, np.cumsum(chunk == -np.inf)))
+    begins = np.maximum(ends - window_size + 1, 0)
+    pos = n_pos[ends + 1] - n_pos[begins] > 0
+    neg = n_neg[ends + 1] - n_neg[begins] > 0
+    means[pos] = np.inf
+    means[neg] = -np.inf
+    means[(pos & neg) | (n_nan[ends + 1] - n_nan[begins] > 0)] = np.nan
+    return means
+
+
+def _ema(values, alpha, state=0.0, start_index=0):
+    # EMA débiaisée m_t / (1 - (1 - alpha) ** t), calculée par blocs vectorisés
+    decay = 1.0 - alpha
+    means = np.empty(len(values))
+    if decay <= 0.0:
+        means[:] = values
+        return means
+    chunk_size = max(1, int(_EMA_CHUNK_EXPONENT / -np.log(decay))) if decay < 1.0 else len(values)
+    for begin in range(0, len(values), chunk_size):
+        chunk = values[begin:begin + chunk_size]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        # m_k = decay^k * state + alpha * sum_j decay^(k-j) * y_j
+        raw = powers * (state + alpha * np.cumsum(chunk / powers))
+        t = start_index + begin + np.arange(1, len(chunk) + 1)
+        means[begin:begin + len(chunk)] = raw / (1.0 - decay ** t)
+        state = raw[-1]
     return means
 
 
+def compute_moving_average(values, window_size=15, mode="sma"):
+    """Compute a moving average of a list/array in O(n).
+
+    mode="sma" averages the last window_size values (fewer at the start, as
+    np.mean over the trailing slice); mode="ema" is an exponential moving
+    average with alpha = 2 / (window_size + 1), debiased for the first points.
+    """
+    assert mode in MA_MODES, f"Unknown moving average mode {mode}."
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return np.empty(0)
+    window_size = max(int(window_size), 1)
+    if mode == "ema":
+        return _ema(values, 2.0 / (window_size + 1))
+    return _window_sums(values, 0, len(values), window_size)
+
+
+def extend_moving_average(values, previous, window_size=15, mode="sma"):
+    """Extend a moving average computed on a prefix of values to the whole array.
+
+    Only the len(values) - len(previous) new points are averaged (plus the
+    window before them), so a live curve does not recompute its whole history.
+    """
+    assert mode in MA_MODES, f"Unknown moving average mode {mode}."
+    values = np.asarray(values, dtype=float)
+    previous = np.asarray(previous, dtype=float)
+    start = len(previous)
+    if start == 0 or start > len(values):
+        return compute_moving_average(values, window_size, mode)
+    if start == len(values):
+        return previous
+    window_size = max(int(window_size), 1)
+    if mode == "ema":
+        alpha = 2.0 / (window_size + 1)
+        # état brut (non débiaisé) au dernier point déjà calculé
+        state = previous[-1] * (1.0 - (1.0 - alpha) ** start)
+        new = _ema(values[start:], alpha, state=state, start_index=start)
+    else:
+        new = _window_sums(values, start, len(values), window_size)
+    return np.concatenate((previous, new))
+
+
 # def compute_moving_average(values, window_size=15, alpha=0.1):
 #     # window size est là juste pour éviter un bug pour tester
 #     smoothed = [values[0]]
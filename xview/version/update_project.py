@@ -2,50 +2,141 @@
 
 Includes a lightweight check comparing local and upstream Git revisions and a
 function to show the update dialog or auto-update depending on preferences.
+
+The result of the check is cached in ~/.xview/version_check.json for
+VERSION_CHECK_TTL seconds, or until the local HEAD changes. Experiment never waits on it: a stale cache is
+refreshed in a background thread, bounded by VERSION_CHECK_TIMEOUT. Setting
+XVIEW_SKIP_VERSION_CHECK=1 disables the check in Experiment.
+
+This module is imported by xview.experiment: the Qt dialog (update_window) is
+only imported by check_for_updates, so logging never loads PyQt5.
 """
 
 import subprocess
 import functools
 import os
-from xview import get_config_file, set_config_data
-from xview.version.update_window import UpdateWindow, pull_latest_changes
+import time
+import threading
+from xview import CONFIG_FILE_DIR, get_config_file, set_config_data
+from xview.utils.utils import read_json, write_json
 from datetime import datetime, timedelta
 import sys
 
 
+VERSION_CHECK_TTL = 24 * 3600  # in seconds, lifetime of a cached check result
+VERSION_CHECK_TIMEOUT = 10.0  # in seconds, max duration of a whole check (git fetch included)
+VERSION_CHECK_CACHE = os.path.join(CONFIG_FILE_DIR, "version_check.json")
+SKIP_VERSION_CHECK_ENV = "XVIEW_SKIP_VERSION_CHECK"
+
 _warned_once = False
+_check_started = False
 
 
-def is_up_to_date() -> bool:
-    """Return True if the local repo is up to date with its upstream branch."""
-    REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+def _local_head(repo_dir):
+    # révision locale lue directement dans .git (sans lancer git) pour invalider le cache après un pull
+    git_dir = repo_dir
+    while not os.path.isdir(os.path.join(git_dir, ".git")):
+        parent = os.path.dirname(git_dir)
+        if parent == git_dir:
+            return None
+        git_dir = parent
+    git_dir = os.path.join(git_dir, ".git")
     try:
-        subprocess.run(["git", "fetch"], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, cwd=REPO_DIR)
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            head = f.read().strip()
+        if not head.startswith("ref: "):
+            return head
+        ref = head[len("ref: "):]
+        if os.path.exists(os.path.join(git_dir, ref)):
+            with open(os.path.join(git_dir, ref)) as f:
+                return f.read().strip()
+        with open(os.path.join(git_dir, "packed-refs")) as f:
+            for line in f:
+                if line.rstrip().endswith(" " + ref):
+                    return line.split()[0]
+    except OSError:
+        pass
+    return None
+
 
-        local = subprocess.check_output(["git", "rev-parse", "@"], stderr=subprocess.PIPE, cwd=REPO_DIR).strip()
-        remote = subprocess.check_output(["git", "rev-parse", "@{u}"], stderr=subprocess.PIPE, cwd=REPO_DIR).strip()
-        base = subprocess.check_output(["git", "merge-base", "@", "@{u}"], stderr=subprocess.PIPE, cwd=REPO_DIR).strip()
+def _run_git(args, deadline, repo_dir):
+    return subprocess.run(["git"] + args, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=repo_dir,
+                          timeout=max(deadline - time.monotonic(), 0.1)).stdout.strip()
 
-        return local == remote
+
+def is_up_to_date(timeout=VERSION_CHECK_TIMEOUT) -> bool:
+    """Return True if the local repo is up to date with its upstream branch, and cache the result."""
+    REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+    deadline = time.monotonic() + timeout
+    try:
+        _run_git(["fetch"], deadline, REPO_DIR)
+        local = _run_git(["rev-parse", "@"], deadline, REPO_DIR)
+        remote = _run_git(["rev-parse", "@{u}"], deadline, REPO_DIR)
+        up_to_date = local == remote
     except subprocess.CalledProcessError as e:
         print("/!\\ Erreur lors de la vérification de la version.")
         print(e.stderr.decode())
-        return True  # Par sécurité : éviter de bloquer l'exécution
+        up_to_date = True  # Par sécurité : éviter de bloquer l'exécution
+    except subprocess.TimeoutExpired:
+        print(f"/!\\ Vérification de la version abandonnée après {timeout} s.")
+        up_to_date = True
     except Exception as e:
         print(f"/!\\ Erreur inattendue : {e}")
-        return True
+        up_to_date = True
+    # les échecs sont aussi mis en cache : inutile de relancer un git fetch voué à l'échec à chaque job
+    try:
+        write_json(VERSION_CHECK_CACHE, {"checked_at": time.time(), "head": _local_head(REPO_DIR), "up_to_date": up_to_date})
+    except OSError:
+        pass
+    return up_to_date
+
+
+def cached_is_up_to_date():
+    """Return the cached check result if younger than VERSION_CHECK_TTL and made at the current HEAD, else None."""
+    try:
+        cache = read_json(VERSION_CHECK_CACHE, timeout=0)
+        head = _local_head(os.path.dirname(os.path.abspath(__file__)))
+        if time.time() - cache["checked_at"] < VERSION_CHECK_TTL and cache.get("head") == head:
+            return bool(cache["up_to_date"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _print_outdated_warning():
+    global _warned_once
+    if _warned_once:
+        return
+    _warned_once = True
+    print("# -------------------------------------------------------------------------- #")
+    print("Votre version du projet XView n'est pas à jour. Vous pouvez le mettre à jour en exécutant 'git pull' dans le répertoire du projet.")
+    print("# -------------------------------------------------------------------------- #")
+
+
+def _background_check():
+    if not is_up_to_date():
+        _print_outdated_warning()
 
 
 def warn_if_outdated(obj):
-    """Decorator that prints a one-time warning if the repo is outdated."""
+    """Decorator that prints a one-time warning if the repo is outdated.
+
+    Never blocks: the cached result is used when fresh, otherwise the check
+    runs in a daemon thread and warns when it ends. Skipped when
+    XVIEW_SKIP_VERSION_CHECK is set, and on non-zero distributed ranks.
+    """
     @functools.wraps(obj)
     def wrapper(*args, **kwargs):
-        global _warned_once
-        if not _warned_once and not is_up_to_date():
-            print("# -------------------------------------------------------------------------- #")
-            print("Votre version du projet XView n'est pas à jour. Vous pouvez le mettre à jour en exécutant 'git pull' dans le répertoire du projet.")
-            print("# -------------------------------------------------------------------------- #")
-            _warned_once = True
+        global _check_started
+        if not _check_started:
+            _check_started = True
+            skip = os.environ.get(SKIP_VERSION_CHECK_ENV, "") not in ("", "0") or os.environ.get("RANK", "0") != "0"
+            if not skip:
+                up_to_date = cached_is_up_to_date()
+                if up_to_date is None:
+                    threading.Thread(target=_background_check, name="xview-version-check", daemon=True).start()
+                elif not up_to_date:
+                    _print_outdated_warning()
         return obj(*args, **kwargs)
     return wrapper
 
@@ -62,6 +153,7 @@ def warn_if_outdated(obj):
 
 def check_for_updates():
     """Check for available updates and prompt or auto-update as configured."""
+    from xview.version.update_window import UpdateWindow, pull_latest_changes
     if not is_up_to_date():
         #  si pas auto-update
         if not get_config_file().get("auto_update", False):  # pas d'auto-update
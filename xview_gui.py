@@ -37,6 +37,7 @@ except Exception:
     # Ignore banner failures
     pass
 
+import io
 import os
 import time
 import datetime
@@ -44,14 +45,22 @@ import shutil
 import random
 import json
 from pathlib import Path
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QWidget, QHBoxLayout, QLabel, QPushButton, QSplitter, QTextEdit, QLineEdit, QTableWidget, QTableWidgetItem, QMessageBox)
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QWidget, QHBoxLayout, QLabel, QPushButton, QSplitter, QTextEdit, QLineEdit, QTableWidget, QTableWidgetItem, QMessageBox, QFileDialog)
 from PyQt5.QtGui import QColor, QIcon, QPalette, QClipboard
 from PyQt5.QtCore import QDateTime
 from PyQt5.QtCore import QTimer, Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from xview.utils.utils import read_file, read_json, compute_moving_average, write_file
+from xview.utils.utils import read_file, read_json_cached, write_json, compute_moving_average, extend_moving_average, write_file, remove_tree
 from xview.utils.plot_utils import plot_monitoring_lines
+from xview.utils.decimate import minmax_decimate, visible_slice
+from xview.utils.pyramid import has_pyramid, read_pyramid
+from xview.utils.score_io import read_score_path, list_score_files, merge_shards
+from xview.utils.tail_reader import ScoreTailReader, GrowingArray
+from xview.utils.histogram import HISTOGRAM_QUANTILES, HISTOGRAM_BANDS, list_histogram_files, read_histograms
+from xview.utils.artifacts import store_folder, store_blob, read_artifacts, write_artifacts, export_artifacts, collect_artifacts
+from xview.utils.live_channel import LiveChannelReader
+from xview.journal import has_journal, read_journal_state
 from xview.tree_widget import MyTreeWidget
 from xview.graph.curves_selector import CurvesSelector
 from config import ConfigManager
@@ -70,6 +79,11 @@ import tempfile
 import platform
 
 
+# in seconds, attente max d'un JSON illisible sur le thread Qt (read_json réessaie jusqu'à READ_JSON_TIMEOUT sinon)
+UI_READ_JSON_TIMEOUT = 0.05
+LIVE_POLL_INTERVAL = 250  # in ms, période de lecture du canal live (mémoire partagée) de l'expérience affichée
+
+
 class ExperimentViewer(QMainWindow):
     """Primary window showing experiment lists, plots, and info panels."""
 
@@ -144,8 +158,8 @@ class ExperimentViewer(QMainWindow):
 
         self.config_window = None
 
-        self.training_list = MyTreeWidget(self, display_exp=self.display_experiment, display_range=self.display_exp_range, remove_folders_callback=self.remove_folders, move_exp_callback=self.move_exp, copy_exp_callback=self.copy_exp)
-        self.finished_list = MyTreeWidget(self, display_exp=self.display_experiment, display_range=self.display_exp_range, remove_folders_callback=self.remove_folders, move_exp_callback=self.move_exp, copy_exp_callback=self.copy_exp)
+        self.training_list = MyTreeWidget(self, display_exp=self.display_experiment, display_range=self.display_exp_range, remove_folders_callback=self.remove_folders, move_exp_callback=self.move_exp, copy_exp_callback=self.copy_exp, export_artifacts_callback=self.export_exp_artifacts)
+        self.finished_list = MyTreeWidget(self, display_exp=self.display_experiment, display_range=self.display_exp_range, remove_folders_callback=self.remove_folders, move_exp_callback=self.move_exp, copy_exp_callback=self.copy_exp, export_artifacts_callback=self.export_exp_artifacts)
 
         left_layout.addWidget(QLabel("Experiments in progress"))
         left_layout.addWidget(self.training_list)
@@ -163,6 +177,9 @@ class ExperimentViewer(QMainWindow):
         self.figure = Figure()
         self.canvas = FigureCanvas(self.figure)
         splitter.addWidget(self.canvas)
+        # courbes tracées en version décimée : (ligne, x complet, y complet, fichier de score)
+        self.decimated_curves = []
+        self.canvas.mpl_connect("resize_event", self.redecimate_curves)
 
         # region - RIGHT WIDGET
         # Widget droit : Affichage du schéma du modèle et des informations
@@ -179,6 +196,9 @@ class ExperimentViewer(QMainWindow):
             lambda: self.set_exp_config_data("x_min", self.range_widget.x_min.text()))
         self.range_widget.x_max.editingFinished.connect(
             lambda: self.set_exp_config_data("x_max", self.range_widget.x_max.text()))
+        # la décimation des courbes dépend de la plage x affichée
+        self.range_widget.x_min.editingFinished.connect(self.update_plot)
+        self.range_widget.x_max.editingFinished.connect(self.update_plot)
         # ------------------------ y axis
         self.range_widget.y_min.editingFinished.connect(
             lambda: self.set_exp_config_data("y_min", self.range_widget.y_min.text()))
@@ -225,11 +245,30 @@ class ExperimentViewer(QMainWindow):
         self.remote_fetch_timer.timeout.connect(self.fetch_remote_data)
         self.remote_fetch_timer.start(0)
 
+        # canal live : points publiés en mémoire partagée par un entraînement sur cette machine
+        self.live_reader = None
+        self.live_points = {}  # série -> (indices, x, y) reçus en live, pas encore lus sur disque
+        # série -> (x, y) en GrowingArray : points lus sur disque puis points live, ajoutés sans recopie
+        self.live_series = {}
+        self.live_plot_settings = None  # plage et moyenne mobile du dernier update_plot, réutilisées en live
+        self.live_timer = QTimer(self)
+        self.live_timer.timeout.connect(self.poll_live_channel)
+        self.live_timer.start(LIVE_POLL_INTERVAL)
+
         # Variables pour le stockage temporaire
         self.current_scores = {}
+        self.current_score_files = {}
         self.current_flags = {}
+        self.current_histograms = {}
+        self.current_journal_state = None
         self.current_train_loss = []
         self.current_val_loss = []
+        # lecteurs incrémentaux des fichiers de scores/flags, par chemin
+        self.tail_readers = {}
+        # moyennes mobiles déjà calculées, prolongées quand de nouveaux points arrivent
+        self.ma_cache = {}
+        # enregistrements d'histogrammes déjà lus, par chemin ; seuls les nouveaux sont lus ensuite
+        self.histogram_cache = {}
 
         self.set_dark_mode(get_config_file()["dark_mode"])
 
@@ -296,12 +335,12 @@ class ExperimentViewer(QMainWindow):
         """Remove a directory tree; log errors but continue."""
         try:
             if p.is_dir():
-                shutil.rmtree(p)
+                remove_tree(p)
         except Exception as e:
             print(f"Error removing {p}: {e}")
 
     def cleanup_trash(self):
-        """Clean the Trash folder based on max days and max size limits."""
+        """Clean the Trash folder based on max days and max size limits, then delete unreferenced artifacts."""
         trash_dir = self.get_trash_dir()
         if not os.path.exists(trash_dir):
             return
@@ -335,6 +374,14 @@ class ExperimentViewer(QMainWindow):
                     self._remove_path(item)
                     total -= size
 
+        # 3. Supprimer les artefacts que plus aucune expérience (corbeille comprise) ne référence
+        try:
+            freed = collect_artifacts(self.experiments_dir, extra_folders=(str(trash_dir),))
+            if freed > 0:
+                print(f"Artefacts non référencés supprimés : {freed / (1024 * 1024):.1f} Mo")
+        except (OSError, ValueError) as e:
+            print(f"Error collecting artifacts: {e}")
+
     def read_dark_mode_state(self):
         """Return dark mode boolean from the config file."""
         return get_config_file()["dark_mode"]
@@ -389,6 +436,9 @@ class ExperimentViewer(QMainWindow):
 
             for entry in os.listdir(path):
                 entry_path = os.path.join(path, entry)
+                # dossiers cachés (store d'artefacts .artifacts...) : ni groupes ni expériences
+                if entry.startswith("."):
+                    continue
                 if os.path.isdir(entry_path):
                     status_file = os.path.join(entry_path, "status.txt")
                     if os.path.exists(status_file):
@@ -438,46 +488,143 @@ class ExperimentViewer(QMainWindow):
 
     @staticmethod
     def read_scores(file_path):
-        """Read score file and return (x, y) arrays; supports one- or two-column format."""
+        """Read score file and return (x, y) arrays; supports one- or two-column format and .bin files."""
         if os.path.exists(file_path):
-            with open(file_path, "r") as f:
-                lines = f.readlines()
-            x = []
-            y = []
-            for line in lines:
-                values = line.strip().split(",")
-                if len(values) == 1:
-                    y.append(float(values[0]))
-                else:
-                    x.append(float(values[0]))
-                    y.append(float(values[1]))
-            return (x, y)
+            return read_score_path(file_path)
 
         else:
             print(f"Le fichier {file_path} n'existe pas.")
             return []
 
+    def read_score_file(self, file_path):
+        """Return (x, y) of a score file, parsing only what was appended since the last refresh."""
+        if file_path not in self.tail_readers:
+            self.tail_readers[file_path] = ScoreTailReader(file_path)
+        return self.tail_readers[file_path].read()
+
     def read_current_scores(self):
         scores_folder_path = os.path.join(self.experiments_dir, self.current_experiment_name, "scores")
         self.current_scores = {}
-        if os.path.exists(scores_folder_path):
-            for file_name in os.listdir(scores_folder_path):
-                score = file_name.split(".")[0]
-                if file_name.endswith(".txt") and not score.endswith("_label_value"):
-                    file_path = os.path.join(scores_folder_path, file_name)
-                    x, y = self.read_scores(file_path)
-                    self.current_scores[score] = (x, y)
+        self.live_series = {}
+        self.current_score_files = {}
+        if self.current_journal_state is not None:
+            for score, series in self.current_journal_state["scores"].items():
+                x = [v for v in series["x"] if v is not None]
+                self.current_scores[score] = (x, series["y"])
+        elif os.path.exists(scores_folder_path):
+            # une expérience multi-process a un fichier par rank : on fusionne par step
+            for score, file_paths in list_score_files(scores_folder_path).items():
+                x, y = merge_shards([self.read_score_file(file_path) for file_path in file_paths])
+                self.current_scores[score] = (x, y)
+                if len(file_paths) == 1:
+                    self.current_score_files[score] = file_paths[0]
+            self.apply_live_points()
+
+    def poll_live_channel(self):
+        """Add the points published on the live channel of the current experiment, and redraw if there are new ones."""
+        if self.current_experiment_name is None or self.current_journal_state is not None:
+            return
+        if self.live_reader is None or self.live_reader.experiment != self.current_experiment_name:
+            if self.live_reader is not None:
+                self.live_reader.close()
+            self.live_reader = LiveChannelReader(self.experiments_dir, self.current_experiment_name)
+        new_points = self.live_reader.read()
+        if not new_points:
+            return
+        for score, points in new_points.items():
+            if score in self.live_points:
+                # seuls les points pas encore ajoutés à la courbe restent en attente : concaténation courte
+                points = tuple(np.concatenate(pair) for pair in zip(self.live_points[score], points))
+            self.live_points[score] = points
+        updated = self.apply_live_points()
+        if updated:
+            self.update_live_curves(updated)
+
+    def apply_live_points(self):
+        """Append to current_scores the live points that follow those read from disk; return the names of the updated series."""
+        updated = []
+        for score, (index, x, y) in list(self.live_points.items()):
+            if score not in self.current_scores:
+                # série pas encore sur disque : ni case à cocher ni style, on attend la prochaine lecture
+                continue
+            disk_x, disk_y = self.current_scores[score]
+            n_disk = len(disk_y)
+            keep = index >= n_disk
+            index, x, y = index[keep], x[keep], y[keep]
+            self.live_points[score] = (index, x, y)
+            # seulement les points contigus à ceux du disque (un point perdu sera lu sur disque)
+            n_new = int(np.argmin(np.append(index == n_disk + np.arange(len(index)), False)))
+            if n_new == 0:
+                continue
+            if score not in self.live_series:
+                # une copie des points du disque par lecture, puis les points live s'y ajoutent en O(nouveaux points)
+                self.live_series[score] = (GrowingArray(), GrowingArray())
+                self.live_series[score][0].extend(disk_x)
+                self.live_series[score][1].extend(disk_y)
+            series_x, series_y = self.live_series[score]
+            if len(disk_x) > 0 or (n_disk == 0 and not np.isnan(x[:n_new]).any()):
+                series_x.extend(x[:n_new])
+            series_y.extend(y[:n_new])
+            self.current_scores[score] = (series_x.view(), series_y.view())
+            updated.append(score)
+        return updated
+
+    def update_live_curves(self, scores):
+        """Redraw the curves of the given scores with their new live points, without rebuilding the plot.
+
+        Only the data of those lines changes (set_data). Monitoring lines and
+        flags follow at the next full refresh. Normalized curves depend on the
+        whole series and are redrawn with update_plot.
+        """
+        settings = self.live_plot_settings
+        if settings is None or settings["normalize"]:
+            self.update_plot()
+            return
+        curves = [curve for curve in self.decimated_curves if curve[4] is not None and curve[4][0] in scores]
+        if not curves:
+            return
+        n_buckets = self.get_decimation_buckets()
+        for curve in curves:
+            line, _, _, score_file, (score, kind) = curve
+            x, y = self.current_scores[score]
+            if kind == "ma":
+                y = self.get_moving_average(score, y, settings["ma_window_size"], settings["ma_mode"])
+            x = x if len(x) > 0 else None
+            curve[1], curve[2] = x, y
+            line.set_data(*self.decimate_curve(x, y, n_buckets, settings["x_min"], settings["x_max"], score_file))
+        ax = curves[0][0].axes
+        ax.relim()
+        # les bornes fixées par l'utilisateur restent, les autres suivent les nouveaux points
+        ax.set_autoscalex_on(settings["x_min"] is None and settings["x_max"] is None)
+        ax.set_autoscaley_on(settings["y_min"] is None and settings["y_max"] is None)
+        ax.autoscale_view()
+        self.canvas.draw_idle()
 
     def read_current_flags(self):
         flags_folder_path = os.path.join(self.experiments_dir, self.current_experiment_name, "flags")
         self.current_flags = {}
-        if os.path.exists(flags_folder_path):
-            for file_name in os.listdir(flags_folder_path):
-                flag = file_name.split(".")[0]
-                if file_name.endswith(".txt") and not flag.endswith("_label_value"):
-                    file_path = os.path.join(flags_folder_path, file_name)
-                    _, x = self.read_scores(file_path)
-                    self.current_flags[flag] = x
+        if self.current_journal_state is not None:
+            for flag, series in self.current_journal_state["flags"].items():
+                self.current_flags[flag] = series["y"]
+        elif os.path.exists(flags_folder_path):
+            for flag, file_paths in list_score_files(flags_folder_path).items():
+                _, x = merge_shards([self.read_score_file(file_path) for file_path in file_paths])
+                self.current_flags[flag] = x
+
+    def read_current_histograms(self):
+        histograms_folder_path = os.path.join(self.experiments_dir, self.current_experiment_name, "histograms")
+        self.current_histograms = {}
+        for name, file_path in list_histogram_files(histograms_folder_path).items():
+            size = os.path.getsize(file_path)
+            cached = self.histogram_cache.get(file_path)
+            if cached is None or size < cached[0] or len(cached[1]) == 0:
+                records = read_histograms(file_path)
+            elif size == cached[0]:
+                records = cached[1]
+            else:
+                records = np.concatenate((cached[1], read_histograms(file_path, start=len(cached[1]))))
+            self.histogram_cache[file_path] = (size, records)
+            self.current_histograms[name] = records
 
     def display_exp_range(self):
         """Populate the range widget with the current experiment's stored bounds."""
@@ -524,14 +671,23 @@ class ExperimentViewer(QMainWindow):
     # region - display_experiment
     def display_experiment(self, path):
         """Load scores/flags for the selected experiment and redraw the plot."""
+        if path != self.current_experiment_name:
+            self.tail_readers = {}
+            self.ma_cache = {}
+            self.histogram_cache = {}
+            self.live_points = {}
         self.current_experiment_name = path
 
         exp_path = os.path.join(self.experiments_dir, path)
         exp_info_file = os.path.join(exp_path, "exp_infos.json")
 
+        # expérience en mode journal : un seul fichier lu séquentiellement
+        self.current_journal_state = read_journal_state(exp_path) if has_journal(exp_path) else None
+
         # Charger les données des courbes
         self.read_current_scores()
         self.read_current_flags()
+        self.read_current_histograms()
 
         if exp_path != self.curve_selector_widget.current_path:
             self.curve_selector_widget.reset_window(exp_path)
@@ -542,9 +698,19 @@ class ExperimentViewer(QMainWindow):
             self.curve_selector_widget.update_boxes(
                 self.current_scores.keys(), self.current_flags.keys()
             )
+        self.curve_selector_widget.update_boxes(flags_list=[f"{name} (hist)" for name in self.current_histograms])
+
+        exp_info = None
+        if self.current_journal_state is not None:
+            exp_info = self.current_journal_state["infos"]
+        elif os.path.exists(exp_info_file):
+            try:
+                # un fichier corrompu n'est relu qu'une fois modifié
+                exp_info = read_json_cached(exp_info_file, timeout=UI_READ_JSON_TIMEOUT)
+            except json.JSONDecodeError:
+                exp_info = None
 
-        if os.path.exists(exp_info_file):
-            exp_info = read_json(exp_info_file)
+        if exp_info is not None:
             sorted_keys = sorted(exp_info.keys())
 
             # Mettre à jour le tableau
@@ -567,13 +733,14 @@ class ExperimentViewer(QMainWindow):
                 # Réduire la hauteur des lignes
                 self.exp_info_table.setRowHeight(row, 20)
         else:
+            self.exp_info_table.setRowCount(0)
             self.exp_info_text.setText("Aucune information disponible")
 
-        scores_files = os.path.join(self.experiments_dir, self.current_experiment_name, "scores")
-        if len(os.listdir(scores_files)) > 0:
+        if len(self.current_scores) > 0 or len(self.current_histograms) > 0:
             self.update_plot()
         else:
             self.figure.clear()
+            self.decimated_curves = []
             self.canvas.draw()
 
     def get_curves_style(self):
@@ -589,14 +756,29 @@ class ExperimentViewer(QMainWindow):
         return colors, self.palette.flags_ls, self.palette.flags_alpha
 
     def get_plt_args(self, score_name, type):
+        if self.current_journal_state is not None:
+            plt_args = self.current_journal_state[type][score_name]["plt_args"]
+            return dict(plt_args) if plt_args is not None else None
         score_dir = os.path.join(self.experiments_dir, self.current_experiment_name, type)
         plt_args_file = os.path.join(score_dir, f"{score_name}_plt_args.json")
         if os.path.exists(plt_args_file):
-            plt_args = read_json(plt_args_file)
-            return plt_args
+            try:
+                return read_json_cached(plt_args_file, timeout=UI_READ_JSON_TIMEOUT)
+            except json.JSONDecodeError:
+                return None
         else:
             return None
 
+    def get_label_value(self, score_name, type):
+        """Return the label value shown in the legend for a score or flag ('' if none)."""
+        if self.current_journal_state is not None:
+            label_value = self.current_journal_state[type][score_name]["label_value"]
+            return label_value if label_value is not None else ""
+        label_file = os.path.join(self.experiments_dir, self.current_experiment_name, type, f"{score_name}_label_value.txt")
+        if os.path.exists(label_file):
+            return read_file(label_file, return_str=True)
+        return ""
+
     def save_widget_sizes(self):
         """Save current splitter sizes (left/plot/right) into config for persistence."""
         # Get the sizes from the main splitter
@@ -610,12 +792,15 @@ class ExperimentViewer(QMainWindow):
             set_config_data("widget_sizes", (left_width, plot_width, right_width))
 
     def get_scores_monitoring(self):
+        if self.current_journal_state is not None:
+            return self.current_journal_state["config"].get("scores_monitoring")
         return self.get_exp_config_data("scores_monitoring")
 
     # region - UPDATE PLOT
     def update_plot(self):
         """Update the Matplotlib plot based on selected scores, flags, and options."""
         self.figure.clear()
+        self.decimated_curves = []
         ax = self.figure.add_subplot(111)
 
         if self.dark_mode_enabled:
@@ -702,6 +887,10 @@ class ExperimentViewer(QMainWindow):
             else:
                 y_max = float(y_max)
 
+        ma_window_size = get_config_data("ma_window_size")
+        ma_mode = get_config_data("ma_mode") or "sma"
+        normalize = self.current_experiment_name is not None and self.get_exp_config_data("normalize")
+
         for i, score in enumerate(self.current_scores):
             plt_args = self.get_plt_args(score, type="scores")
             if plt_args is not None:
@@ -718,18 +907,14 @@ class ExperimentViewer(QMainWindow):
                 plt_args = {}
 
             x, y = self.current_scores[score]
-            y_ma = compute_moving_average(y, window_size=get_config_data("ma_window_size"))
+            y_ma = self.get_moving_average(score, y, ma_window_size, ma_mode)
+            # la pyramide sur disque ne vaut que pour les valeurs brutes
+            score_file = None if normalize else self.current_score_files.get(score)
 
-            if os.path.exists(
-                os.path.join(self.experiments_dir, self.current_experiment_name, "scores", f"{score}_label_value.txt")
-            ):
-                label_file = os.path.join(self.experiments_dir, self.current_experiment_name, "scores", f"{score}_label_value.txt")
-                label_value = read_file(label_file, return_str=True)
-            else:
-                label_value = ""
+            label_value = self.get_label_value(score, type="scores")
 
             #  ----------------------------------------------------------- NORMALIZE IF NEEDED
-            if self.get_exp_config_data("normalize"):
+            if normalize:
                 #  normalisation 0 1
                 y = np.array(y)
                 y_ma = np.array(y_ma)
@@ -741,28 +926,35 @@ class ExperimentViewer(QMainWindow):
                     y_ma = (y_ma - np.min(y_ma)) / (np.max(y_ma) - np.min(y_ma))
 
             #  ----------------------------------------------------------- PLOT CURVES
-            monitoring_modes = scores_monitoring[score]
+            # série plus récente que le config.json lu : mode par défaut
+            monitoring_modes = scores_monitoring.get(score, "max")
             if len(x) > 0:
                 if self.curve_selector_widget.boxes[score][0].isChecked():  #  score
-                    ax.plot(x, y, label=f"{label_value} {score}", ls=curves_ls, color=curves_colors[i], alpha=curves_alpha, **plt_args)
+                    self.plot_decimated(ax, x, y, x_min, x_max, score_file=score_file, series=(score, None), label=f"{label_value} {score}", ls=curves_ls, color=curves_colors[i], alpha=curves_alpha, **plt_args)
                     if self.range_widget.optimum_checkbox.isChecked():
                         plot_monitoring_lines(ax, x, y, color=curves_colors[i], monitoring_flags=monitoring_modes, ls="-.", alpha=curves_alpha, x_max_range=x_max)
                 if self.curve_selector_widget.boxes[f"{score} (MA)"][0].isChecked():  # score MA
-                    ax.plot(x, y_ma, label=f"{score} (MA)", ls=ma_curves_ls, color=curves_colors[i], alpha=ma_curves_alpha, **plt_args)
+                    self.plot_decimated(ax, x, y_ma, x_min, x_max, series=(score, "ma"), label=f"{score} (MA)", ls=ma_curves_ls, color=curves_colors[i], alpha=ma_curves_alpha, **plt_args)
                     if self.range_widget.optimum_checkbox.isChecked():
                         plot_monitoring_lines(ax, x, y_ma, color=curves_colors[i], monitoring_flags=monitoring_modes, ls="-.", alpha=ma_curves_alpha, x_max_range=x_max)
             else:
                 if self.curve_selector_widget.boxes[score][0].isChecked():
-                    ax.plot(y, label=f"{label_value} {score}", ls=curves_ls, color=curves_colors[i], alpha=curves_alpha, **plt_args)
+                    self.plot_decimated(ax, None, y, x_min, x_max, score_file=score_file, series=(score, None), label=f"{label_value} {score}", ls=curves_ls, color=curves_colors[i], alpha=curves_alpha, **plt_args)
                     if self.range_widget.optimum_checkbox.isChecked():
                         xx = np.arange(len(y))
                         plot_monitoring_lines(ax, xx, y, color=curves_colors[i], monitoring_flags=monitoring_modes, ls="-.", alpha=curves_alpha, x_max_range=x_max)
                 if self.curve_selector_widget.boxes[f"{score} (MA)"][0].isChecked():
-                    ax.plot(y_ma, label=f"{score} (MA)", ls=ma_curves_ls, color=curves_colors[i], alpha=ma_curves_alpha, **plt_args)
+                    self.plot_decimated(ax, None, y_ma, x_min, x_max, series=(score, "ma"), label=f"{score} (MA)", ls=ma_curves_ls, color=curves_colors[i], alpha=ma_curves_alpha, **plt_args)
                     if self.range_widget.optimum_checkbox.isChecked():
                         xx = np.arange(len(y))
                         plot_monitoring_lines(ax, xx, y_ma, color=curves_colors[i], monitoring_flags=monitoring_modes, ls="-.", alpha=ma_curves_alpha, x_max_range=x_max)
 
+        #  ----------------------------------------------------------- PLOT HISTOGRAMS
+        for i, name in enumerate(self.current_histograms):
+            if self.curve_selector_widget.boxes[f"{name} (hist)"][0].isChecked():
+                color = curves_colors[(len(self.current_scores) + i) % len(curves_colors)]
+                self.plot_histogram_bands(ax, name, self.current_histograms[name], color=color, alpha=curves_alpha)
+
         for i, flag in enumerate(self.current_flags):
             plt_args = self.get_plt_args(flag, type="flags")
             if plt_args is not None:
@@ -778,13 +970,7 @@ class ExperimentViewer(QMainWindow):
             else:
                 plt_args = {}
 
-            if os.path.exists(
-                os.path.join(self.experiments_dir, self.current_experiment_name, "flags", f"{flag}_label_value.txt")
-            ):
-                label_file = os.path.join(self.experiments_dir, self.current_experiment_name, "flags", f"{flag}_label_value.txt")
-                label_value = read_file(label_file, return_str=True)
-            else:
-                label_value = ""
+            label_value = self.get_label_value(flag, type="flags")
 
             #  ----------------------------------------------------------- PLOT FLAGS
             x = self.current_flags[flag]
@@ -799,6 +985,7 @@ class ExperimentViewer(QMainWindow):
                     x_max if x_max is not None else ax.get_xlim()[1])
         ax.set_ylim(y_min if y_min is not None else ax.get_ylim()[0],
                     y_max if y_max is not None else ax.get_ylim()[1])
+        ax.callbacks.connect("xlim_changed", self.redecimate_curves)
 
         ax.set_title(self.current_experiment_name)
         ax.set_xlabel("Epochs")
@@ -810,9 +997,83 @@ class ExperimentViewer(QMainWindow):
         self.figure.tight_layout()
 
         self.canvas.draw()
+        self.live_plot_settings = {"x_min": x_min, "x_max": x_max, "y_min": y_min, "y_max": y_max, "normalize": normalize,
+                                   "ma_window_size": ma_window_size, "ma_mode": ma_mode}
 
         self.save_widget_sizes()
 
+    def plot_histogram_bands(self, ax, name, records, color, alpha=1.0):
+        """Draw a histogram series as quantile bands (HISTOGRAM_BANDS) around its median."""
+        # au plus deux enregistrements par pixel
+        records = records[::max(len(records) // (2 * self.get_decimation_buckets()), 1)]
+        records = records[records["count"] > 0]
+        levels = list(HISTOGRAM_QUANTILES)
+        quantiles = records["quantiles"]
+        for k, (low, high) in enumerate(HISTOGRAM_BANDS):
+            ax.fill_between(records["x"], quantiles[:, levels.index(low)], quantiles[:, levels.index(high)],
+                            color=color, alpha=alpha * 0.15 * (k + 1), linewidth=0)
+        ax.plot(records["x"], quantiles[:, levels.index(0.5)], color=color, alpha=alpha, label=f"{name} (median)")
+
+    def get_moving_average(self, score, y, window_size, mode="sma"):
+        """Return the moving average of a score, only averaging the points added since the last call."""
+        settings = (window_size, mode)
+        cached = self.ma_cache.get(score)
+        # le cache n'est prolongé que si les points déjà moyennés n'ont pas changé
+        if cached is not None and cached[0] == settings and 0 < len(cached[1]) <= len(y) \
+                and cached[2] == y[len(cached[1]) - 1]:
+            y_ma = extend_moving_average(y, cached[1], window_size, mode)
+        else:
+            y_ma = compute_moving_average(y, window_size, mode)
+        self.ma_cache[score] = (settings, y_ma, y[-1] if len(y) > 0 else None)
+        return y_ma
+
+    def get_decimation_buckets(self):
+        """Number of x buckets used to decimate curves: one per horizontal pixel of the canvas."""
+        return max(int(self.figure.bbox.width), 100)
+
+    @staticmethod
+    def decimate_curve(x, y, n_buckets, x_min=None, x_max=None, score_file=None):
+        """Return the points to draw for a curve, from its pyramid when score_file has one."""
+        if score_file is not None and has_pyramid(score_file):
+            try:
+                envelope = read_pyramid(score_file, n_buckets, x_min, x_max)
+            except (OSError, ValueError):
+                # pyramide en cours de reconstruction
+                envelope = None
+            if envelope is not None:
+                # points reçus en live, après la fin du fichier et donc de sa pyramide
+                last_x = np.max(envelope[0]) if len(envelope[0]) > 0 else -np.inf
+                if x is None or len(x) == 0:
+                    start = max(int(last_x) + 1, 0) if np.isfinite(last_x) else 0
+                    live_x = np.arange(start, len(y), dtype=float)
+                else:
+                    start = int(np.searchsorted(x, last_x, side="right"))
+                    live_x = np.asarray(x[start:], dtype=float)
+                live_y = np.asarray(y[start:], dtype=float)
+                visible = visible_slice(live_x, x_min, x_max)
+                return np.concatenate((envelope[0], live_x[visible])), np.concatenate((envelope[1], live_y[visible]))
+        return minmax_decimate(x, y, n_buckets, x_min, x_max)
+
+    def plot_decimated(self, ax, x, y, x_min=None, x_max=None, score_file=None, series=None, **plot_kwargs):
+        """Plot a curve reduced to the min/max points of each visible pixel column.
+
+        series is (score name, None or "ma"), used to update the line when live points arrive.
+        """
+        x_plot, y_plot = self.decimate_curve(x, y, self.get_decimation_buckets(), x_min, x_max, score_file)
+        line, = ax.plot(x_plot, y_plot, **plot_kwargs)
+        self.decimated_curves.append([line, x, y, score_file, series])
+        return line
+
+    def redecimate_curves(self, event=None):
+        """Decimate the plotted curves again for the current canvas width and x range."""
+        if not self.decimated_curves:
+            return
+        n_buckets = self.get_decimation_buckets()
+        for line, x, y, score_file, _ in self.decimated_curves:
+            x_min, x_max = line.axes.get_xlim()
+            line.set_data(*self.decimate_curve(x, y, n_buckets, x_min, x_max, score_file))
+        self.canvas.draw_idle()
+
     def refresh_graph(self):
         """Manually refresh the plot and selection if current experiment changed."""
         self.setup_timers()
@@ -822,29 +1083,51 @@ class ExperimentViewer(QMainWindow):
             else:
                 # print("Aucune expérience sélectionnée. Veuillez en sélectionner une dans la liste.")
                 self.figure.clear()
+                self.decimated_curves = []
                 self.canvas.draw()
                 self.current_experiment_name = None
         # else:
         #     print("Aucune expérience sélectionnée. Veuillez en sélectionner une dans la liste.")
 
     def save_graph(self):
-        """Save the current plot as a PNG under the experiment's figures folder."""
+        """Save the current plot as a PNG artifact "figures/<date>.png" of the experiment."""
         if not self.current_experiment_name:
             # print("Aucune expérience sélectionnée. Veuillez en sélectionner une.")
             return
 
-        exp_figure_path = os.path.join(self.experiments_dir, self.current_experiment_name, 'figures')
-
-        if not os.path.exists(exp_figure_path):
-            os.makedirs(exp_figure_path)
+        exp_path = os.path.join(self.experiments_dir, self.current_experiment_name)
 
         # format yyyy-mm-dd_HH-MM-SS
         figure_date = QDateTime.currentDateTime().toString("yyyy-MM-dd_HH-mm-ss")
+        name = f"figures/{figure_date}.png"
 
-        save_path = os.path.join(exp_figure_path, f"{figure_date}.png")
+        buffer = io.BytesIO()
+        self.figure.savefig(buffer, format="png", dpi=300)  # Enregistrer en haute qualité
 
-        self.figure.savefig(save_path, dpi=300)  # Enregistrer en haute qualité
-        print(f"Graph enregistré dans : {save_path}")
+        # contenu dans le store partagé du data_folder, référence dans artifacts.json de l'expérience
+        store = store_folder(self.experiments_dir)
+        digest, size = store_blob(store, buffer.getvalue())
+        artifacts = read_artifacts(exp_path)
+        artifacts[name] = {"hash": digest, "size": size, "file_name": f"{figure_date}.png"}
+        write_artifacts(exp_path, artifacts)
+        print(f"Graph enregistré dans les artefacts de {self.current_experiment_name} : {name} (menu « Export artifacts » pour le récupérer)")
+
+    def export_exp_artifacts(self, path):
+        """Copy the artifacts of an experiment (saved graphs...) into a folder chosen by the user."""
+        exp_path = os.path.join(self.experiments_dir, path)
+        if not read_artifacts(exp_path):
+            QMessageBox.information(self, "Export", "Cette expérience n'a aucun artefact.")
+            return
+        dest_dir = QFileDialog.getExistingDirectory(self, "Exporter les artefacts vers")
+        if not dest_dir:
+            return
+        dest_path = os.path.join(dest_dir, os.path.basename(path))
+        try:
+            paths = export_artifacts(self.experiments_dir, exp_path, dest_path)
+        except OSError as e:
+            print(f"/!\\ Erreur lors de l'export des artefacts : {e}")
+            return
+        print(f"{len(paths)} artefact(s) exporté(s) dans : {dest_path}")
 
     # -----------------------------------------------------------------------------------------
     # region - DARK MODE
@@ -900,14 +1183,12 @@ class ExperimentViewer(QMainWindow):
         """Load or init the per-experiment JSON config and return it."""
         if not os.path.exists(os.path.join(self.experiments_dir, self.current_experiment_name, "config.json")):
             self.set_exp_config_file({})
-        success = False
-        while not success:
-            try:
-                config = json.load(open(os.path.join(self.experiments_dir, self.current_experiment_name, "config.json")))
-                success = True
-            except json.JSONDecodeError:
-                print("Erreur de décodage JSON dans le fichier de configuration. On attend.")
-        return config
+        try:
+            return read_json_cached(os.path.join(self.experiments_dir, self.current_experiment_name, "config.json"),
+                                    timeout=UI_READ_JSON_TIMEOUT)
+        except json.JSONDecodeError:
+            print(f"/!\\ Erreur de décodage JSON dans le fichier de configuration de {self.current_experiment_name}.")
+            return {}
 
     def get_exp_config_data(self, key):
         """Return a value from the per-experiment config by key (or None)."""
@@ -915,8 +1196,7 @@ class ExperimentViewer(QMainWindow):
 
     def set_exp_config_file(self, config):
         """Write the full per-experiment config dict to disk."""
-        with open(os.path.join(self.experiments_dir, self.current_experiment_name, "config.json"), "w") as f:
-            json.dump(config, f, indent=4)
+        write_json(os.path.join(self.experiments_dir, self.current_experiment_name, "config.json"), config)
 
     def set_exp_config_data(self, key, value):
         """Update one key in the per-experiment config file."""
@@ -1049,6 +1329,7 @@ class ExperimentViewer(QMainWindow):
                     self.current_experiment_name = None
                     self.current_scores = {}
                     self.current_flags = {}
+                    self.current_journal_state = None
                     self.current_train_loss = []
                     self.current_val_loss = []
                     self.update_plot()
@@ -1063,6 +1344,7 @@ class ExperimentViewer(QMainWindow):
                     self.current_experiment_name = None
                     self.current_scores = {}
                     self.current_flags = {}
+                    self.current_journal_state = None
                     self.current_train_loss = []
                     self.current_val_loss = []
                     self.update_plot()
@@ -1113,11 +1395,12 @@ class ExperimentViewer(QMainWindow):
 
                 # Supprimer la destination existante avant la copie
                 if os.path.isdir(dest_path):
-                    shutil.rmtree(dest_path)
+                    remove_tree(dest_path)
                 else:
                     os.remove(dest_path)
 
-            # Utiliser copytree pour copier récursivement le dossier
+            # Utiliser copytree pour copier récursivement le dossier ; les artefacts n'y sont que
+            # des références (artifacts.json), leur contenu reste dans le store du data_folder
             if os.path.isdir(source_path):
                 shutil.copytree(source_path, dest_path)
             else: